@@ -7,21 +7,29 @@ import (
 
 	"github.com/bufbuild/buf/private/bufpkg/bufcheck/bufbreaking"
 	"github.com/bufbuild/buf/private/bufpkg/bufconfig"
+	"github.com/bufbuild/buf/private/bufpkg/bufimage"
 	"github.com/bufbuild/buf/private/pkg/tracing"
 	"go.uber.org/zap"
 )
 
-func Check(schema schema.Schema, previousSchema schema.Schema) error {
-	handler := bufbreaking.NewHandler(zap.NewNop(), tracing.NopTracer)
-	ctx := context.Background()
-	image, err := schema.CompileBufImage()
-	if err != nil {
-		return err
-	}
-	previousImage, err := previousSchema.CompileBufImage()
-	if err != nil {
-		return err
-	}
+// Mode selects in which direction CheckMany compares the schema with the previous schemas.
+type Mode int
+
+const (
+	// Backward checks that the schema does not break any of the previous schemas.
+	Backward Mode = iota
+	// Forward checks that none of the previous schemas breaks the schema.
+	Forward
+	// Full checks both directions.
+	Full
+)
+
+type checker struct {
+	handler bufbreaking.Handler
+	config  bufconfig.BreakingConfig
+}
+
+func newChecker() checker {
 	checkConfig, _ := bufconfig.NewEnabledCheckConfig(
 		bufconfig.FileVersionV2,
 		nil,
@@ -36,6 +44,52 @@ func Check(schema schema.Schema, previousSchema schema.Schema) error {
 		nil,
 		nil,
 	)
-	config := bufconfig.NewBreakingConfig(checkConfig, false)
-	return handler.Check(ctx, config, previousImage, image)
+	return checker{
+		handler: bufbreaking.NewHandler(zap.NewNop(), tracing.NopTracer),
+		config:  bufconfig.NewBreakingConfig(checkConfig, false),
+	}
+}
+
+func (c checker) check(image bufimage.Image, previousImage bufimage.Image) error {
+	return c.handler.Check(context.Background(), c.config, previousImage, image)
+}
+
+func Check(schema schema.Schema, previousSchema schema.Schema) error {
+	image, err := schema.CompileBufImage()
+	if err != nil {
+		return err
+	}
+	previousImage, err := previousSchema.CompileBufImage()
+	if err != nil {
+		return err
+	}
+	return newChecker().check(image, previousImage)
+}
+
+// CheckMany checks the schema against each of the previous schemas and returns
+// one result per previous schema. The schema is compiled only once.
+func CheckMany(schema schema.Schema, previousSchemas []schema.Schema, mode Mode) []error {
+	errs := make([]error, len(previousSchemas))
+	image, err := schema.CompileBufImage()
+	if err != nil {
+		for i := range errs {
+			errs[i] = err
+		}
+		return errs
+	}
+	c := newChecker()
+	for i, previousSchema := range previousSchemas {
+		previousImage, err := previousSchema.CompileBufImage()
+		if err != nil {
+			errs[i] = err
+			continue
+		}
+		if mode != Forward {
+			errs[i] = c.check(image, previousImage)
+		}
+		if errs[i] == nil && mode != Backward {
+			errs[i] = c.check(previousImage, image)
+		}
+	}
+	return errs
 }
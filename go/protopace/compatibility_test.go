@@ -32,3 +32,27 @@ func TestCompatibility(t *testing.T) {
 	err = Check(*testSchema, *previousSchema)
 	assert.ErrorContains(err, "Field \"5\" with name \"foo\" on message \"EventValue\" changed type from \"string\" to \"int32\".")
 }
+
+func TestCompatibilityMany(t *testing.T) {
+	assert := assert.New(t)
+
+	data, _ := os.ReadFile("./fixtures/dependency.proto")
+	dependencySchema, err := s.FromString("my/awesome/customer/v1/nested_value.proto", string(data), nil)
+	assert.NoError(err)
+
+	data, _ = os.ReadFile("./fixtures/test.proto")
+	testSchema, err := s.FromString("test.proto", string(data), []s.Schema{*dependencySchema})
+	assert.NoError(err)
+
+	data, _ = os.ReadFile("./fixtures/test_previous.proto")
+	previousSchema, err := s.FromString("test.proto", string(data), []s.Schema{*dependencySchema})
+	assert.NoError(err)
+
+	for _, mode := range []Mode{Backward, Forward, Full} {
+		errs := CheckMany(*testSchema, []s.Schema{*testSchema, *previousSchema, *testSchema}, mode)
+		assert.Len(errs, 3)
+		assert.NoError(errs[0])
+		assert.ErrorContains(errs[1], "Field \"5\" with name \"foo\" on message \"EventValue\" changed type")
+		assert.NoError(errs[2])
+	}
+}
@@ -83,4 +83,161 @@ func CheckCompatibility(
 	return nil
 }
 
+// CheckCompatibilityMany checks the first of the schemas against all the others in one call.
+//
+// The dependencies of all the schemas are passed once in a shared table, the
+// dependencies of the schema i are the table entries listed in
+// cDependencyIndexes[cDependencyOffsets[i]:cDependencyOffsets[i+1]].
+// Returns an array with the error of each previous schema or NULL when it is
+// compatible, the array must be released with FreeResults.
+//
+//export CheckCompatibilityMany
+func CheckCompatibilityMany(
+	cSchemaNames **C.char, cSchemas **C.char, schemasLength C.int,
+	cDependencyNames **C.char, cDependencies **C.char, depsLength C.int,
+	cDependencyIndexes *C.int, cDependencyOffsets *C.int, mode C.int) **C.char {
+
+	offsets := goInts(unsafe.Slice(cDependencyOffsets, schemasLength+1))
+	errs := checkCompatibilityMany(
+		goStrings(unsafe.Slice(cSchemaNames, schemasLength)),
+		goStrings(unsafe.Slice(cSchemas, schemasLength)),
+		goStrings(unsafe.Slice(cDependencyNames, depsLength)),
+		goStrings(unsafe.Slice(cDependencies, depsLength)),
+		goInts(unsafe.Slice(cDependencyIndexes, offsets[schemasLength])),
+		offsets,
+		Mode(mode),
+	)
+	results := unsafe.Slice((**C.char)(C.malloc(C.size_t(len(errs))*C.size_t(unsafe.Sizeof((*C.char)(nil))))), len(errs))
+	for i, err := range errs {
+		results[i] = nil
+		if err != nil {
+			results[i] = C.CString(err.Error())
+		}
+	}
+	return &results[0]
+}
+
+// checkCompatibilityMany parses the schemas and checks the first one against
+// the others, see CheckCompatibilityMany. A dependency that fails to parse
+// only fails the schemas depending on it.
+func checkCompatibilityMany(
+	names []string, schemas []string, dependencyNames []string, dependencies []string,
+	dependencyIndexes []int, dependencyOffsets []int, mode Mode) []error {
+
+	parsedDependencies := make([]s.Schema, len(dependencies))
+	dependencyErrors := make([]error, len(dependencies))
+	for i, dependency := range dependencies {
+		parsedDependency, err := s.FromString(dependencyNames[i], dependency, []s.Schema{})
+		if err != nil {
+			dependencyErrors[i] = err
+			continue
+		}
+		parsedDependencies[i] = *parsedDependency
+	}
+	parse := func(i int) (*s.Schema, error) {
+		schemaDependencies := []s.Schema{}
+		for _, index := range dependencyIndexes[dependencyOffsets[i]:dependencyOffsets[i+1]] {
+			if dependencyErrors[index] != nil {
+				return nil, dependencyErrors[index]
+			}
+			schemaDependencies = append(schemaDependencies, parsedDependencies[index])
+		}
+		return s.FromString(names[i], schemas[i], schemaDependencies)
+	}
+
+	errs := make([]error, len(schemas)-1)
+	schema, err := parse(0)
+	if err != nil {
+		for i := range errs {
+			errs[i] = err
+		}
+		return errs
+	}
+	previousSchemas := []s.Schema{}
+	for i := range errs {
+		previousSchema, err := parse(i + 1)
+		if err != nil {
+			errs[i] = err
+			continue
+		}
+		previousSchemas = append(previousSchemas, *previousSchema)
+	}
+
+	checkErrors := CheckMany(*schema, previousSchemas, mode)
+	for i := range errs {
+		if errs[i] == nil {
+			errs[i], checkErrors = checkErrors[0], checkErrors[1:]
+		}
+	}
+	return errs
+}
+
+//export FreeResults
+func FreeResults(cResults **C.char, length C.int) {
+	for _, res := range unsafe.Slice(cResults, length) {
+		C.free(unsafe.Pointer(res))
+	}
+	C.free(unsafe.Pointer(cResults))
+}
+
+func goStrings(cStrings []*C.char) []string {
+	values := make([]string, len(cStrings))
+	for i, cString := range cStrings {
+		values[i] = C.GoString(cString)
+	}
+	return values
+}
+
+func goInts(cInts []C.int) []int {
+	values := make([]int, len(cInts))
+	for i, cInt := range cInts {
+		values[i] = int(cInt)
+	}
+	return values
+}
+
+// The helpers below are used by the tests, which cannot use cgo themselves.
+
+// cStrings copies the values to a C array, released with freeCStrings.
+func cStrings(values []string) **C.char {
+	array := unsafe.Slice((**C.char)(C.malloc(C.size_t(len(values)+1)*C.size_t(unsafe.Sizeof((*C.char)(nil))))), len(values)+1)
+	for i, value := range values {
+		array[i] = C.CString(value)
+	}
+	array[len(values)] = nil
+	return &array[0]
+}
+
+func freeCStrings(cArray **C.char, length int) {
+	for _, cString := range unsafe.Slice(cArray, length) {
+		C.free(unsafe.Pointer(cString))
+	}
+	C.free(unsafe.Pointer(cArray))
+}
+
+// cInts copies the values to a C array, released with freeCInts.
+func cInts(values []int) *C.int {
+	array := unsafe.Slice((*C.int)(C.malloc(C.size_t(len(values)+1)*C.size_t(unsafe.Sizeof(C.int(0))))), len(values)+1)
+	for i, value := range values {
+		array[i] = C.int(value)
+	}
+	return &array[0]
+}
+
+func freeCInts(cArray *C.int) {
+	C.free(unsafe.Pointer(cArray))
+}
+
+// goResults returns the results of CheckCompatibilityMany, nil for the compatible schemas.
+func goResults(cResults **C.char, length int) []*string {
+	results := make([]*string, length)
+	for i, cResult := range unsafe.Slice(cResults, length) {
+		if cResult != nil {
+			result := C.GoString(cResult)
+			results[i] = &result
+		}
+	}
+	return results
+}
+
 func main() {}
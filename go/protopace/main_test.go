@@ -0,0 +1,94 @@
+package main
+
+import (
+	"os"
+	"testing"
+
+	"github.com/stretchr/testify/assert"
+)
+
+type checkManyFixture struct {
+	names             []string
+	schemas           []string
+	dependencyNames   []string
+	dependencies      []string
+	dependencyIndexes []int
+	dependencyOffsets []int
+}
+
+// newCheckManyFixture returns schemas to check against a compatible, an
+// incompatible and an unparsable previous schema, the last one depending on
+// a broken dependency shared with no other schema.
+func newCheckManyFixture(t *testing.T) checkManyFixture {
+	read := func(path string) string {
+		data, err := os.ReadFile(path)
+		assert.NoError(t, err)
+		return string(data)
+	}
+	testSchema := read("./fixtures/test.proto")
+	return checkManyFixture{
+		names:             []string{"test.proto", "test.proto", "test.proto", "test.proto"},
+		schemas:           []string{testSchema, testSchema, read("./fixtures/test_previous.proto"), testSchema},
+		dependencyNames:   []string{"my/awesome/customer/v1/nested_value.proto", "broken.proto"},
+		dependencies:      []string{read("./fixtures/dependency.proto"), "syntax = "},
+		dependencyIndexes: []int{0, 0, 0, 0, 1},
+		dependencyOffsets: []int{0, 1, 2, 3, 5},
+	}
+}
+
+func TestCheckCompatibilityManyMixedResults(t *testing.T) {
+	assert := assert.New(t)
+	f := newCheckManyFixture(t)
+
+	errs := checkCompatibilityMany(
+		f.names, f.schemas, f.dependencyNames, f.dependencies, f.dependencyIndexes, f.dependencyOffsets, Backward,
+	)
+
+	assert.Len(errs, 3)
+	assert.NoError(errs[0])
+	assert.ErrorContains(errs[1], "Field \"5\" with name \"foo\" on message \"EventValue\" changed type")
+	assert.ErrorContains(errs[2], "broken.proto")
+}
+
+func TestCheckCompatibilityManyFailsAllWhenSchemaDoesNotParse(t *testing.T) {
+	f := newCheckManyFixture(t)
+	f.dependencyIndexes = []int{0, 1, 0, 0, 0}
+	f.dependencyOffsets = []int{0, 2, 3, 4, 5}
+
+	errs := checkCompatibilityMany(
+		f.names, f.schemas, f.dependencyNames, f.dependencies, f.dependencyIndexes, f.dependencyOffsets, Backward,
+	)
+
+	for _, err := range errs {
+		assert.ErrorContains(t, err, "broken.proto")
+	}
+}
+
+func TestCheckCompatibilityManyResultsAreFreed(t *testing.T) {
+	assert := assert.New(t)
+	f := newCheckManyFixture(t)
+
+	names := cStrings(f.names)
+	defer freeCStrings(names, len(f.names))
+	schemas := cStrings(f.schemas)
+	defer freeCStrings(schemas, len(f.schemas))
+	dependencyNames := cStrings(f.dependencyNames)
+	defer freeCStrings(dependencyNames, len(f.dependencyNames))
+	dependencies := cStrings(f.dependencies)
+	defer freeCStrings(dependencies, len(f.dependencies))
+	dependencyIndexes := cInts(f.dependencyIndexes)
+	defer freeCInts(dependencyIndexes)
+	dependencyOffsets := cInts(f.dependencyOffsets)
+	defer freeCInts(dependencyOffsets)
+
+	cResults := CheckCompatibilityMany(
+		names, schemas, 4, dependencyNames, dependencies, 2, dependencyIndexes, dependencyOffsets, 0,
+	)
+	results := goResults(cResults, 3)
+	FreeResults(cResults, 3)
+
+	assert.Len(results, 3)
+	assert.Nil(results[0])
+	assert.Contains(*results[1], "changed type")
+	assert.Contains(*results[2], "broken.proto")
+}
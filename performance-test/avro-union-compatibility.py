@@ -0,0 +1,85 @@
+"""
+Measure the Avro compatibility check of schemas with wide unions of records.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.compatibility import ReaderWriterCompatibilityChecker
+from avro.schema import Schema as AvroSchema
+from collections.abc import Callable
+from karapace.compatibility.avro.checks import check_avro_compatibility
+from karapace.schema_models import parse_avro_schema_definition
+
+import argparse
+import json
+import time
+
+
+def _event(pos: int, fields: int) -> dict:
+    return {
+        "type": "record",
+        "name": f"Event{pos}",
+        "fields": [{"name": "id", "type": "string"}, {"name": "metadata", "type": "Metadata"}]
+        + [{"name": f"field{field}", "type": ["null", "long", "Metadata"], "default": None} for field in range(fields)],
+    }
+
+
+def _schema(width: int, fields: int, order: list[int]) -> AvroSchema:
+    metadata = {"type": "record", "name": "Metadata", "fields": [{"name": "source", "type": "string"}]}
+    events = [_event(pos, fields) for pos in order]
+    return parse_avro_schema_definition(
+        json.dumps(
+            {
+                "type": "record",
+                "name": "Envelope",
+                "fields": [
+                    {"name": "metadata", "type": metadata},
+                    {"name": "event", "type": events},
+                    {"name": "previous", "type": {"type": "array", "items": [f"Event{pos}" for pos in range(width)]}},
+                ],
+            }
+        )
+    )
+
+
+def _library(reader: AvroSchema, writers: list[AvroSchema]) -> None:
+    for writer in writers:
+        ReaderWriterCompatibilityChecker().get_compatibility(reader=reader, writer=writer)
+
+
+def _karapace(reader: AvroSchema, writers: list[AvroSchema]) -> None:
+    for writer in writers:
+        check_avro_compatibility(reader, writer)
+
+
+def _timed(function: Callable[[], object], repeat: int) -> float:
+    start = time.monotonic()
+    for _ in range(repeat):
+        function()
+    return (time.monotonic() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=30, help="records in the unions")
+    parser.add_argument("--fields", type=int, default=10, help="fields of each record")
+    parser.add_argument("--versions", type=int, default=5, help="old versions checked in transitive mode")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    order = list(range(args.width))
+    new_schema = _schema(args.width, args.fields, order[::-1])
+    cases = {
+        "one version": [_schema(args.width, args.fields, order)],
+        "transitive": [_schema(args.width, args.fields, order) for _ in range(args.versions)],
+    }
+    for name, old_schemas in cases.items():
+        for checker, function in (("avro", _library), ("karapace", _karapace)):
+            elapsed = _timed(lambda: function(new_schema, old_schemas), args.repeat)  # pylint: disable=cell-var-from-loop
+            print(f"{name:<12} {checker:<9} {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
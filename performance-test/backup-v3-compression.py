@@ -0,0 +1,120 @@
+"""
+Compare size and throughput of uncompressed and block-compressed V3 backup data files.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from karapace.backup.backends.v3.backend import SchemaBackupV3Reader, SchemaBackupV3Writer
+from karapace.backup.backends.v3.constants import DEFAULT_COMPRESSION_BLOCK_SIZE
+from karapace.backup.backends.v3.schema import CompressionCodec
+from pathlib import Path
+
+import argparse
+import datetime
+import json
+import tempfile
+import time
+
+TOPIC_NAME = "_schemas"
+
+
+@dataclass(frozen=True)
+class _Message:
+    """The subset of a consumed Kafka message used by the V3 writer."""
+
+    _key: bytes
+    _value: bytes
+    _offset: int
+
+    def key(self) -> bytes:
+        return self._key
+
+    def value(self) -> bytes:
+        return self._value
+
+    def headers(self) -> None:
+        return None
+
+    def offset(self) -> int:
+        return self._offset
+
+    def partition(self) -> int:
+        return 0
+
+    def timestamp(self) -> tuple[int, int]:
+        return 1, 1_700_000_000_000 + self._offset
+
+
+def _schema_messages(count: int) -> Sequence[_Message]:
+    # Records shaped like the ones of the schemas topic, the most common backup.
+    messages = []
+    for offset in range(count):
+        subject = f"subject-{offset % 500}-value"
+        version = offset // 500 + 1
+        schema = {
+            "type": "record",
+            "name": f"Record{offset % 500}",
+            "fields": [{"name": f"field_{index}", "type": "string", "default": ""} for index in range(version + 5)],
+        }
+        key = {"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}
+        value = {"subject": subject, "version": version, "id": offset + 1, "schema": json.dumps(schema), "deleted": False}
+        messages.append(_Message(json.dumps(key).encode(), json.dumps(value).encode(), offset))
+    return messages
+
+
+def _run(path: Path, messages: Sequence[_Message], codec: CompressionCodec | None, block_size: int) -> None:
+    backup_writer = SchemaBackupV3Writer(compression=codec, compression_block_size=block_size)
+    started_at = time.monotonic()
+    file_path = backup_writer.start_partition(path=path, topic_name=TOPIC_NAME, index=0)
+    with backup_writer.safe_writer(file_path, False) as buffer:
+        for message in messages:
+            backup_writer.store_record(buffer, message)  # type: ignore[arg-type]
+        backup_writer.end_partition(buffer, 0)
+    data_file = backup_writer.finalize_partition(index=0, filename=file_path.name)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    backup_writer.store_metadata(
+        path=path,
+        topic_name=TOPIC_NAME,
+        topic_id=None,
+        started_at=now,
+        finished_at=now,
+        partition_count=1,
+        replication_factor=1,
+        topic_configurations={},
+        data_files=(data_file,),
+    )
+    write_seconds = time.monotonic() - started_at
+
+    started_at = time.monotonic()
+    for _ in SchemaBackupV3Reader().read(path / f"{TOPIC_NAME}.metadata", TOPIC_NAME):
+        pass
+    read_seconds = time.monotonic() - started_at
+
+    size = file_path.stat().st_size
+    print(
+        f"{'none' if codec is None else codec.value:>6} "
+        f"{size / 1024:>12.1f} "
+        f"{len(messages) / write_seconds:>14.0f} "
+        f"{len(messages) / read_seconds:>14.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records to back up.")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_COMPRESSION_BLOCK_SIZE, help="Compression block size.")
+    args = parser.parse_args()
+
+    messages = _schema_messages(args.records)
+    print(f"{'codec':>6} {'size (KiB)':>12} {'write (rec/s)':>14} {'read (rec/s)':>14}")
+    for codec in (None, *CompressionCodec):
+        with tempfile.TemporaryDirectory() as directory:
+            _run(Path(directory), messages, codec, args.block_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure the JSON Schema compatibility check of schemas with wide unions.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from jsonschema import Draft7Validator
+from karapace.compatibility.jsonschema.checks import compatibility
+from karapace.schema_models import parse_jsonschema_definition
+
+import argparse
+import functools
+import json
+import time
+
+
+def _event(pos: int, nested: int) -> dict:
+    event: dict = {
+        "type": "object",
+        "properties": {
+            "type": {"enum": [f"event-{pos}"]},
+            "id": {"type": "string"},
+            f"field{pos}": {"type": "integer", "minimum": 0},
+        },
+        "required": ["type", "id"],
+    }
+    if nested:
+        event["properties"]["payload"] = {"oneOf": [_event(inner, 0) for inner in range(nested)]}
+    return event
+
+
+def _union(events: list[dict], combinator: str = "oneOf") -> Draft7Validator:
+    return parse_jsonschema_definition(json.dumps({combinator: events}))
+
+
+def _cases(width: int, nested: int) -> dict[str, tuple[Draft7Validator, Draft7Validator]]:
+    events = [_event(pos, 0) for pos in range(width)]
+    nested_events = [_event(pos, nested) for pos in range(width)]
+    changed = dict(events[-1], properties=dict(events[-1]["properties"], id={"type": "integer"}))
+    return {
+        "same order": (_union(events), _union(events)),
+        "reversed order": (_union(events), _union(events[::-1])),
+        "nested unions": (_union(nested_events), _union(nested_events[::-1])),
+        # No reader branch accepts the changed writer branch, which is only
+        # reported once it was compared against all of them.
+        "incompatible branch": (_union(events), _union(events[:-1] + [changed])),
+        "anyOf reader": (_union(events, "anyOf"), _union(events[::-1], "anyOf")),
+    }
+
+
+def _timed(function: Callable[[], object], repeat: int) -> float:
+    start = time.monotonic()
+    for _ in range(repeat):
+        function()
+    return (time.monotonic() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=40, help="branches of the unions")
+    parser.add_argument("--nested", type=int, default=10, help="branches of the unions nested in each branch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, (reader, writer) in _cases(args.width, args.nested).items():
+        result = compatibility(reader=reader, writer=writer)
+        elapsed = _timed(functools.partial(compatibility, reader=reader, writer=writer), args.repeat)
+        print(f"{name:<20} {result.compatibility.value:<13} {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
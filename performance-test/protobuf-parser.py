@@ -0,0 +1,61 @@
+"""
+Measure parsing Protobuf schema text with the Protobuf parser.
+
+The schemas are the protopace fixtures and the Protobuf schemas of the tests.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.protobuf.exception import IllegalStateException
+from karapace.protobuf.location import Location
+from karapace.protobuf.proto_parser import ProtoParser
+from pathlib import Path
+
+import argparse
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _schemas(location: Location) -> dict[str, str]:
+    schemas = {path.name: path.read_text() for path in sorted((ROOT / "go" / "protopace" / "fixtures").glob("*.proto"))}
+    sys.path.insert(0, str(ROOT))
+    from tests.schemas import protobuf  # pylint: disable=import-outside-toplevel
+
+    for name, value in vars(protobuf).items():
+        if name.startswith("schema_protobuf") and isinstance(value, str) and "syntax" in value:
+            schemas[name] = value
+    # Some of the test schemas are invalid on purpose.
+    valid_schemas = {}
+    for name, schema in schemas.items():
+        try:
+            ProtoParser.parse(location, schema)
+        except IllegalStateException:
+            continue
+        valid_schemas[name] = schema
+    return valid_schemas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    location = Location("", "file.proto")
+    schemas = _schemas(location)
+    total = 0.0
+    for name, schema in schemas.items():
+        start = time.monotonic()
+        for _ in range(args.repeat):
+            ProtoParser.parse(location, schema)
+        elapsed = (time.monotonic() - start) / args.repeat
+        total += elapsed
+        print(f"{name:<45} {len(schema):6} chars {elapsed * 1e6:9.1f} us")
+    print(f"{'total':<58} {total * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
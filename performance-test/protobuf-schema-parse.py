@@ -0,0 +1,72 @@
+"""
+Measure parsing and validating Protobuf schemas with deep nesting and many imports.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.dependency import Dependency
+from karapace.schema_models import SchemaType, ValidatedTypedSchema
+from karapace.schema_references import Reference
+from karapace.typing import Subject, Version
+
+import argparse
+import time
+
+
+def _message(name: str, depth: int, field_type: str) -> str:
+    nested = ""
+    if depth:
+        nested = f" {_message(name + 'N', depth - 1, field_type)} {name}N nested = 2;"
+    return f"message {name} {{ {field_type} value = 1;{nested} }}"
+
+
+def _schema(index: int, imports: list[int], depth: int) -> str:
+    lines = ['syntax = "proto3";', f"package pkg{index};"]
+    lines += [f'import "dep{imported}.proto";' for imported in imports]
+    field_type = f"pkg{imports[-1]}.Msg{imports[-1]}" if imports else "string"
+    lines.append(_message(f"Msg{index}", depth, field_type))
+    return "\n".join(lines)
+
+
+def _dependencies(count: int, depth: int) -> dict[str, Dependency]:
+    # Each dependency imports all the previous ones, so that the first ones are
+    # reachable through many import paths.
+    dependencies: dict[str, Dependency] = {}
+    for index in range(count):
+        name = f"dep{index}.proto"
+        schema = ValidatedTypedSchema.parse(
+            schema_type=SchemaType.PROTOBUF,
+            schema_str=_schema(index, list(range(index)), depth),
+            dependencies=dict(dependencies) or None,
+        )
+        reference = Reference(name=name, subject=Subject(f"dep{index}"), version=Version(1))
+        dependencies[name] = Dependency.of(reference, schema)
+    return dependencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--imports", type=int, default=12, help="imports of the schema")
+    parser.add_argument("--depth", type=int, default=10, help="nesting depth of the messages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    dependencies = _dependencies(args.imports, args.depth)
+    schema_str = _schema(args.imports, list(range(args.imports)), args.depth)
+    for normalize in (False, True):
+        start = time.monotonic()
+        for _ in range(args.repeat):
+            ValidatedTypedSchema.parse(
+                schema_type=SchemaType.PROTOBUF,
+                schema_str=schema_str,
+                dependencies=dependencies,
+                normalize=normalize,
+            )
+        elapsed = (time.monotonic() - start) / args.repeat
+        print(f"normalize={normalize!s:<5} {elapsed * 1000:9.1f} ms per parse")
+
+
+if __name__ == "__main__":
+    main()
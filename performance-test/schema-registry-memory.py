@@ -0,0 +1,81 @@
+"""
+Measure the memory used by the schema registry database per schema version.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.schema_models import SchemaType, TypedSchema
+from karapace.schema_references import Reference
+from karapace.typing import SchemaId, Subject, Version
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+
+def _schema_str(schema_id: int) -> str:
+    # Small records, as most registered schemas are, each version distinct.
+    return json.dumps(
+        {
+            "type": "record",
+            "name": f"Record{schema_id}",
+            "fields": [{"name": "id", "type": "long"}, {"name": f"field{schema_id}", "type": ["null", "string"]}],
+        }
+    )
+
+
+def _load(database: InMemoryDatabase, versions: int, versions_per_subject: int, referencing_ratio: int) -> None:
+    for index in range(versions):
+        schema_id = SchemaId(index + 1)
+        # Subject names are decoded from every record of the schemas topic, so
+        # each version gets its own copy of the name as when read from Kafka.
+        subject = Subject(json.loads(json.dumps(f"subject-{index // versions_per_subject}-value")))
+        version = Version(index % versions_per_subject + 1)
+        references = None
+        if referencing_ratio and index % referencing_ratio == referencing_ratio - 1:
+            references = [Reference(name="base", subject=Subject("subject-0-value"), version=Version(1))]
+        database.insert_schema_version(
+            subject=subject,
+            schema_id=schema_id,
+            version=version,
+            deleted=False,
+            schema=TypedSchema(schema_type=SchemaType.AVRO, schema_str=_schema_str(index), references=references),
+            references=references,
+        )
+        if references:
+            database.insert_referenced_by(subject=Subject("subject-0-value"), version=Version(1), schema_id=schema_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--versions", type=int, default=1_000_000, help="schema versions to load")
+    parser.add_argument("--versions-per-subject", type=int, default=10)
+    parser.add_argument("--referencing-ratio", type=int, default=100, help="one version in N references another")
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.monotonic()
+    database = InMemoryDatabase()
+    _load(database, args.versions, args.versions_per_subject, args.referencing_ratio)
+    elapsed = time.monotonic() - start
+    gc.collect()
+    total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    schema_text = sum(len(_schema_str(index)) for index in range(args.versions))
+    print(f"versions:              {args.versions}")
+    print(f"subjects:              {database.num_subjects()}")
+    print(f"load time:             {elapsed:.1f}s")
+    print(f"total:                 {total / 2**20:.1f} MiB")
+    print(f"bytes per version:     {total / args.versions:.0f}")
+    print(f"schema text / version: {schema_text / args.versions:.0f}")
+
+
+if __name__ == "__main__":
+    main()
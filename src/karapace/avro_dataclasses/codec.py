@@ -0,0 +1,318 @@
+"""
+Avro binary encoding of dataclasses, specialised per record type.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from .introspect import avro_fields, record_schema, sequence_types
+from avro.errors import AvroTypeException, InvalidAvroBinaryEncoding
+from collections.abc import Mapping
+from dataclasses import Field, is_dataclass
+from enum import Enum
+from functools import lru_cache
+from karapace.dataclasses import default_dataclass
+from typing import Any, Callable, Final, get_args, get_origin, TYPE_CHECKING, Union
+
+import datetime
+import uuid
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+else:
+
+    class DataclassInstance:
+        ...
+
+
+__all__ = ("Codec", "record_codec")
+
+
+Encoder = Callable[[bytearray, Any], None]
+Decoder = Callable[[bytes, int], tuple[Any, int]]
+
+_EPOCH: Final = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@default_dataclass
+class Codec:
+    encode: Encoder
+    decode: Decoder
+
+
+def encode_long(out: bytearray, value: int) -> None:
+    # Avro ints and longs are zigzag encoded variable-length integers.
+    value = (value << 1) ^ (value >> 63)
+    while value & ~0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_long(data: bytes, position: int) -> tuple[int, int]:
+    try:
+        byte = data[position]
+        position += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    except IndexError:
+        raise InvalidAvroBinaryEncoding("Unexpected end of data while decoding a long.") from None
+    return (value >> 1) ^ -(value & 1), position
+
+
+def encode_bytes(out: bytearray, value: bytes) -> None:
+    encode_long(out, len(value))
+    out += value
+
+
+def decode_bytes(data: bytes, position: int) -> tuple[bytes, int]:
+    size, position = decode_long(data, position)
+    end = position + size
+    if size < 0 or end > len(data):
+        raise InvalidAvroBinaryEncoding(f"Read {len(data) - position} bytes, expected {size} bytes")
+    return data[position:end], end
+
+
+def encode_string(out: bytearray, value: str) -> None:
+    encode_bytes(out, value.encode("utf-8"))
+
+
+def decode_string(data: bytes, position: int) -> tuple[str, int]:
+    value, position = decode_bytes(data, position)
+    return value.decode("utf-8"), position
+
+
+def encode_boolean(out: bytearray, value: bool) -> None:
+    if value is True:
+        out.append(1)
+    elif value is False:
+        out.append(0)
+    else:
+        raise AvroTypeException(f"Expected a boolean, found {value!r}")
+
+
+def decode_boolean(data: bytes, position: int) -> tuple[bool, int]:
+    try:
+        return data[position] == 1, position + 1
+    except IndexError:
+        raise InvalidAvroBinaryEncoding("Unexpected end of data while decoding a boolean.") from None
+
+
+def encode_null(out: bytearray, value: None) -> None:  # pylint: disable=unused-argument
+    if value is not None:
+        raise AvroTypeException(f"Expected None, found {value!r}")
+
+
+def decode_null(data: bytes, position: int) -> tuple[None, int]:  # pylint: disable=unused-argument
+    return None, position
+
+
+def encode_timestamp_millis(out: bytearray, value: datetime.datetime) -> None:
+    delta = value.astimezone(datetime.timezone.utc) - _EPOCH
+    encode_long(out, ((delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds) // 1000)
+
+
+def decode_timestamp_millis(data: bytes, position: int) -> tuple[datetime.datetime, int]:
+    millis, position = decode_long(data, position)
+    return _EPOCH + datetime.timedelta(milliseconds=millis), position
+
+
+def encode_uuid(out: bytearray, value: uuid.UUID) -> None:
+    # Kept as the hex form, as written by earlier versions through the avro library.
+    encode_string(out, value.hex)
+
+
+def decode_uuid(data: bytes, position: int) -> tuple[uuid.UUID, int]:
+    value, position = decode_string(data, position)
+    return uuid.UUID(value), position
+
+
+def _enum_codec(type_: type[Enum]) -> Codec:
+    members = tuple(type_)
+    indices = {member: index for index, member in enumerate(members)}
+
+    def encode(out: bytearray, value: Enum) -> None:
+        try:
+            encode_long(out, indices[value])
+        except KeyError:
+            raise AvroTypeException(f"Expected a member of {type_.__name__}, found {value!r}") from None
+
+    def decode(data: bytes, position: int) -> tuple[Enum, int]:
+        index, position = decode_long(data, position)
+        if not 0 <= index < len(members):
+            raise InvalidAvroBinaryEncoding(f"Invalid symbol index {index} for {type_.__name__}")
+        return members[index], position
+
+    return Codec(encode=encode, decode=decode)
+
+
+def _nullable_codec(type_: object, inner: Codec) -> Codec:
+    # The branches are encoded in the declared order, as in the record schema.
+    try:
+        a, b = get_args(type_)
+    except ValueError:
+        raise NotImplementedError("Cannot handle arbitrary union types") from None
+    if a is type(None):  # noqa: E721
+        null_branch, value_branch = 0, 1
+    elif b is type(None):  # noqa: E721
+        null_branch, value_branch = 1, 0
+    else:
+        raise NotImplementedError("Cannot handle arbitrary union types")
+    null_tag = bytes([null_branch << 1])
+    value_tag = bytes([value_branch << 1])
+    encode_inner = inner.encode
+    decode_inner = inner.decode
+
+    def encode(out: bytearray, value: object) -> None:
+        if value is None:
+            out += null_tag
+        else:
+            out += value_tag
+            encode_inner(out, value)
+
+    def decode(data: bytes, position: int) -> tuple[object, int]:
+        branch, position = decode_long(data, position)
+        if branch == null_branch:
+            return None, position
+        if branch != value_branch:
+            raise InvalidAvroBinaryEncoding(f"Invalid union branch {branch}")
+        return decode_inner(data, position)
+
+    return Codec(encode=encode, decode=decode)
+
+
+def _array_codec(inner: Codec, container: Callable[[list], object]) -> Codec:
+    encode_item = inner.encode
+    decode_item = inner.decode
+
+    def encode(out: bytearray, values: Any) -> None:
+        # All items are written in a single block, followed by the empty block.
+        if values:
+            encode_long(out, len(values))
+            for value in values:
+                encode_item(out, value)
+        out.append(0)
+
+    def decode(data: bytes, position: int) -> tuple[object, int]:
+        values = []
+        while True:
+            count, position = decode_long(data, position)
+            if count == 0:
+                return container(values), position
+            if count < 0:
+                # Negative counts are followed by the size of the block in bytes.
+                count = -count
+                _, position = decode_long(data, position)
+            for _ in range(count):
+                value, position = decode_item(data, position)
+                values.append(value)
+
+    return Codec(encode=encode, decode=decode)
+
+
+def _map_codec(inner: Codec) -> Codec:
+    encode_value = inner.encode
+    decode_value = inner.decode
+
+    def encode(out: bytearray, values: Mapping[str, Any]) -> None:
+        if values:
+            encode_long(out, len(values))
+            for key, value in values.items():
+                encode_string(out, key)
+                encode_value(out, value)
+        out.append(0)
+
+    def decode(data: bytes, position: int) -> tuple[dict[str, object], int]:
+        values = {}
+        while True:
+            count, position = decode_long(data, position)
+            if count == 0:
+                return values, position
+            if count < 0:
+                count = -count
+                _, position = decode_long(data, position)
+            for _ in range(count):
+                key, position = decode_string(data, position)
+                values[key], position = decode_value(data, position)
+
+    return Codec(encode=encode, decode=decode)
+
+
+_PRIMITIVES: Final[Mapping[object, Codec]] = {
+    bool: Codec(encode=encode_boolean, decode=decode_boolean),
+    str: Codec(encode=encode_string, decode=decode_string),
+    int: Codec(encode=encode_long, decode=decode_long),
+    bytes: Codec(encode=encode_bytes, decode=decode_bytes),
+    type(None): Codec(encode=encode_null, decode=decode_null),
+    None: Codec(encode=encode_null, decode=decode_null),
+    datetime.datetime: Codec(encode=encode_timestamp_millis, decode=decode_timestamp_millis),
+    uuid.UUID: Codec(encode=encode_uuid, decode=decode_uuid),
+}
+
+
+def _type_codec(type_: object) -> Codec:
+    # Mirrors the type mapping of introspect._field_type, which has validated the
+    # annotations by the time this is called.
+    if type_ in _PRIMITIVES:
+        return _PRIMITIVES[type_]
+
+    if isinstance(type_, type):
+        if is_dataclass(type_):
+            return record_codec(type_)
+        if issubclass(type_, Enum):
+            return _enum_codec(type_)
+
+    origin = get_origin(type_)
+
+    if origin is Union:
+        return _nullable_codec(type_, _type_codec(next(arg for arg in get_args(type_) if arg is not type(None))))
+
+    if origin in sequence_types:
+        inner_type = get_args(type_)[0]
+        return _array_codec(_type_codec(inner_type), tuple if origin is tuple else list)
+
+    if origin is Mapping:
+        return _map_codec(_type_codec(get_args(type_)[1]))
+
+    raise NotImplementedError(f"Cannot encode unknown type {type_!r}")
+
+
+def _generate(record_type: type[DataclassInstance], record_fields: tuple[Field, ...]) -> Codec:
+    # Generate straight-line functions for the record, in the same way the dataclasses
+    # module generates __init__, so that encoding a record costs an attribute access
+    # and a call per field.
+    namespace: dict[str, Any] = {"record_type": record_type}
+    encode_lines = ["def encode(out, value):"]
+    decode_lines = ["def decode(data, position):"]
+    arguments = []
+    for index, field in enumerate(record_fields):
+        codec = _type_codec(field.type)
+        namespace[f"encode_{index}"] = codec.encode
+        namespace[f"decode_{index}"] = codec.decode
+        encode_lines.append(f"    encode_{index}(out, value.{field.name})")
+        decode_lines.append(f"    field_{index}, position = decode_{index}(data, position)")
+        arguments.append(f"{field.name}=field_{index}")
+    encode_lines.append("    return None")
+    decode_lines.append(f"    return record_type({', '.join(arguments)}), position")
+    exec("\n".join(encode_lines), namespace)  # pylint: disable=exec-used
+    exec("\n".join(decode_lines), namespace)  # pylint: disable=exec-used
+    return Codec(encode=namespace["encode"], decode=namespace["decode"])
+
+
+@lru_cache
+def record_codec(record_type: type[DataclassInstance]) -> Codec:
+    """Return the encoder and decoder of the Avro record of a dataclass.
+
+    The encoding is the same as the one of the avro library for `record_schema`, the
+    functions are built once per record type. Fields excluded from the record are
+    left out, and take their default when decoded.
+    """
+    # Raises for annotations that cannot be represented in Avro.
+    record_schema(record_type)
+    return _generate(record_type, avro_fields(record_type))
@@ -106,7 +106,7 @@ def _field_type(field: Field, type_: object) -> AvroType:  # pylint: disable=too
             "type": "enum",
             "symbols": [value.value for value in type_],
         }
-        if field.default is not MISSING:
+        if isinstance(field.default, type_):
             enum_dict["default"] = field.default.value
         return enum_dict
 
@@ -160,10 +160,16 @@ def field_schema(field: Field) -> FieldSchema:
     )
 
 
+def avro_fields(record_type: type[DataclassInstance]) -> tuple[Field, ...]:
+    """Fields of the dataclass that are part of its Avro record, fields with the
+    `exclude` metadata flag are left out and take their default when parsed."""
+    return tuple(field for field in fields(record_type) if not field.metadata.get("exclude", False))
+
+
 @lru_cache
 def record_schema(record_type: type[DataclassInstance]) -> RecordSchema:
     return {
         "name": record_type.__name__,
         "type": "record",
-        "fields": [field_schema(field) for field in fields(record_type)],
+        "fields": [field_schema(field) for field in avro_fields(record_type)],
     }
@@ -6,9 +6,16 @@ See LICENSE for details
 """
 from __future__ import annotations
 
-from .backends.reader import BaseBackupReader, BaseItemsBackupReader, ProducerSend, RestoreTopic, RestoreTopicLegacy
-from .backends.v3.constants import V3_MARKER
-from .backends.v3.schema import ChecksumAlgorithm
+from .backends.reader import (
+    BaseBackupReader,
+    BaseItemsBackupReader,
+    Instruction,
+    ProducerSend,
+    RestoreTopic,
+    RestoreTopicLegacy,
+)
+from .backends.v3.constants import DEFAULT_COMPRESSION_BLOCK_SIZE, V3_MARKER
+from .backends.v3.schema import ChecksumAlgorithm, CompressionCodec, DataFile
 from .backends.writer import BackupWriter, StdOut
 from .encoders import encode_key, encode_value
 from .errors import (
@@ -16,15 +23,17 @@ from .errors import (
     BackupError,
     BackupTopicAlreadyExists,
     EmptyPartition,
+    MissingRecordsError,
     PartitionCountError,
     StaleConsumerError,
 )
+from .pipeline import DryRunProducer, InFlightWindow, PipelineOptions, read_ahead, RestoreProducer, RestoreProgress
 from .poll_timeout import PollTimeout
 from .topic_configurations import ConfigSource, get_topic_configurations
 from aiokafka.errors import KafkaError, TopicAlreadyExistsError
-from collections.abc import Iterator, Mapping, Sized
-from concurrent.futures import Future
-from confluent_kafka import Message, TopicPartition
+from collections.abc import Iterator, Mapping, Sequence, Sized
+from concurrent.futures import Future, ThreadPoolExecutor
+from confluent_kafka import Message, OFFSET_BEGINNING, TopicPartition
 from enum import Enum
 from functools import partial
 from karapace import constants
@@ -38,6 +47,7 @@ from karapace.kafka.consumer import KafkaConsumer
 from karapace.kafka.producer import KafkaProducer
 from karapace.kafka_utils import kafka_admin_from_config, kafka_consumer_from_config, kafka_producer_from_config
 from karapace.key_format import KeyFormatter
+from karapace.statsd import StatsClient
 from karapace.utils import assert_never
 from pathlib import Path
 from rich.console import Console
@@ -51,6 +61,7 @@ import json
 import logging
 import math
 import textwrap
+import threading
 
 __all__ = (
     "create_backup",
@@ -175,19 +186,23 @@ def __before_sleep(description: str) -> Callable[[RetryCallState], None]:
     return before_sleep
 
 
-def __check_partition_count(topic: str, supplier: Callable[[str], Sized]) -> None:
-    """Checks that the given topic has exactly one partition.
+def __check_partition_count(topic: str, supplier: Callable[[str], Sized], expected: int = 1) -> None:
+    """Checks that the given topic has the expected number of partitions.
 
     :param topic: to check.
     :param supplier: of topic partition metadata.
-    :raises PartitionCountError: if the topic does not have exactly one partition.
+    :param expected: number of partitions, defaults to exactly one partition.
+    :raises PartitionCountError: if the topic does not have the expected number of partitions.
     """
     partition_count = len(supplier(topic))
-    if partition_count != 1:
+    if partition_count == expected:
+        return
+    if expected == 1:
         raise PartitionCountError(
             f"Topic {topic!r} has {partition_count} partitions, but only topics with exactly 1 partition can be backed "
             "up. The schemas topic MUST have exactly 1 partition to ensure perfect ordering of schema updates."
         )
+    raise PartitionCountError(f"Topic {topic!r} has {partition_count} partitions, but the backup has {expected} partitions.")
 
 
 @contextlib.contextmanager
@@ -222,13 +237,14 @@ def _maybe_create_topic(
     config: Config,
     replication_factor: int,
     topic_configs: Mapping[str, str],
+    num_partitions: int = constants.SCHEMA_TOPIC_NUM_PARTITIONS,
 ) -> bool:
     """Returns True if topic creation was successful, False if topic already exists"""
     with _admin(config) as admin:
         try:
             admin.new_topic(
                 name,
-                num_partitions=constants.SCHEMA_TOPIC_NUM_PARTITIONS,
+                num_partitions=num_partitions,
                 replication_factor=replication_factor,
                 config=dict(topic_configs),
             )
@@ -239,7 +255,7 @@ def _maybe_create_topic(
         LOG.info(
             "Created topic %r (partition count: %s, replication factor: %s, config: %s)",
             name,
-            constants.SCHEMA_TOPIC_NUM_PARTITIONS,
+            num_partitions,
             replication_factor,
             topic_configs,
         )
@@ -262,16 +278,37 @@ def _consumer(config: Config, topic: str) -> Iterator[KafkaConsumer]:
 
 
 @contextlib.contextmanager
-def _producer(config: Config, topic: str) -> Iterator[KafkaProducer]:
+def _partition_consumer(
+    config: Config,
+    topic_partition: TopicPartition,
+    from_offset: int | None = None,
+) -> Iterator[KafkaConsumer]:
+    """Creates an automatically closing Kafka consumer client assigned to a single partition.
+
+    :param config: for the client.
+    :param topic_partition: to consume from.
+    :param from_offset: to start consuming at, defaults to the beginning of the partition.
+    :raises Exception: if client creation fails, concrete exception types are unknown, see Kafka implementation.
+    """
+
+    with kafka_consumer_from_config(config, None) as consumer:
+        offset = OFFSET_BEGINNING if from_offset is None else from_offset
+        consumer.assign([TopicPartition(topic_partition.topic, topic_partition.partition, offset)])
+        yield consumer
+
+
+@contextlib.contextmanager
+def _producer(config: Config, topic: str, partition_count: int = 1) -> Iterator[KafkaProducer]:
     """Creates an automatically closing Kafka producer client.
 
     :param config: for the client.
     :param topic: to produce to.
-    :raises PartitionCountError: if the topic does not have exactly one partition.
+    :param partition_count: expected number of partitions of the topic.
+    :raises PartitionCountError: if the topic does not have the expected number of partitions.
     :raises Exception: if client creation fails, concrete exception types are unknown, see Kafka implementation.
     """
     with kafka_producer_from_config(config) as producer:
-        __check_partition_count(topic, producer.partitions_for)
+        __check_partition_count(topic, producer.partitions_for, partition_count)
         yield producer
 
 
@@ -285,8 +322,18 @@ def _consume_records(
     consumer: KafkaConsumer,
     topic_partition: TopicPartition,
     poll_timeout: PollTimeout,
+    from_offset: int | None = None,
 ) -> Iterator[Message]:
     start_offset, end_offset = consumer.get_watermark_offsets(topic_partition)
+    if from_offset is not None:
+        # Records before the offset are already backed up, the ones between it
+        # and the start of the partition would be missing from the backup.
+        if from_offset < start_offset:
+            raise MissingRecordsError(
+                f"Records {from_offset:,} to {start_offset - 1:,} of topic partition {topic_partition.topic}:"
+                f"{topic_partition.partition} were deleted before being backed up, create a new backup instead."
+            )
+        start_offset = from_offset
     last_offset = start_offset
 
     LOG.info(
@@ -339,6 +386,7 @@ def _write_partition(
     with backend.safe_writer(file_path, allow_overwrite) as buffer:
         for record in _consume_records(consumer, topic_partition, poll_timeout):
             backend.store_record(buffer, record)
+        backend.end_partition(buffer, topic_partition.partition)
 
     filename = file_path.name if isinstance(file_path, Path) else file_path
     return backend.finalize_partition(
@@ -347,6 +395,188 @@ def _write_partition(
     )
 
 
+def _backup_partition(
+    config: Config,
+    path: Path,
+    backend: BackupWriter[B, F],
+    topic_partition: TopicPartition,
+    poll_timeout: PollTimeout,
+    allow_overwrite: bool,
+) -> F | None:
+    with _partition_consumer(config, topic_partition) as consumer:
+        try:
+            return _write_partition(
+                path=path,
+                backend=backend,
+                consumer=consumer,
+                topic_partition=topic_partition,
+                poll_timeout=poll_timeout,
+                allow_overwrite=allow_overwrite,
+            )
+        except EmptyPartition:
+            LOG.warning(
+                "Topic partition '%s' is empty, only backing up metadata.",
+                topic_partition,
+            )
+            return None
+
+
+def _write_partitions(
+    config: Config,
+    path: Path | StdOut,
+    backend: BackupWriter[B, F],
+    topic_name: str,
+    partitions: Sequence[int],
+    poll_timeout: PollTimeout,
+    allow_overwrite: bool,
+    parallelism: int,
+) -> list[F]:
+    """Backs up up to ``parallelism`` partitions of a topic concurrently, one consumer and data file per partition."""
+    assert isinstance(path, Path)
+    LOG.info("Backing up %s partitions with parallelism %s.", len(partitions), parallelism)
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="karapace_backup") as executor:
+        futures = [
+            executor.submit(
+                _backup_partition,
+                config,
+                path,
+                backend,
+                TopicPartition(topic_name, partition),
+                poll_timeout,
+                allow_overwrite,
+            )
+            for partition in partitions
+        ]
+        data_files = [future.result() for future in futures]
+    return [data_file for data_file in data_files if data_file is not None]
+
+
+def _backup_partition_chain(
+    config: Config,
+    path: Path,
+    backend: SchemaBackupV3Writer,
+    topic_partition: TopicPartition,
+    from_offset: int | None,
+    poll_timeout: PollTimeout,
+    records_per_data_file: int | None,
+    store_checkpoint: Callable[[DataFile | None], None],
+) -> None:
+    """Backs up the records of a partition from the given offset into chained data files.
+
+    A checkpoint is stored after each data file, data files are split after
+    ``records_per_data_file`` records so that checkpoints are taken regularly.
+    """
+    with _partition_consumer(config, topic_partition, from_offset) as consumer:
+        records = _consume_records(consumer, topic_partition, poll_timeout, from_offset)
+        try:
+            record = next(records, None)
+        except EmptyPartition:
+            LOG.info("Topic partition '%s' has no new records to back up.", topic_partition)
+            return
+
+        while record is not None:
+            file_path = backend.start_partition(
+                path=path,
+                topic_name=topic_partition.topic,
+                index=topic_partition.partition,
+                start_offset=record.offset(),
+            )
+            # A data file left behind by an interrupted run is not part of the
+            # stored metadata, and is overwritten.
+            with backend.safe_writer(file_path, True) as buffer:
+                records_written = 0
+                while record is not None and (records_per_data_file is None or records_written < records_per_data_file):
+                    backend.store_record(buffer, record)
+                    records_written += 1
+                    record = next(records, None)
+                backend.end_partition(buffer, topic_partition.partition)
+            store_checkpoint(backend.finalize_partition(index=topic_partition.partition, filename=file_path.name))
+
+
+def _create_incremental_backup(
+    config: Config,
+    backup_location: Path,
+    topic_name: TopicName,
+    backend: SchemaBackupV3Writer,
+    poll_timeout: PollTimeout,
+    replication_factor: int,
+    records_per_data_file: int | None,
+    parallelism: int,
+) -> None:
+    """Backs up the records of a topic that are not yet part of the V3 backup at the location.
+
+    The backup is updated in place, new records are written to data files chained
+    to the ones of the existing backup, starting after their end offsets. Metadata
+    is stored as a checkpoint after every data file, so an interrupted backup is
+    resumed from the last checkpoint by running it again.
+    """
+    metadata_path = backup_location / f"{topic_name}.metadata"
+    start_time = datetime.datetime.now(datetime.timezone.utc)
+    data_files: list[DataFile] = []
+    if metadata_path.exists():
+        previous_metadata = SchemaBackupV3Reader().read_metadata(metadata_path)
+        if previous_metadata.checksum_algorithm is ChecksumAlgorithm.unknown:
+            raise BackupError("Cannot extend a backup that uses an unknown checksum algorithm.")
+        start_time = previous_metadata.started_at
+        data_files.extend(previous_metadata.data_files)
+    else:
+        backup_location.mkdir(parents=True, exist_ok=True)
+
+    from_offsets: dict[int, int] = {}
+    for data_file in data_files:
+        from_offsets[data_file.partition] = max(from_offsets.get(data_file.partition, 0), data_file.end_offset + 1)
+
+    with _admin(config) as admin:
+        topic_configurations = get_topic_configurations(
+            admin=admin,
+            topic_name=topic_name,
+            config_source_filter={ConfigSource.DYNAMIC_TOPIC_CONFIG},
+        )
+        topic_metadata = admin.cluster_metadata([topic_name])["topics"][topic_name]
+        partitions = sorted(partition["partition"] for partition in topic_metadata["partitions"])
+
+    lock = threading.Lock()
+
+    def store_checkpoint(data_file: DataFile | None) -> None:
+        with lock:
+            if data_file is not None:
+                data_files.append(data_file)
+            backend.store_metadata(
+                path=backup_location,
+                topic_name=topic_name,
+                topic_id=None,
+                started_at=start_time,
+                finished_at=datetime.datetime.now(datetime.timezone.utc),
+                partition_count=len(partitions),
+                replication_factor=replication_factor,
+                topic_configurations=topic_configurations,
+                data_files=data_files,
+                checkpoint=True,
+            )
+
+    LOG.info("Backing up %s partitions with parallelism %s.", len(partitions), parallelism)
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="karapace_backup") as executor:
+        futures = [
+            executor.submit(
+                _backup_partition_chain,
+                config,
+                backup_location,
+                backend,
+                TopicPartition(topic_name, partition),
+                from_offsets.get(partition),
+                poll_timeout,
+                records_per_data_file,
+                store_checkpoint,
+            )
+            for partition in partitions
+        ]
+        for future in futures:
+            future.result()
+
+    # Also stores metadata when there were no new records.
+    store_checkpoint(None)
+
+
 def _handle_restore_topic_legacy(
     instruction: RestoreTopicLegacy,
     config: Config,
@@ -388,13 +618,14 @@ def _handle_restore_topic(
         name=instruction.topic_name,
         replication_factor=repl_factor,
         topic_configs=instruction.topic_configs,
+        num_partitions=instruction.partition_count,
     ):
         raise BackupTopicAlreadyExists(f"Topic to restore '{instruction.topic_name}' already exists")
 
 
 def _handle_producer_send(
     instruction: ProducerSend,
-    producer: KafkaProducer,
+    producer: RestoreProducer,
     producer_callback: Callable[[Future], None],
 ) -> None:
     LOG.debug(
@@ -428,19 +659,146 @@ def _handle_producer_send(
             break
 
 
+def _record_size(instruction: ProducerSend) -> int:
+    return sum(len(field) for field in (instruction.key, instruction.value) if field is not None)
+
+
+@contextlib.contextmanager
+def _dry_run_producer() -> Iterator[DryRunProducer]:
+    producer = DryRunProducer()
+    yield producer
+    producer.flush()
+
+
+def _restore_producer(
+    config: Config,
+    topic: str,
+    partition_count: int,
+    dry_run: bool,
+) -> contextlib.AbstractContextManager[RestoreProducer]:
+    if dry_run:
+        return _dry_run_producer()
+    return _producer(config, topic, partition_count)
+
+
+def _restore_instructions(
+    producer_context: contextlib.AbstractContextManager[RestoreProducer],
+    instructions: Iterator[Instruction],
+    options: PipelineOptions,
+    progress: RestoreProgress,
+) -> None:
+    """Producer stage of the restore pipeline.
+
+    Instructions are read ahead in a separate thread into a bounded queue. While the
+    window of records in flight is full, the producer is polled for delivery reports
+    instead of sending, otherwise it is polled after every ``poll_interval`` records.
+    """
+    # Stores the latest exception raised by the error callback set on producer.send()
+    producer_exception: BaseException | None = None
+    window = InFlightWindow(max_records=options.max_in_flight_records, max_bytes=options.max_in_flight_bytes)
+
+    def _producer_callback(size: int, future: Future) -> None:
+        nonlocal producer_exception
+        window.remove(size)
+        exception = future.exception()
+        if exception is not None:
+            LOG.error("Producer error", exc_info=exception)
+            producer_exception = exception
+        else:
+            progress.add(size)
+
+    def _check_producer_exception() -> None:
+        if producer_exception is not None:
+            raise BackupDataRestorationError("Error while producing restored messages") from producer_exception
+
+    with producer_context as producer, contextlib.closing(read_ahead(instructions, options.queue_size)) as stream:
+        for sent, instruction in enumerate(stream, start=1):
+            if not isinstance(instruction, ProducerSend):
+                raise RuntimeError("Backend sent a topic instruction after records.")
+            while window.is_full():
+                producer.poll(timeout=0.1)
+                _check_producer_exception()
+            size = _record_size(instruction)
+            window.add(size)
+            _handle_producer_send(instruction, producer, partial(_producer_callback, size))
+            if sent % options.poll_interval == 0:
+                producer.poll(timeout=0)
+            # Immediately check if producer.send() generated an exception. This call is
+            # only an optimization, as producing is asynchronous and no sends might
+            # have been executed once we reach this line.
+            _check_producer_exception()
+
+    # Check if an exception was raised after the producer was flushed and closed
+    # by its context manager. As opposed to the previous call, this one is
+    # essential for correct behavior, as when we reach this point the producer
+    # can no longer be sending messages.
+    _check_producer_exception()
+
+
+def _restore_data_files(
+    backend: SchemaBackupV3Reader,
+    config: Config,
+    backup_location: ExistingFile,
+    topic_name: TopicName,
+    skip_topic_creation: bool,
+    override_replication_factor: int | None,
+    parallelism: int,
+    options: PipelineOptions,
+    progress: RestoreProgress,
+    dry_run: bool,
+) -> None:
+    restore_topic, data_files = backend.read_data_files(backup_location, topic_name)
+    if not dry_run:
+        _handle_restore_topic(restore_topic, config, skip_topic_creation, override_replication_factor)
+
+    LOG.info("Restoring %s partitions with parallelism %s.", len(data_files), parallelism)
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="karapace_restore") as executor:
+        futures = [
+            executor.submit(
+                _restore_instructions,
+                _restore_producer(config, restore_topic.topic_name, restore_topic.partition_count, dry_run),
+                data_file,
+                options,
+                progress,
+            )
+            for data_file in data_files
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            # Data files that have not started yet are not restored after a failure.
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
 def restore_backup(
     config: Config,
     backup_location: ExistingFile,
     topic_name: TopicName,
     skip_topic_creation: bool = False,
     override_replication_factor: int | None = None,
+    parallelism: int = 1,
+    pipeline: PipelineOptions = PipelineOptions(),
+    dry_run: bool = False,
 ) -> None:
     """Restores a backup from the specified location into the configured topic.
 
+    Records are read ahead of a producer with a bounded window of records in
+    flight, and progress is reported to the log and statsd.
+
+    :param parallelism: maximum number of partitions restored concurrently,
+        only has an effect on V3 backups, which store data files per partition.
+    :param pipeline: sizes of the read ahead queue and the in-flight window.
+    :param dry_run: replay the backup against a local stand-in producer instead
+        of Kafka, to measure restore throughput. No topic is created.
     :raises Exception: if production fails, concrete exception types are unknown,
         see Kafka implementation.
     :raises BackupTopicAlreadyExists: if backup version is V3 and topic already exists
     """
+    if parallelism < 1:
+        raise ValueError("Restore parallelism must be at least 1.")
+
     key_formatter = (
         KeyFormatter() if topic_name == constants.DEFAULT_SCHEMA_TOPIC or config.get("force_key_correction", False) else None
     )
@@ -457,50 +815,53 @@ def restore_backup(
     )
 
     LOG.info("Identified backup backend: %s", backend.__class__.__name__)
-    LOG.info("Starting backup restore for topic: %r", topic_name)
-
-    # Stores the latest exception raised by the error callback set on producer.send()
-    _producer_exception = None
-
-    # We set up an ExitStack context, so that we can enter the producer context only
-    # after processing a RestoreTopic instruction.
-    with contextlib.ExitStack() as stack:
-        producer = None
-
-        def _producer_callback(future: Future) -> None:
-            exception = future.exception()
-            if exception is not None:
-                LOG.error("Producer error", exc_info=exception)
-                nonlocal _producer_exception
-                _producer_exception = exception
-
-        def _check_producer_exception() -> None:
-            if _producer_exception is not None:
-                raise BackupDataRestorationError("Error while producing restored messages") from _producer_exception
-
-        for instruction in backend.read(backup_location, topic_name):
+    LOG.info("Starting backup restore for topic: %r%s", topic_name, " (dry run)" if dry_run else "")
+
+    stats = StatsClient(config=config)
+    progress = RestoreProgress(
+        topic_name=topic_name,
+        # Only V3 backups know the number of records upfront.
+        total_records=(
+            backend.read_metadata(backup_location).record_count if isinstance(backend, SchemaBackupV3Reader) else None
+        ),
+        interval=pipeline.progress_interval,
+        stats=stats,
+    )
+    try:
+        if isinstance(backend, SchemaBackupV3Reader):
+            _restore_data_files(
+                backend=backend,
+                config=config,
+                backup_location=backup_location,
+                topic_name=topic_name,
+                skip_topic_creation=skip_topic_creation,
+                override_replication_factor=override_replication_factor,
+                parallelism=parallelism,
+                options=pipeline,
+                progress=progress,
+                dry_run=dry_run,
+            )
+        else:
+            instructions = backend.read(backup_location, topic_name)
+            instruction = next(instructions, None)
             if isinstance(instruction, RestoreTopicLegacy):
-                _handle_restore_topic_legacy(instruction, config, skip_topic_creation)
-                producer = stack.enter_context(_producer(config, instruction.topic_name))
+                if not dry_run:
+                    _handle_restore_topic_legacy(instruction, config, skip_topic_creation)
+                producer_context = _restore_producer(config, instruction.topic_name, 1, dry_run)
             elif isinstance(instruction, RestoreTopic):
-                _handle_restore_topic(instruction, config, skip_topic_creation, override_replication_factor)
-                producer = stack.enter_context(_producer(config, instruction.topic_name))
+                if not dry_run:
+                    _handle_restore_topic(instruction, config, skip_topic_creation, override_replication_factor)
+                producer_context = _restore_producer(config, instruction.topic_name, instruction.partition_count, dry_run)
             elif isinstance(instruction, ProducerSend):
-                if producer is None:
-                    raise RuntimeError("Backend has not yet sent RestoreTopic.")
-                _handle_producer_send(instruction, producer, _producer_callback)
-                # Immediately check if producer.send() generated an exception. This call is
-                # only an optimization, as producing is asynchronous and no sends might
-                # have been executed once we reach this line.
-                _check_producer_exception()
+                raise RuntimeError("Backend has not yet sent RestoreTopic.")
+            elif instruction is None:
+                return
             else:
                 assert_never(instruction)
-
-    # Check if an exception was raised after the producer was flushed and closed
-    # by `kafka_producer_from_config` context manager. As opposed to the previous
-    # call, this one is essential for correct behavior, as when we reach this point the
-    # producer can no longer be sending messages (it has been flushed and closed).
-    _check_producer_exception()
+            _restore_instructions(producer_context, instructions, pipeline, progress)
+    finally:
+        progress.report()
+        stats.close()
 
 
 def create_backup(
@@ -512,10 +873,17 @@ def create_backup(
     poll_timeout: PollTimeout = PollTimeout.default(),
     overwrite: bool = False,
     replication_factor: int | None = None,
+    compression: CompressionCodec | None = None,
+    compression_block_size: int = DEFAULT_COMPRESSION_BLOCK_SIZE,
+    incremental: bool = False,
+    records_per_data_file: int | None = None,
+    parallelism: int = 1,
 ) -> None:
     """Creates a backup of the configured topic.
 
-    :param version: Specifies which format version to use for the backup.
+    :param version: Specifies which format version to use for the backup. Version 3
+        backs up the partitions of the topic concurrently, one data file per partition,
+        earlier versions only support topics with a single partition.
     :param poll_timeout: specifies the maximum time to wait for receiving records,
         if not records are received within that time and the target offset has not
         been reached an exception is raised. Defaults to one minute.
@@ -523,6 +891,16 @@ def create_backup(
     :param replication_factor: Value will be stored in metadata, and used when
         creating topic during restoration. This is required for Version 3 backup,
         but has no effect on earlier versions, as they don't handle metadata.
+    :param compression: Codec to compress the data files with, only supported by
+        Version 3. Records are compressed in blocks of ``compression_block_size``
+        uncompressed bytes.
+    :param incremental: Extend the Version 3 backup at the location in place with
+        the records produced since it was taken, or create it if it does not exist.
+        Interrupted incremental backups are resumed by running them again.
+    :param records_per_data_file: Split the data files of an incremental backup
+        after this many records, storing a resumable checkpoint after each.
+    :param parallelism: maximum number of partitions backed up concurrently, each
+        with its own consumer. Only has an effect on Version 3 backups.
 
     :raises Exception: if consumption fails, concrete exception types are unknown,
         see Kafka implementation.
@@ -537,9 +915,45 @@ def create_backup(
         raise RuntimeError("Backup format version 3 does not support writing to stdout.")
     if version is BackupVersion.V3 and replication_factor is None:
         raise RuntimeError("Backup format version 3 needs a replication factor to be specified.")
+    if version is not BackupVersion.V3 and compression is not None:
+        raise RuntimeError("Only backup format version 3 supports compression.")
+    if version is not BackupVersion.V3 and incremental:
+        raise RuntimeError("Only backup format version 3 supports incremental backups.")
+    if not incremental and records_per_data_file is not None:
+        raise RuntimeError("Only incremental backups can split data files.")
+    if records_per_data_file is not None and records_per_data_file < 1:
+        raise ValueError("Records per data file must be at least one.")
+    if parallelism < 1:
+        raise ValueError("Backup parallelism must be at least 1.")
 
     start_time = datetime.datetime.now(datetime.timezone.utc)
-    backend = version.writer()
+    backend = (
+        SchemaBackupV3Writer(compression=compression, compression_block_size=compression_block_size)
+        if version is BackupVersion.V3
+        else version.writer()
+    )
+
+    if incremental:
+        assert isinstance(backend, SchemaBackupV3Writer)
+        assert isinstance(backup_location, Path) and replication_factor is not None
+        LOG.info("Started incremental backup of topic '%s'.", topic_name)
+        _create_incremental_backup(
+            config=config,
+            backup_location=backup_location,
+            topic_name=topic_name,
+            backend=backend,
+            poll_timeout=poll_timeout,
+            replication_factor=replication_factor,
+            records_per_data_file=records_per_data_file,
+            parallelism=parallelism,
+        )
+        LOG.info(
+            "Finished incremental backup of '%s' to %s after %s seconds.",
+            topic_name,
+            backup_location,
+            math.ceil((datetime.datetime.now(datetime.timezone.utc) - start_time).total_seconds()),
+        )
+        return
 
     with backend.prepare_location(backup_location) as prepared_location:
         LOG.info(
@@ -553,35 +967,42 @@ def create_backup(
                 topic_name=topic_name,
                 config_source_filter={ConfigSource.DYNAMIC_TOPIC_CONFIG},
             )
-
-        # Note: It's expected that we at some point want to introduce handling of
-        # multi-partition topics here. The backend interface is built with that in
-        # mind, so that .store_metadata() accepts a sequence of data files.
-        with _consumer(config, topic_name) as consumer:
-            (partition,) = consumer.partitions_for_topic(topic_name)
-            topic_partition = TopicPartition(topic_name, partition)
-
-            try:
-                data_file = _write_partition(
-                    path=prepared_location,
-                    backend=backend,
-                    consumer=consumer,
-                    topic_partition=topic_partition,
-                    poll_timeout=poll_timeout,
-                    allow_overwrite=overwrite,
-                )
-            except EmptyPartition:
-                if version is not BackupVersion.V3:
+            topic_metadata = admin.cluster_metadata([topic_name])["topics"][topic_name]
+            partitions = sorted(partition["partition"] for partition in topic_metadata["partitions"])
+
+        if version is BackupVersion.V3:
+            data_files = _write_partitions(
+                config=config,
+                path=prepared_location,
+                backend=backend,
+                topic_name=topic_name,
+                partitions=partitions,
+                poll_timeout=poll_timeout,
+                allow_overwrite=overwrite,
+                parallelism=parallelism,
+            )
+        else:
+            with _consumer(config, topic_name) as consumer:
+                (partition,) = consumer.partitions_for_topic(topic_name)
+                topic_partition = TopicPartition(topic_name, partition)
+
+                try:
+                    data_files = [
+                        _write_partition(
+                            path=prepared_location,
+                            backend=backend,
+                            consumer=consumer,
+                            topic_partition=topic_partition,
+                            poll_timeout=poll_timeout,
+                            allow_overwrite=overwrite,
+                        )
+                    ]
+                except EmptyPartition:
                     LOG.warning(
                         "Topic partition '%s' is empty, nothing to back up.",
                         topic_partition,
                     )
                     return
-                LOG.warning(
-                    "Topic partition '%s' is empty, only backing up metadata.",
-                    topic_partition,
-                )
-                data_file = None
 
         end_time = datetime.datetime.now(datetime.timezone.utc)
         backend.store_metadata(
@@ -590,10 +1011,10 @@ def create_backup(
             topic_id=None,
             started_at=start_time,
             finished_at=end_time,
-            partition_count=1,
+            partition_count=len(partitions),
             replication_factor=replication_factor if replication_factor is not None else config["replication_factor"],
             topic_configurations=topic_configurations,
-            data_files=[data_file] if data_file else [],
+            data_files=data_files,
         )
 
     LOG.info(
@@ -643,6 +1064,7 @@ def inspect(backup_location: ExistingFile) -> None:
                 "record_count": data_file.record_count,
                 "start_offset": data_file.start_offset,
                 "end_offset": data_file.end_offset,
+                "compression": None if data_file.compression is None else data_file.compression.value,
             }
             for data_file in metadata.data_files
         ),
@@ -656,7 +1078,7 @@ class VerifyLevel(enum.Enum):
     record = "record"
 
 
-def verify(backup_location: ExistingFile, level: VerifyLevel) -> None:
+def verify(backup_location: ExistingFile, level: VerifyLevel, workers: int | None = None) -> None:
     console = Console()
     error_console = Console(stderr=True)
 
@@ -672,9 +1094,9 @@ def verify(backup_location: ExistingFile, level: VerifyLevel) -> None:
     assert isinstance(backend, SchemaBackupV3Reader)
 
     if level is VerifyLevel.file:
-        results = backend.verify_files(backup_location)
+        results = backend.verify_files(backup_location, workers=workers)
     elif level is VerifyLevel.record:
-        results = backend.verify_records(backup_location)
+        results = backend.verify_records(backup_location, workers=workers)
     else:
         assert_never(level)
 
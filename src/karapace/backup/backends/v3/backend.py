@@ -5,11 +5,14 @@ See LICENSE for details
 from __future__ import annotations
 
 from .checksum import RunningChecksum
+from .compression import compress
+from .constants import DEFAULT_COMPRESSION_BLOCK_SIZE
 from .errors import DecodeError, InconsistentOffset, InvalidChecksum, OffsetMismatch, UnknownChecksumAlgorithm
-from .readers import read_metadata, read_records
-from .schema import ChecksumAlgorithm, DataFile, Header, Metadata, Record
-from .writers import write_metadata, write_record
+from .readers import mapped_file, read_block_record_views, read_metadata, read_record_views, RecordView
+from .schema import ChecksumAlgorithm, CompressionCodec, DataFile, Header, Metadata, Record
+from .writers import write_block, write_metadata, write_record
 from collections.abc import Generator, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from confluent_kafka import Message
 from dataclasses import dataclass
 from karapace.backup.backends.reader import BaseBackupReader, Instruction, ProducerSend, RestoreTopic
@@ -64,6 +67,41 @@ def _peek(iterator: Iterator[T]) -> tuple[T | None, Iterator[T]]:
     return first, itertools.chain((first,), iterator)
 
 
+def _producer_sends(records: Iterator[RecordView], topic_name: str, data_file: DataFile) -> Iterator[ProducerSend]:
+    """Copy the records out of the data file and verify they match its start and end offsets.
+
+    Kafka clients only accept the key and value as bytes. No view into the data file
+    is referenced once all records are consumed, so the file can be unmapped.
+    """
+    record, records = _peek(records)
+
+    # Verify first record matches start offset from data file.
+    if record is not None and record.offset != data_file.start_offset:
+        raise OffsetMismatch(
+            f"First record in data file does not match expected "
+            f"start_offset (expected: {data_file.start_offset}, "
+            f"actual: {record.offset})."
+        )
+
+    for record in records:
+        yield ProducerSend(
+            value=None if record.value is None else bytes(record.value),
+            key=None if record.key is None else bytes(record.key),
+            headers=record.headers,
+            timestamp=record.timestamp,
+            topic_name=topic_name,
+            partition_index=data_file.partition,
+        )
+
+    # Verify last record matches end offset from data file.
+    if record is not None and record.offset != data_file.end_offset:
+        raise OffsetMismatch(
+            f"Last record in data file does not match expected "
+            f"end_offset (expected: {data_file.end_offset}, "
+            f"actual: {record.offset})."
+        )
+
+
 class SchemaBackupV3Reader(BaseBackupReader):
     def _read_data_file(
         self,
@@ -71,45 +109,36 @@ class SchemaBackupV3Reader(BaseBackupReader):
         metadata: Metadata,
         data_file: DataFile,
     ) -> Iterator[ProducerSend]:
-        running_checksum = _get_checksum_implementation(metadata.checksum_algorithm)()
-
-        with path.open("rb") as data_buffer:
-            record, records = _peek(
-                read_records(
-                    buffer=data_buffer,
-                    num_records=data_file.record_count,
-                    running_checksum=running_checksum,
-                )
-            )
-
-            # Verify first record matches start offset from data file.
-            if record is not None and record.offset != data_file.start_offset:
-                raise OffsetMismatch(
-                    f"First record in data file does not match expected "
-                    f"start_offset (expected: {data_file.start_offset}, "
-                    f"actual: {record.offset})."
-                )
-
-            for record in records:
-                yield ProducerSend(
-                    value=record.value,
-                    key=record.key,
-                    headers=tuple((header.key, header.value) for header in record.headers),
-                    timestamp=record.timestamp,
-                    topic_name=metadata.topic_name,
-                    partition_index=data_file.partition,
-                )
-
-        # Verify last record matches end offset from data file.
-        if record is not None and record.offset != data_file.end_offset:
-            raise OffsetMismatch(
-                f"Last record in data file does not match expected "
-                f"end_offset (expected: {data_file.end_offset}, "
-                f"actual: {record.offset})."
+        checksum_implementation = _get_checksum_implementation(metadata.checksum_algorithm)
+        running_checksum = checksum_implementation()
+        # The checksum of a compressed data file covers the file as stored, rather
+        # than the uncompressed envelopes.
+        file_checksum = running_checksum if data_file.compression is None else checksum_implementation()
+
+        with mapped_file(path) as data_view:
+            yield from _producer_sends(
+                records=(
+                    read_record_views(
+                        view=data_view,
+                        num_records=data_file.record_count,
+                        running_checksum=running_checksum,
+                    )
+                    if data_file.compression is None
+                    else read_block_record_views(
+                        view=data_view,
+                        num_records=data_file.record_count,
+                        running_checksum=running_checksum,
+                        file_checksum=file_checksum,
+                        codec=data_file.compression,
+                        checksum_implementation=checksum_implementation,
+                    )
+                ),
+                topic_name=metadata.topic_name,
+                data_file=data_file,
             )
 
         # Verify checksum matches.
-        if running_checksum.digest() != data_file.checksum:
+        if file_checksum.digest() != data_file.checksum:
             raise InvalidChecksum("Found checksum mismatch after reading full data file.")
 
     # Not part of common interface, because it exposes Metadata which is
@@ -118,7 +147,17 @@ class SchemaBackupV3Reader(BaseBackupReader):
         with path.open("rb") as buffer:
             return read_metadata(buffer)
 
-    def read(self, path: Path, topic_name: str) -> Iterator[Instruction]:
+    # Not part of common interface, because data files can only be restored
+    # independently of each other with V3.
+    def read_data_files(self, path: Path, topic_name: str) -> tuple[RestoreTopic, Sequence[Iterator[ProducerSend]]]:
+        """Return the topic restore instruction and a lazy instruction stream per partition.
+
+        Each data file holds the records of a single partition, and incremental
+        backups chain several data files per partition. The data files of a
+        partition are replayed in offset order within its stream, so the
+        streams can be replayed concurrently without affecting the order of
+        records within a partition.
+        """
         metadata = self.read_metadata(path)
 
         if topic_name != metadata.topic_name:
@@ -127,58 +166,117 @@ class SchemaBackupV3Reader(BaseBackupReader):
         if metadata.checksum_algorithm is ChecksumAlgorithm.unknown:
             raise UnknownChecksumAlgorithm("Tried restoring from a backup with an unknown checksum algorithm.")
 
-        yield RestoreTopic(
+        restore_topic = RestoreTopic(
             topic_name=topic_name,
             partition_count=metadata.partition_count,
             replication_factor=metadata.replication_factor,
             topic_configs=metadata.topic_configurations,
         )
+        chains: dict[int, list[DataFile]] = {}
+        for data_file in sorted(metadata.data_files, key=lambda data_file: (data_file.partition, data_file.start_offset)):
+            chain = chains.setdefault(data_file.partition, [])
+            if chain and data_file.start_offset <= chain[-1].end_offset:
+                raise OffsetMismatch(
+                    f"Data file {data_file.filename} overlaps with data file {chain[-1].filename} "
+                    f"(start_offset: {data_file.start_offset}, previous end_offset: {chain[-1].end_offset})."
+                )
+            chain.append(data_file)
 
-        for data_file in metadata.data_files:
-            yield from self._read_data_file(
-                path=(path.parent / data_file.filename),
-                metadata=metadata,
-                data_file=data_file,
+        partition_streams = tuple(
+            itertools.chain.from_iterable(
+                self._read_data_file(
+                    path=(path.parent / data_file.filename),
+                    metadata=metadata,
+                    data_file=data_file,
+                )
+                for data_file in chain
             )
+            for chain in chains.values()
+        )
+        return restore_topic, partition_streams
+
+    def read(self, path: Path, topic_name: str) -> Iterator[Instruction]:
+        restore_topic, data_files = self.read_data_files(path, topic_name)
+        yield restore_topic
+        for data_file in data_files:
+            yield from data_file
+
+    def _verify(
+        self,
+        path: Path,
+        verify_data_file: Callable[[Path, int], _VerifyOutcome],
+        workers: int | None,
+    ) -> Generator[VerifyResult, None, None]:
+        metadata = self.read_metadata(path)
+        indices = range(len(metadata.data_files))
+        # Data files are verified independently of each other, results are
+        # yielded in the order of the data files in the metadata.
+        if workers == 1 or len(indices) <= 1:
+            outcomes: Iterator[_VerifyOutcome] = map(verify_data_file, itertools.repeat(path), indices)
+            for data_file, (intact, exception) in zip(metadata.data_files, outcomes):
+                yield _verify_result(data_file, intact, exception)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = executor.map(verify_data_file, itertools.repeat(path), indices)
+            for data_file, (intact, exception) in zip(metadata.data_files, outcomes):
+                yield _verify_result(data_file, intact, exception)
 
     # Not part of common interface, because it exposes DataFile which is
     # specific to V3.
-    def verify_files(self, path: Path) -> Generator[VerifyResult, None, None]:
-        metadata = self.read_metadata(path)
+    def verify_files(self, path: Path, workers: int | None = None) -> Generator[VerifyResult, None, None]:
+        """Verify the checksum of each data file, in a pool of `workers` processes.
 
-        for data_file in metadata.data_files:
-            checksum = _get_checksum_implementation(metadata.checksum_algorithm)()
-            with (path.parent / data_file.filename).open("rb") as buffer:
-                while True:
-                    chunk = buffer.read(io.DEFAULT_BUFFER_SIZE)
-                    if not chunk:
-                        break
-                    checksum.update(chunk)
-            yield (
-                VerifySuccess(data_file=data_file)
-                if checksum.digest() == data_file.checksum
-                else VerifyFailure(
-                    data_file=data_file,
-                    exception=None,
-                )
-            )
+        The number of workers defaults to the number of CPUs, with a single worker
+        the data files are verified in the calling process.
+        """
+        return self._verify(path, _verify_data_file_checksum, workers)
 
     # Not part of common interface, because it exposes DataFile which is
     # specific to V3.
-    def verify_records(self, path: Path) -> Generator[VerifyResult, None, None]:
-        metadata = self.read_metadata(path)
+    def verify_records(self, path: Path, workers: int | None = None) -> Generator[VerifyResult, None, None]:
+        """Verify that each data file is fully parsable, and that its checksums, record
+        count and offsets match its metadata, in a pool of `workers` processes.
+        """
+        return self._verify(path, _verify_data_file_records, workers)
 
-        for data_file in metadata.data_files:
-            try:
-                for _ in self.read(path, metadata.topic_name):
-                    pass
-            except DecodeError as exception:
-                yield VerifyFailure(
-                    data_file=data_file,
-                    exception=exception,
-                )
-            else:
-                yield VerifySuccess(data_file=data_file)
+
+# Whether the data file is intact, and the error found while decoding it.
+_VerifyOutcome: TypeAlias = "tuple[bool, DecodeError | None]"
+
+
+def _verify_result(data_file: DataFile, intact: bool, exception: DecodeError | None) -> VerifyResult:
+    if intact:
+        return VerifySuccess(data_file=data_file)
+    return VerifyFailure(data_file=data_file, exception=exception)
+
+
+# The functions below run in worker processes, so they only get the metadata path
+# and the index of the data file to verify, which are cheap to pickle.
+
+
+def _verify_data_file_checksum(path: Path, index: int) -> _VerifyOutcome:
+    metadata = SchemaBackupV3Reader().read_metadata(path)
+    data_file = metadata.data_files[index]
+    checksum = _get_checksum_implementation(metadata.checksum_algorithm)()
+    with mapped_file(path.parent / data_file.filename) as data_view:
+        checksum.update(data_view)
+    return checksum.digest() == data_file.checksum, None
+
+
+def _verify_data_file_records(path: Path, index: int) -> _VerifyOutcome:
+    reader = SchemaBackupV3Reader()
+    metadata = reader.read_metadata(path)
+    data_file = metadata.data_files[index]
+    try:
+        for _ in reader._read_data_file(  # pylint: disable=protected-access
+            path=path.parent / data_file.filename,
+            metadata=metadata,
+            data_file=data_file,
+        ):
+            pass
+    except DecodeError as exception:
+        return False, exception
+    return True, None
 
 
 # Note: Because the underlying checksum API is mutable, it doesn't make sense to attempt
@@ -191,6 +289,10 @@ class _PartitionStats:
     records_written_since_checkpoint: int = 0
     min_offset: int | None = None
     max_offset: int | None = None
+    # Only set when compressing, the envelopes of the block being filled and the
+    # checksum of the data file as stored.
+    block: io.BytesIO | None = None
+    file_checksum: RunningChecksum | None = None
 
     def get_checkpoint(
         self,
@@ -233,10 +335,16 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
         checksum_algorithm: ChecksumAlgorithm = ChecksumAlgorithm.xxhash3_64_be,
         max_records_per_checkpoint: int = 100,
         max_bytes_per_checkpoint: int = 16_384,
+        compression: CompressionCodec | None = None,
+        compression_block_size: int = DEFAULT_COMPRESSION_BLOCK_SIZE,
     ) -> None:
+        if compression_block_size < 1:
+            raise ValueError("Compression block size must be at least one byte")
         self._checksum_implementation: Final = _get_checksum_implementation(checksum_algorithm)
         self._max_records_per_checkpoint: Final = max_records_per_checkpoint
         self._max_bytes_per_checkpoint: Final = max_bytes_per_checkpoint
+        self._compression: Final = compression
+        self._compression_block_size: Final = compression_block_size
         self._partition_stats: Final[dict[int, _PartitionStats]] = {}
 
     P = TypeVar("P", bound="StdOut | Path")
@@ -258,22 +366,49 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
         path: Path,
         topic_name: str,
         partition_index: int,
+        start_offset: int | None = None,
     ) -> Path:
         # Using colon (:) as delimiter, as this is not valid inside a topic name.
-        return path / f"{topic_name}:{partition_index}.data"
+        if start_offset is None:
+            return path / f"{topic_name}:{partition_index}.data"
+        # Chained data files of a partition are told apart by their first offset.
+        return path / f"{topic_name}:{partition_index}:{start_offset}.data"
 
     def start_partition(
         self,
         path: Path | StdOut,
         topic_name: str,
         index: int,
+        start_offset: int | None = None,
     ) -> Path:
         if not isinstance(path, Path):
             raise RuntimeError("Cannot use stdout with backup format V3")
         if index in self._partition_stats:
             raise RuntimeError(f"Already started backing up partition {index}")
-        self._partition_stats[index] = _PartitionStats(running_checksum=self._checksum_implementation())
-        return self._build_data_file_name(path, topic_name, index)
+        stats = _PartitionStats(running_checksum=self._checksum_implementation())
+        if self._compression is not None:
+            stats.block = io.BytesIO()
+            stats.file_checksum = self._checksum_implementation()
+        self._partition_stats[index] = stats
+        return self._build_data_file_name(path, topic_name, index, start_offset)
+
+    def _write_block(self, buffer: IO[bytes], stats: _PartitionStats) -> None:
+        assert self._compression is not None
+        assert stats.block is not None and stats.file_checksum is not None
+        with stats.block.getbuffer() as envelopes:
+            compressed = compress(self._compression, envelopes)
+        write_block(
+            buffer,
+            compressed=compressed,
+            block_checksum=self._checksum_implementation(),
+            running_checksum=stats.file_checksum,
+        )
+        stats.block = io.BytesIO()
+
+    def end_partition(self, buffer: IO[bytes], index: int) -> None:
+        stats = self._partition_stats[index]
+        if stats.block is not None and stats.block.tell() > 0:
+            self._write_block(buffer, stats)
 
     def finalize_partition(self, index: int, filename: str) -> DataFile:
         stats = self._partition_stats.pop(index)
@@ -282,13 +417,16 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
                 "Cannot call .finalize_partition() before storing partition records. "
                 "For empty topics, this method should never be called."
             )
+        if stats.block is not None and stats.block.tell() > 0:
+            raise RuntimeError("Cannot call .finalize_partition() before the last block is written by .end_partition()")
         return DataFile(
             filename=filename,
             partition=index,
-            checksum=stats.running_checksum.digest(),
+            checksum=(stats.running_checksum if stats.file_checksum is None else stats.file_checksum).digest(),
             record_count=stats.records_written,
             start_offset=stats.min_offset,
             end_offset=stats.max_offset,
+            compression=self._compression,
         )
 
     def store_metadata(
@@ -302,17 +440,29 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
         replication_factor: int,
         topic_configurations: Mapping[str, str],
         data_files: Sequence[DataFile],
+        checkpoint: bool = False,
     ) -> None:
+        """
+        With `checkpoint`, metadata is stored for the data files finalized so far while
+        other partitions are still being written, replacing earlier metadata. Data files
+        of a partition are chained, and must not overlap.
+        """
         assert isinstance(path, Path)
         metadata_path = path / f"{topic_name}.metadata"
 
-        if len(data_files) > 1:
-            raise RuntimeError("Cannot backup multi-partition topics")
+        if len({data_file.partition for data_file in data_files}) > partition_count:
+            raise RuntimeError("Cannot store more data files than the topic has partitions")
 
-        if self._partition_stats and data_files:
+        # Partitions that turned out to be empty are started but never finalized.
+        if not checkpoint and any(stats.records_written for stats in self._partition_stats.values()):
             raise RuntimeError("Cannot write metadata when not all partitions are finalized")
 
-        with bytes_writer(metadata_path, False) as buffer:
+        data_files = sorted(data_files, key=lambda data_file: (data_file.partition, data_file.start_offset))
+        for previous, current in zip(data_files, data_files[1:]):
+            if previous.partition == current.partition and current.start_offset <= previous.end_offset:
+                raise RuntimeError(f"Cannot store overlapping data files for partition {current.partition}")
+
+        with bytes_writer(metadata_path, checkpoint) as buffer:
             write_metadata(
                 buffer,
                 metadata=Metadata(
@@ -342,13 +492,15 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
             records_threshold=self._max_records_per_checkpoint,
             bytes_threshold=self._max_bytes_per_checkpoint,
         )
-        offset_start: Final = buffer.tell()
+        # When compressing, envelopes are collected into the current block.
+        target: Final = buffer if stats.block is None else stats.block
+        offset_start: Final = target.tell()
 
         record_key = record.key()
         record_value = record.value()
 
         write_record(
-            buffer,
+            target,
             record=Record(
                 key=record_key.encode() if isinstance(record_key, str) else record_key,
                 value=record_value.encode() if isinstance(record_value, str) else record_value,
@@ -360,6 +512,8 @@ class SchemaBackupV3Writer(BytesBackupWriter[DataFile]):
             running_checksum=stats.running_checksum,
         )
         stats.update(
-            bytes_offset=buffer.tell() - offset_start,
+            bytes_offset=target.tell() - offset_start,
             record_offset=record.offset(),
         )
+        if stats.block is not None and stats.block.tell() >= self._compression_block_size:
+            self._write_block(buffer, stats)
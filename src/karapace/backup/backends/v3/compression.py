@@ -0,0 +1,33 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from .errors import InvalidBlock
+from .schema import CompressionCodec
+from karapace.utils import assert_never
+
+import lz4.frame
+import zstandard
+
+
+def compress(codec: CompressionCodec, data: bytes | memoryview) -> bytes:
+    if codec is CompressionCodec.zstd:
+        return zstandard.ZstdCompressor().compress(data)
+    if codec is CompressionCodec.lz4:
+        return lz4.frame.compress(data)
+    assert_never(codec)
+
+
+def decompress(codec: CompressionCodec, data: bytes | memoryview) -> bytes:
+    """:raises InvalidBlock: if the data cannot be decompressed with the codec."""
+    try:
+        if codec is CompressionCodec.zstd:
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec is CompressionCodec.lz4:
+            return lz4.frame.decompress(data)
+    # lz4 signals corrupt frames with a RuntimeError.
+    except (zstandard.ZstdError, RuntimeError) as e:
+        raise InvalidBlock(f"Failed to decompress {codec.value} block.") from e
+    assert_never(codec)
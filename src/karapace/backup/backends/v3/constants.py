@@ -5,3 +5,6 @@ See LICENSE for details
 from typing import Final
 
 V3_MARKER: Final = b"/V3\n"
+
+# Uncompressed size at which a block of records is compressed and written out.
+DEFAULT_COMPRESSION_BLOCK_SIZE: Final = 262_144
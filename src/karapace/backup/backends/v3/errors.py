@@ -42,6 +42,14 @@ class OffsetMismatch(DecodeError, ValueError):
     pass
 
 
+class InvalidRecord(DecodeError, ValueError):
+    pass
+
+
+class InvalidBlock(DecodeError, ValueError):
+    pass
+
+
 class EncodeError(BackupError):
     pass
 
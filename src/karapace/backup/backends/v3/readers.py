@@ -5,14 +5,29 @@ See LICENSE for details
 from __future__ import annotations
 
 from .checksum import RunningChecksum
+from .compression import decompress
 from .constants import V3_MARKER
-from .errors import InvalidChecksum, InvalidHeader, TooFewRecords, TooManyRecords, UnexpectedEndOfData
-from .schema import Metadata, Record
-from collections.abc import Generator
+from .errors import (
+    InvalidBlock,
+    InvalidChecksum,
+    InvalidHeader,
+    InvalidRecord,
+    TooFewRecords,
+    TooManyRecords,
+    UnexpectedEndOfData,
+)
+from .schema import CompressionCodec, Metadata, MetadataExtension
+from collections.abc import Generator, Iterator
+from dataclasses import replace
 from karapace.avro_dataclasses.models import AvroModel
-from typing import IO, TypeVar
+from karapace.dataclasses import default_dataclass
+from pathlib import Path
+from typing import Callable, IO, TypeVar
 
+import contextlib
 import io
+import mmap
+import os
 import struct
 
 
@@ -29,65 +44,242 @@ M = TypeVar("M", bound=AvroModel)
 
 def read_sized(buffer: IO[bytes], type_: type[M]) -> M:
     size = read_uint32(buffer)
-    with io.BytesIO(buffer.read(size)) as view:
-        return type_.parse(view)
+    return type_.decode(buffer.read(size))
 
 
 def read_metadata(buffer: IO[bytes]) -> Metadata:
     header = buffer.read(4)
     if header != V3_MARKER:
         raise InvalidHeader(f"Expected to read V3 header in metadata file, found: {header!r}")
-    return read_sized(buffer, Metadata)
+    metadata = read_sized(buffer, Metadata)
+
+    # Metadata files written before the extension was introduced end here.
+    if buffer.read(1) == b"":
+        return metadata
+    buffer.seek(-1, io.SEEK_CUR)
+    extension = read_sized(buffer, MetadataExtension)
+    if len(extension.data_files) != len(metadata.data_files):
+        raise InvalidHeader("Metadata extension does not match the data files of the metadata.")
+    return replace(
+        metadata,
+        data_files=tuple(
+            replace(data_file, compression=data_file_extension.compression)
+            for data_file, data_file_extension in zip(metadata.data_files, extension.data_files)
+        ),
+    )
 
 
 R = TypeVar("R", bound=RunningChecksum)
 
 
-def read_record(buffer: IO[bytes], running_checksum: R) -> Record:
-    """
-    Decode a length-value encoded envelope from `buffer`, verify its checksum is intact
-    and return the wrapped record decoded. This function assumes that `running_checksum`
-    is mutable, and it will call its `.update()` for all bytes read from the buffer.
-
-    :raises DecodeRecordError:
-    :raises MessageNotProcessable: Backup contains a schema-valid message, but the
-        message does not contain all data to make it processable. This is a consequence
-        of protobuf treating everything as optional
-    """
-    # Parse record and record start and end offsets.
-    offset_start = buffer.tell()
+@contextlib.contextmanager
+def mapped_file(path: Path) -> Iterator[memoryview]:
+    """Memory-map a data file for reading and yield a view of its contents."""
+    with path.open("rb") as buffer:
+        if os.fstat(buffer.fileno()).st_size == 0:
+            # Empty files cannot be mapped.
+            yield memoryview(b"")
+            return
+        mapped = mmap.mmap(buffer.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
     try:
-        record = read_sized(buffer, Record)
-    except struct.error as e:
+        with memoryview(mapped) as view:
+            yield view
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            # Slices of the view are still referenced, e.g. by the traceback of an
+            # error raised while decoding, the mapping is released once they are
+            # garbage collected.
+            pass
+
+
+@default_dataclass
+class RecordView:
+    """A Record decoded in place, key and value are views into the data file."""
+
+    key: memoryview | None
+    value: memoryview | None
+    headers: tuple[tuple[bytes, bytes], ...]
+    offset: int
+    timestamp: int
+    checksum_checkpoint: bytes | None
+
+
+def _decode_long(view: memoryview, position: int) -> tuple[int, int]:
+    # Avro longs are zigzag encoded variable-length integers.
+    try:
+        byte = view[position]
+        position += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = view[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    except IndexError as e:
         raise UnexpectedEndOfData from e
-    offset_delta = buffer.tell() - offset_start
+    return (value >> 1) ^ -(value & 1), position
+
+
+def _decode_bytes(view: memoryview, position: int) -> tuple[memoryview, int]:
+    size, position = _decode_long(view, position)
+    end = position + size
+    if size < 0 or end > len(view):
+        raise UnexpectedEndOfData
+    return view[position:end], end
+
+
+def _decode_optional_bytes(view: memoryview, position: int) -> tuple[memoryview | None, int]:
+    # The union branches are ["bytes", "null"].
+    branch, position = _decode_long(view, position)
+    if branch == 1:
+        return None, position
+    if branch != 0:
+        raise InvalidRecord(f"Invalid union branch {branch} for optional bytes.")
+    return _decode_bytes(view, position)
+
+
+def decode_record_view(view: memoryview) -> RecordView:
+    """Decode a Avro encoded Record without copying its key and value.
+
+    This mirrors the Record schema, field by field.
+    """
+    key, position = _decode_optional_bytes(view, 0)
+    value, position = _decode_optional_bytes(view, position)
+
+    headers = []
+    while True:
+        block_count, position = _decode_long(view, position)
+        if block_count == 0:
+            break
+        if block_count < 0:
+            # Negative counts are followed by the size of the block in bytes.
+            block_count = -block_count
+            _, position = _decode_long(view, position)
+        for _ in range(block_count):
+            header_key, position = _decode_bytes(view, position)
+            header_value, position = _decode_bytes(view, position)
+            # Kafka clients only accept headers as bytes.
+            headers.append((bytes(header_key), bytes(header_value)))
+
+    offset, position = _decode_long(view, position)
+    timestamp, position = _decode_long(view, position)
+    checksum_checkpoint, position = _decode_optional_bytes(view, position)
+
+    if offset < 0 or timestamp < 0:
+        raise InvalidRecord(f"Invalid record offset {offset} or timestamp {timestamp}.")
+
+    return RecordView(
+        key=key,
+        value=value,
+        headers=tuple(headers),
+        offset=offset,
+        timestamp=timestamp,
+        checksum_checkpoint=None if checksum_checkpoint is None else bytes(checksum_checkpoint),
+    )
+
+
+def _read_record_view(
+    view: memoryview,
+    position: int,
+    running_checksum: R,
+    record_count: int,
+    stream_offset: int,
+) -> tuple[RecordView, int]:
+    try:
+        (size,) = struct.unpack_from(">I", view, position)
+        start = position + 4
+        end = start + size
+        if end > len(view):
+            raise UnexpectedEndOfData
+        record = decode_record_view(view[start:end])
+    except (struct.error, UnexpectedEndOfData) as e:
+        raise TooFewRecords("Data file contains fewer records than expected.") from e
 
     # Verify checksum if current record has a checkpoint.
     if record.checksum_checkpoint is not None and record.checksum_checkpoint != running_checksum.digest():
-        raise InvalidChecksum
-
-    # Re-read record bytes and update running checksum.
-    buffer.seek(offset_start)
-    running_checksum.update(buffer.read(offset_delta))
+        raise InvalidChecksum(
+            f"Found invalid checksum at record number {record_count} (counting from 0), "
+            f"file byte offset {stream_offset + end}."
+        )
 
-    return record
+    running_checksum.update(view[position:end])
+    return record, end
 
 
-def read_records(
-    buffer: IO[bytes],
+def read_record_views(
+    view: memoryview,
     num_records: int,
     running_checksum: R,
-) -> Generator[Record, None, None]:
+) -> Generator[RecordView, None, None]:
+    """
+    Decode `num_records` length-value encoded envelopes from a view of a whole data file,
+    without copying their keys and values, and verify the checksum of each checkpoint.
+    The running checksum is updated with the same slice the record is decoded from.
+
+    :raises DecodeError:
+    """
+    position = 0
     for record_count in range(num_records):
-        try:
-            yield read_record(buffer, running_checksum)
-        except InvalidChecksum as e:
-            raise InvalidChecksum(
-                f"Found invalid checksum at record number {record_count} (counting "
-                f"from 0), file byte offset {buffer.tell()}."
-            ) from e
-        except UnexpectedEndOfData as e:
-            raise TooFewRecords("Data file contains fewer records than expected.") from e
-
-    if buffer.read(1) != b"":
+        record, position = _read_record_view(view, position, running_checksum, record_count, 0)
+        yield record
+
+    if position != len(view):
         raise TooManyRecords("Data file contains data beyond last expected record.")
+
+
+def read_block_record_views(
+    view: memoryview,
+    num_records: int,
+    running_checksum: R,
+    file_checksum: R,
+    codec: CompressionCodec,
+    checksum_implementation: Callable[[], R],
+) -> Generator[RecordView, None, None]:
+    """Counterpart of `read_record_views` for a data file of compressed blocks.
+
+    Each block checksum is verified before the block is decompressed. The running
+    checksum and its checkpoints cover the uncompressed envelopes, in the same way as
+    for uncompressed data files, while `file_checksum` is updated with the bytes of
+    the data file as stored. Records are views into the decompressed block.
+    """
+    digest_size = len(checksum_implementation().digest())
+    position = 0
+    stream_offset = 0
+    record_count = 0
+    while position < len(view):
+        try:
+            (size,) = struct.unpack_from(">I", view, position)
+        except struct.error as e:
+            raise InvalidBlock(f"Data file ends within the block at file byte offset {position}.") from e
+        payload_start = position + 4
+        payload_end = payload_start + size
+        block_end = payload_end + digest_size
+        if block_end > len(view):
+            raise InvalidBlock(f"Data file ends within the block at file byte offset {position}.")
+
+        payload = view[payload_start:payload_end]
+        block_checksum = checksum_implementation()
+        block_checksum.update(payload)
+        if block_checksum.digest() != view[payload_end:block_end]:
+            raise InvalidChecksum(f"Found invalid block checksum at file byte offset {position}.")
+        file_checksum.update(view[position:block_end])
+
+        block = memoryview(decompress(codec, payload))
+        block_position = 0
+        while block_position < len(block):
+            if record_count >= num_records:
+                raise TooManyRecords("Data file contains data beyond last expected record.")
+            record, block_position = _read_record_view(block, block_position, running_checksum, record_count, stream_offset)
+            record_count += 1
+            yield record
+
+        stream_offset += len(block)
+        position = block_end
+
+    if record_count < num_records:
+        raise TooFewRecords("Data file contains fewer records than expected.")
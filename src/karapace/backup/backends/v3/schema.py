@@ -8,7 +8,7 @@ from collections.abc import Mapping
 from dataclasses import field
 from karapace.avro_dataclasses.models import AvroModel
 from karapace.dataclasses import default_dataclass
-from typing import Optional
+from typing import Optional, Union
 
 import datetime
 import enum
@@ -26,6 +26,12 @@ class ChecksumAlgorithm(enum.Enum):
     xxhash3_64_be = "xxhash3_64_be"
 
 
+@enum.unique
+class CompressionCodec(enum.Enum):
+    zstd = "zstd"
+    lz4 = "lz4"
+
+
 @default_dataclass
 class DataFile(AvroModel):
     filename: str
@@ -34,6 +40,9 @@ class DataFile(AvroModel):
     record_count: int = field(metadata={"type": "long"})
     start_offset: int
     end_offset: int
+    # Not part of the DataFile record, as readers without a writer schema cannot
+    # tell whether a field was appended. It is stored in the MetadataExtension.
+    compression: Optional[CompressionCodec] = field(default=None, metadata={"exclude": True})
 
     def __post_init__(self) -> None:
         assert self.record_count >= 0
@@ -61,14 +70,33 @@ class Metadata(AvroModel):
     checksum_algorithm: ChecksumAlgorithm = ChecksumAlgorithm.unknown
 
     def __post_init__(self) -> None:
-        assert len(self.data_files) <= self.partition_count
+        # Incremental backups may hold several data files per partition.
+        assert len({data_file.partition for data_file in self.data_files}) <= self.partition_count
         assert self.topic_name
         assert self.finished_at >= self.started_at
-        assert self.partition_count == 1
+        assert self.partition_count >= 1
         assert self.version == 3
         assert self.record_count == sum(data_file.record_count for data_file in self.data_files)
 
 
+@default_dataclass
+class DataFileExtension(AvroModel):
+    # Data files without a codec hold uncompressed records. The null branch has to
+    # come first for null to be a valid default.
+    compression: Union[None, CompressionCodec] = None
+
+
+@default_dataclass
+class MetadataExtension(AvroModel):
+    """Written after the Metadata record, holding data file properties that were
+    added after the V3 format was released. Metadata files written before then end
+    after the Metadata record, and earlier readers ignore what follows it.
+    """
+
+    # In the same order as Metadata.data_files.
+    data_files: tuple[DataFileExtension, ...]
+
+
 @default_dataclass
 class Header(AvroModel):
     key: bytes
@@ -5,7 +5,7 @@ See LICENSE for details
 from .checksum import RunningChecksum
 from .constants import V3_MARKER
 from .errors import IntegerAboveBound, IntegerBelowBound
-from .schema import Metadata, Record
+from .schema import DataFileExtension, Metadata, MetadataExtension, Record
 from karapace.avro_dataclasses.models import AvroModel
 from typing import Final, IO, NoReturn, TypeVar
 
@@ -46,15 +46,20 @@ T = TypeVar("T", bound=AvroModel)
 
 
 def write_sized(buffer: IO[bytes], model: AvroModel) -> None:
-    with io.BytesIO() as partial_buffer:
-        model.serialize(partial_buffer)
-        write_uint32(buffer, partial_buffer.tell())
-        buffer.write(partial_buffer.getvalue())
+    encoded = model.encode()
+    write_uint32(buffer, len(encoded))
+    buffer.write(encoded)
 
 
 def write_metadata(buffer: IO[bytes], metadata: Metadata) -> None:
     buffer.write(V3_MARKER)
     write_sized(buffer, metadata)
+    write_sized(
+        buffer,
+        MetadataExtension(
+            data_files=tuple(DataFileExtension(compression=data_file.compression) for data_file in metadata.data_files)
+        ),
+    )
 
 
 def write_record(
@@ -67,9 +72,7 @@ def write_record(
     `buffer`, preceded by its byte length.
     """
 
-    with io.BytesIO() as record_buffer:
-        record.serialize(record_buffer)
-        encoded_record = record_buffer.getvalue()
+    encoded_record = record.encode()
 
     # Encode size as uint32 and prepend to record.
     with io.BytesIO() as size_buffer:
@@ -85,3 +88,26 @@ def write_record(
     # Update running checksum.
     running_checksum.update(encoded_size)
     running_checksum.update(encoded_record)
+
+
+def write_block(
+    buffer: IO[bytes],
+    compressed: bytes,
+    block_checksum: RunningChecksum,
+    running_checksum: RunningChecksum,
+) -> None:
+    """
+    Write a compressed block of envelopes to `buffer`, preceded by its byte length and
+    followed by the checksum of the compressed bytes. `running_checksum` is updated with
+    all bytes written, so that it covers the data file as stored.
+    """
+    with io.BytesIO() as size_buffer:
+        write_uint32(size_buffer, len(compressed))
+        encoded_size = size_buffer.getvalue()
+
+    block_checksum.update(compressed)
+    encoded_checksum = block_checksum.digest()
+
+    for part in (encoded_size, compressed, encoded_checksum):
+        buffer.write(part)
+        running_checksum.update(part)
@@ -62,6 +62,18 @@ class BackupWriter(Generic[B, F], abc.ABC):
         """
         return path
 
+    def end_partition(
+        self,
+        buffer: IO[B],
+        index: int,
+    ) -> None:
+        """
+        Hook called after the last call to .store_record() for a partition, while the
+        buffer is still open, so that buffered data can be written out.
+
+        Overriding this is optional.
+        """
+
     def finalize_partition(  # type: ignore[empty-body]
         self,
         index: int,
@@ -120,8 +132,8 @@ class BackupWriter(Generic[B, F], abc.ABC):
         """
         Called once for each partition in a topic. The returned context manager will be
         open during all calls to .store_record() for a partition, and entered into after
-        the call to .start_partition(), and exited before the call to
-        .finalize_partition().
+        the call to .start_partition(), and exited after the call to .end_partition()
+        and before the call to .finalize_partition().
 
         The reason for this method is so that each backend is responsible for setting up
         a buffer that it can write to. This enables having backends choosing whether to
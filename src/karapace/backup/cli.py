@@ -7,7 +7,10 @@ See LICENSE for details
 from __future__ import annotations
 
 from . import api
+from .backends.v3.constants import DEFAULT_COMPRESSION_BLOCK_SIZE
+from .backends.v3.schema import CompressionCodec
 from .errors import BackupDataRestorationError, StaleConsumerError
+from .pipeline import PipelineOptions
 from .poll_timeout import PollTimeout
 from aiokafka.errors import BrokerResponseError
 from collections.abc import Iterator
@@ -65,6 +68,36 @@ def parse_args() -> argparse.Namespace:
         required="--use-format-v3" in sys.argv,
         type=int,
     )
+    parser_get.add_argument(
+        "--compression",
+        choices=[codec.value for codec in CompressionCodec],
+        help="Compress data files with the given codec. This is only supported by V3 backups.",
+    )
+    parser_get.add_argument(
+        "--compression-block-size",
+        help="Uncompressed size in bytes at which a block of records is compressed.",
+        type=int,
+        default=DEFAULT_COMPRESSION_BLOCK_SIZE,
+    )
+    parser_get.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Extend the V3 backup at --location in place with records produced since it was taken, or create it. "
+            "An interrupted incremental backup resumes from its last checkpoint when run again."
+        ),
+    )
+    parser_get.add_argument(
+        "--records-per-data-file",
+        help="Split data files of an incremental backup after this many records, storing a checkpoint after each.",
+        type=int,
+    )
+    parser_get.add_argument(
+        "--parallelism",
+        help="Maximum number of partitions backed up concurrently. This has effect only for V3 backups.",
+        type=int,
+        default=1,
+    )
 
     parser_verify.add_argument(
         "--level",
@@ -75,6 +108,11 @@ def parse_args() -> argparse.Namespace:
             "also check that the files are fully parsable and that record counts and offsets are matching."
         ),
     )
+    parser_verify.add_argument(
+        "--workers",
+        help="Number of processes verifying data files in parallel, defaults to the number of CPUs.",
+        type=int,
+    )
 
     parser_restore.add_argument(
         "--override-replication-factor",
@@ -84,6 +122,38 @@ def parse_args() -> argparse.Namespace:
         ),
         type=int,
     )
+    parser_restore.add_argument(
+        "--parallelism",
+        help="Maximum number of partitions restored concurrently. This has effect only for V3 backups.",
+        type=int,
+        default=1,
+    )
+    parser_restore.add_argument(
+        "--max-in-flight-records",
+        help="Maximum number of records sent to Kafka per partition that are not yet acknowledged.",
+        type=int,
+        default=PipelineOptions().max_in_flight_records,
+    )
+    parser_restore.add_argument(
+        "--max-in-flight-bytes",
+        help="Maximum size in bytes of records sent to Kafka per partition that are not yet acknowledged.",
+        type=int,
+        default=PipelineOptions().max_in_flight_bytes,
+    )
+    parser_restore.add_argument(
+        "--progress-interval",
+        help="Seconds between progress reports.",
+        type=float,
+        default=PipelineOptions().progress_interval,
+    )
+    parser_restore.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=(
+            "Replay the backup against a local stand-in producer instead of Kafka, to measure restore throughput. "
+            "No topic is created and nothing is written to Kafka."
+        ),
+    )
 
     return parser.parse_args()
 
@@ -111,11 +181,16 @@ def dispatch(args: argparse.Namespace) -> None:
             poll_timeout=args.poll_timeout,
             overwrite=args.overwrite,
             replication_factor=args.replication_factor,
+            compression=None if args.compression is None else CompressionCodec(args.compression),
+            compression_block_size=args.compression_block_size,
+            incremental=args.incremental,
+            records_per_data_file=args.records_per_data_file,
+            parallelism=args.parallelism,
         )
     elif args.command == "inspect":
         api.inspect(api.locate_backup_file(location))
     elif args.command == "verify":
-        api.verify(api.locate_backup_file(location), level=VerifyLevel(args.level))
+        api.verify(api.locate_backup_file(location), level=VerifyLevel(args.level), workers=args.workers)
     elif args.command == "restore":
         config = get_config(args)
         try:
@@ -125,6 +200,13 @@ def dispatch(args: argparse.Namespace) -> None:
                 topic_name=api.normalize_topic_name(args.topic, config),
                 skip_topic_creation=args.skip_topic_creation,
                 override_replication_factor=args.override_replication_factor,
+                parallelism=args.parallelism,
+                pipeline=PipelineOptions(
+                    max_in_flight_records=args.max_in_flight_records,
+                    max_in_flight_bytes=args.max_in_flight_bytes,
+                    progress_interval=args.progress_interval,
+                ),
+                dry_run=args.dry_run,
             )
         except BackupDataRestorationError:
             traceback.print_exc()
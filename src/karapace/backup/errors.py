@@ -5,7 +5,14 @@ See LICENSE for details
 from confluent_kafka import TopicPartition
 from karapace.backup.poll_timeout import PollTimeout
 
-__all__ = ["BackupError", "BackupTopicAlreadyExists", "EmptyPartition", "PartitionCountError", "StaleConsumerError"]
+__all__ = [
+    "BackupError",
+    "BackupTopicAlreadyExists",
+    "EmptyPartition",
+    "MissingRecordsError",
+    "PartitionCountError",
+    "StaleConsumerError",
+]
 
 
 class BackupError(Exception):
@@ -20,6 +27,10 @@ class PartitionCountError(BackupError):
     pass
 
 
+class MissingRecordsError(BackupError):
+    """Raised when records to add to an incremental backup have been deleted from the topic already."""
+
+
 class BackupTopicAlreadyExists(BackupError):
     pass
 
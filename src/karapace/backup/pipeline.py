@@ -0,0 +1,236 @@
+"""
+karapace - schema backup restore pipeline
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from concurrent.futures import Future
+from confluent_kafka import Message
+from karapace.dataclasses import default_dataclass
+from karapace.kafka.producer import ProducerSendParams
+from karapace.statsd import StatsClient
+from typing import Callable, Protocol, TypeVar
+from typing_extensions import Unpack
+
+import logging
+import queue
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@default_dataclass
+class PipelineOptions:
+    # Instructions read ahead of the producer.
+    queue_size: int = 1_000
+    # Records and bytes sent to the producer that are not yet acknowledged.
+    max_in_flight_records: int = 10_000
+    max_in_flight_bytes: int = 64 * 1024 * 1024
+    # Records sent between polls of the producer for delivery reports.
+    poll_interval: int = 100
+    # Seconds between progress reports.
+    progress_interval: float = 10.0
+
+    def __post_init__(self) -> None:
+        if min(self.queue_size, self.max_in_flight_records, self.max_in_flight_bytes, self.poll_interval) < 1:
+            raise ValueError("Restore pipeline queue size, in-flight limits and poll interval must be at least 1.")
+
+
+class RestoreProducer(Protocol):
+    def send(self, topic: str, **params: Unpack[ProducerSendParams]) -> Future[Message]:
+        ...
+
+    def poll(self, timeout: float) -> int:
+        ...
+
+    def flush(self, timeout: float) -> int:
+        ...
+
+
+class DryRunProducer:
+    """Local stand-in for a Kafka producer, acknowledging every record on the next poll.
+
+    Replaying a backup against it measures how fast the backup can be read and
+    handed to a producer, without writing to Kafka.
+    """
+
+    def __init__(self) -> None:
+        self._pending: list[Future[Message]] = []
+
+    def send(self, topic: str, **params: Unpack[ProducerSendParams]) -> Future[Message]:  # pylint: disable=unused-argument
+        future: Future[Message] = Future()
+        self._pending.append(future)
+        return future
+
+    def poll(self, timeout: float = 0) -> int:  # pylint: disable=unused-argument
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.set_result(None)  # type: ignore[arg-type]
+        return len(pending)
+
+    def flush(self, timeout: float = 0) -> int:  # pylint: disable=unused-argument
+        self.poll()
+        return 0
+
+
+class InFlightWindow:
+    """Records and bytes sent to a producer, but not yet acknowledged by it."""
+
+    def __init__(self, max_records: int, max_bytes: int) -> None:
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def is_full(self) -> bool:
+        # A single record larger than the byte limit is still let through.
+        return self.records >= self.max_records or (self.records > 0 and self.bytes >= self.max_bytes)
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self.records += 1
+            self.bytes += size
+
+    def remove(self, size: int) -> None:
+        with self._lock:
+            self.records -= 1
+            self.bytes -= size
+
+
+class _ReadFailure:
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+_END_OF_INSTRUCTIONS = object()
+
+
+def read_ahead(instructions: Iterator[T], queue_size: int) -> Iterator[T]:
+    """Reader stage of the pipeline, reading instructions in a thread into a bounded queue.
+
+    Exceptions raised while reading are raised to the consumer of the returned
+    iterator. The reader thread is stopped when the iterator is closed.
+    """
+    buffer: queue.Queue[T | _ReadFailure | object] = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item: T | _ReadFailure | object) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            for instruction in instructions:
+                if not put(instruction):
+                    return
+        except BaseException as e:  # pylint: disable=broad-except
+            put(_ReadFailure(e))
+            return
+        put(_END_OF_INSTRUCTIONS)
+
+    reader = threading.Thread(target=read, name="karapace_restore_reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END_OF_INSTRUCTIONS:
+                return
+            if isinstance(item, _ReadFailure):
+                raise item.exception
+            yield item  # type: ignore[misc]
+    finally:
+        stopped.set()
+        reader.join()
+
+
+@default_dataclass
+class ProgressReport:
+    records: int
+    bytes: int
+    elapsed: float
+    records_per_second: float
+    bytes_per_second: float
+    # Only known when the total number of records is known upfront.
+    eta: float | None
+
+
+class RestoreProgress:
+    """Counts acknowledged records and reports throughput to the log and statsd."""
+
+    def __init__(
+        self,
+        topic_name: str,
+        total_records: int | None,
+        interval: float,
+        stats: StatsClient | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.topic_name = topic_name
+        self.total_records = total_records
+        self.interval = interval
+        self.stats = stats
+        self._clock = clock
+        self._started_at = clock()
+        self._reported_at = self._started_at
+        self._records = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self._records += 1
+            self._bytes += size
+            now = self._clock()
+            if now - self._reported_at < self.interval:
+                return
+            self._reported_at = now
+        self.report()
+
+    def snapshot(self) -> ProgressReport:
+        with self._lock:
+            records, size = self._records, self._bytes
+        elapsed = max(self._clock() - self._started_at, 1e-9)
+        records_per_second = records / elapsed
+        eta = None
+        if self.total_records is not None and records_per_second > 0:
+            eta = max(self.total_records - records, 0) / records_per_second
+        return ProgressReport(
+            records=records,
+            bytes=size,
+            elapsed=elapsed,
+            records_per_second=records_per_second,
+            bytes_per_second=size / elapsed,
+            eta=eta,
+        )
+
+    def report(self) -> ProgressReport:
+        report = self.snapshot()
+        LOG.info(
+            "Restored %s%s records of topic '%s' (%.0f records/s, %.0f bytes/s, ETA %s).",
+            report.records,
+            "" if self.total_records is None else f"/{self.total_records}",
+            self.topic_name,
+            report.records_per_second,
+            report.bytes_per_second,
+            "unknown" if report.eta is None else f"{report.eta:.0f}s",
+        )
+        if self.stats is not None:
+            tags = {"topic": self.topic_name}
+            self.stats.gauge("karapace_backup_restore_records", report.records, tags=tags)
+            self.stats.gauge("karapace_backup_restore_records_per_second", report.records_per_second, tags=tags)
+            self.stats.gauge("karapace_backup_restore_bytes_per_second", report.bytes_per_second, tags=tags)
+            if report.eta is not None:
+                self.stats.gauge("karapace_backup_restore_eta", report.eta, tags=tags)
+        return report
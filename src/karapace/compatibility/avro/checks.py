@@ -0,0 +1,163 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.compatibility import (
+    CompatibleResult,
+    incompatible,
+    merge,
+    ReaderWriterCompatibilityChecker,
+    schema_name_equals,
+    SchemaCompatibilityResult,
+    SchemaCompatibilityType,
+    SchemaIncompatibilityType,
+    SchemaType,
+)
+from avro.schema import NamedSchema, Schema as AvroSchema, UnionSchema
+from cachetools import LRUCache
+from threading import Lock
+from typing import Final
+
+AVRO_SCHEMA_TABLES_CACHE_SIZE: Final = 128
+
+# The reader types able to read each of the promotable writer types.
+_PROMOTIONS: Final[dict[str, tuple[str, ...]]] = {
+    SchemaType.INT: (SchemaType.LONG, SchemaType.FLOAT, SchemaType.DOUBLE),
+    SchemaType.LONG: (SchemaType.FLOAT, SchemaType.DOUBLE),
+    SchemaType.FLOAT: (SchemaType.DOUBLE,),
+    SchemaType.STRING: (SchemaType.BYTES,),
+    SchemaType.BYTES: (SchemaType.STRING,),
+}
+
+
+class _UnionBranches:
+    """Positions of the branches of a union, by type and by the writer types they may read."""
+
+    def __init__(self, union: UnionSchema) -> None:
+        self.branches: Final = union.schemas
+        self.by_type: dict[str, list[int]] = {}
+        for position, branch in enumerate(union.schemas):
+            self.by_type.setdefault(branch.type, []).append(position)
+        self._candidates: dict[tuple[str, ...], list[AvroSchema]] = {}
+
+    def candidates(self, writer: AvroSchema) -> list[AvroSchema]:
+        """The branches that may read `writer`, in the order of the union.
+
+        Any other branch is either of another type or of the same named type
+        with another name, which are both reported as incompatible.
+        """
+        key = (writer.type, writer.name, writer.fullname) if isinstance(writer, NamedSchema) else (writer.type,)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            positions = self.by_type.get(writer.type, [])
+            if isinstance(writer, NamedSchema):
+                positions = [
+                    position
+                    for position in positions
+                    if isinstance(self.branches[position], NamedSchema)
+                    and schema_name_equals(self.branches[position], writer)
+                ]
+            for promoted_type in _PROMOTIONS.get(writer.type, ()):
+                positions = positions + self.by_type.get(promoted_type, [])
+            candidates = self._candidates[key] = [self.branches[position] for position in sorted(positions)]
+        return candidates
+
+
+class AvroSchemaTables:
+    """Lookup tables of an Avro schema used as reader.
+
+    The tables are built on first use and shared by all the checks where the
+    schema is the reader, e.g. by the checks of a new schema against every
+    version of a subject in transitive modes.
+    """
+
+    def __init__(self, schema: AvroSchema) -> None:
+        # The unions are part of the schema, which is kept alive to keep their
+        # ids unique.
+        self.schema: Final = schema
+        self._unions: dict[int, _UnionBranches] = {}
+
+    def union_branches(self, union: UnionSchema) -> _UnionBranches:
+        branches = self._unions.get(id(union))
+        if branches is None:
+            branches = self._unions[id(union)] = _UnionBranches(union)
+        return branches
+
+
+_schema_tables: LRUCache[int, AvroSchemaTables] = LRUCache(maxsize=AVRO_SCHEMA_TABLES_CACHE_SIZE)
+_schema_tables_lock = Lock()
+
+
+def schema_tables(schema: AvroSchema) -> AvroSchemaTables:
+    with _schema_tables_lock:
+        tables = _schema_tables.get(id(schema))
+        if tables is None:
+            tables = _schema_tables[id(schema)] = AvroSchemaTables(schema)
+        return tables
+
+
+class AvroCompatibilityChecker(ReaderWriterCompatibilityChecker):
+    """Avro reader and writer compatibility checker.
+
+    Gives the same results as the checker of the Avro library, while:
+
+    - The results are memoized for pairs of named types only, by their full
+      names. Any recursion goes through named types, and a named type is the
+      same object wherever it is used in the schema.
+    - The branches of a reader union are looked up in the tables of the reader
+      instead of checking the writer against each of them, which for unions
+      of records means comparing all their fields.
+    """
+
+    def __init__(self, reader_tables: AvroSchemaTables) -> None:
+        super().__init__()
+        self.reader_tables: Final = reader_tables
+
+    def get_compatibility(
+        self,
+        reader: AvroSchema,
+        writer: AvroSchema,
+        reference_token: str = ReaderWriterCompatibilityChecker.ROOT_REFERENCE_TOKEN,
+        location: list[str] | None = None,
+    ) -> SchemaCompatibilityResult:
+        if location is None:
+            location = []
+        if not isinstance(reader, NamedSchema) or not isinstance(writer, NamedSchema):
+            return self.calculate_compatibility(reader, writer, location + [reference_token])
+
+        pair = (reader.fullname, writer.fullname)
+        result = self.memoize_map.get(pair)
+        if result is None:
+            self.memoize_map[pair] = SchemaCompatibilityResult()
+            result = self.calculate_compatibility(reader, writer, location + [reference_token])
+            self.memoize_map[pair] = result
+        elif result.compatibility is SchemaCompatibilityType.recursion_in_progress:
+            result = CompatibleResult
+        return result
+
+    def calculate_compatibility(
+        self,
+        reader: AvroSchema,
+        writer: AvroSchema,
+        location: list[str],
+    ) -> SchemaCompatibilityResult:
+        if reader.type != SchemaType.UNION or writer.type == SchemaType.UNION:
+            return super().calculate_compatibility(reader, writer, location)
+
+        assert isinstance(reader, UnionSchema)
+        for reader_branch in self.reader_tables.union_branches(reader).candidates(writer):
+            compat = self.get_compatibility(reader_branch, writer)
+            if compat.compatibility is SchemaCompatibilityType.compatible:
+                return CompatibleResult
+        # No branch in reader compatible with writer
+        message = f"reader union lacking writer type {writer.type}"
+        return merge(
+            CompatibleResult,
+            incompatible(SchemaIncompatibilityType.missing_union_branch, message, location),
+        )
+
+
+def check_avro_compatibility(reader: AvroSchema, writer: AvroSchema) -> SchemaCompatibilityResult:
+    return AvroCompatibilityChecker(schema_tables(reader)).get_compatibility(reader=reader, writer=writer)
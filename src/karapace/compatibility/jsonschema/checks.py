@@ -5,8 +5,8 @@ See LICENSE for details
 from __future__ import annotations
 
 from avro.compatibility import merge, SchemaCompatibilityResult, SchemaCompatibilityType, SchemaIncompatibilityType
-from dataclasses import dataclass
-from itertools import product
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
 from jsonschema import Draft7Validator
 from karapace.compatibility.jsonschema.types import (
     AssertionCheck,
@@ -29,14 +29,16 @@ from karapace.compatibility.jsonschema.utils import (
     is_tuple_without_additional_items,
     JSONSCHEMA_TYPES,
     lt,
+    maximum_bipartite_matching,
     maybe_get_subschemas_and_type,
     ne,
     normalize_schema,
     schema_from_partially_open_content_model,
 )
 from typing import Any
+from typing_extensions import TypeAlias
 
-import networkx as nx
+import sys
 
 INTRODUCED_INCOMPATIBILITY_MSG_FMT = "Introduced incompatible assertion {assert_name} with value {introduced_value}"
 RESTRICTED_INCOMPATIBILITY_MSG_FMT = "More restrictive assertion {assert_name} from {writer_value} to {reader_value}"
@@ -132,29 +134,52 @@ MIN_ITEMS_CHECK = AssertionCheck(
 )
 
 
+def _format_location(location: tuple[str, ...]) -> str:
+    locations = "/".join(location)
+    if len(location) > 1:  # Remove ROOT_REFERENCE_TOKEN
+        locations = locations[1:]
+    return locations
+
+
+def _format_incompatibility_location(location: tuple[str, ...]) -> str:
+    return "/".join(location[1:] if len(location) > 1 else location)
+
+
+class _Location(str):
+    """A reported location, with the path and the formatting it was reported with.
+
+    Comparison results are memoized without their locations, the path allows to
+    report them again from the location of another caller.
+    """
+
+    path: tuple[str, ...]
+    formatter: Callable[[tuple[str, ...]], str]
+
+    def __new__(cls, path: Sequence[str], formatter: Callable[[tuple[str, ...]], str]) -> _Location:
+        location = super().__new__(cls, formatter(tuple(path)))
+        location.path = tuple(path)
+        location.formatter = formatter
+        return location
+
+    def __reduce__(self) -> tuple[type[_Location], tuple[tuple[str, ...], Callable[[tuple[str, ...]], str]]]:
+        return _Location, (self.path, self.formatter)
+
+
 def type_mismatch(
     reader_type: JSONSCHEMA_TYPES,
     writer_type: JSONSCHEMA_TYPES,
     location: list[str],
 ) -> SchemaCompatibilityResult:
-    locations = "/".join(location)
-    if len(location) > 1:  # Remove ROOT_REFERENCE_TOKEN
-        locations = locations[1:]
     return SchemaCompatibilityResult(
         compatibility=SchemaCompatibilityType.incompatible,
         # TODO: https://github.com/aiven/karapace/issues/633
         incompatibilities=[Incompatibility.type_changed],  # type: ignore[list-item]
-        locations={locations},
+        locations={_Location(location, _format_location)},
         messages={f"type {reader_type} is not compatible with type {writer_type}"},
     )
 
 
-def count_uniquely_compatible_schemas(
-    reader_type: Instance,
-    reader_schema,
-    writer_schema,
-    location: list[str],
-) -> int:
+def count_uniquely_compatible_schemas(reader_schema: list[Any], writer_schema: list[Any]) -> int:
     # allOf/anyOf/oneOf subschemas do not enforce order, as a consequence the
     # new schema may change the order of the entries without breaking
     # compatibility.
@@ -165,31 +190,113 @@ def count_uniquely_compatible_schemas(
     #    applied in any order.
     #
     # https://json-schema.org/draft/2020-12/json-schema-core.html#rfc.section.10.2
-    @dataclass(unsafe_hash=True, frozen=True)
-    class Node:
-        reader: str
-        pos: int
+    #
+    # Only the outcome of the comparisons is used, the location is added when
+    # reporting the incompatibility.
+    return maximum_bipartite_matching(
+        len(reader_schema),
+        len(writer_schema),
+        lambda reader_pos, writer_pos: is_compatible(
+            compatibility_rec(reader_schema[reader_pos], writer_schema[writer_pos], [])
+        ),
+    )
 
-    reader_node_schema = [(Node("reader", reader_pos), schema) for reader_pos, schema in enumerate(reader_schema)]
-    writer_node_schema = [(Node("writer", writer_pos), schema) for writer_pos, schema in enumerate(writer_schema)]
 
-    compatible_edges = []
-    top_nodes = set()
-    for (reader_node, reader_subschema), (writer_node, writer_subschema) in product(reader_node_schema, writer_node_schema):
-        rec_result = compatibility_rec(
-            reader_subschema, writer_subschema, location + [reader_type.value, str(writer_node.pos)]
+# The path of a location within the compared subschemas, with the formatting it is
+# reported with. Locations not reported from within the subschemas are kept as is.
+_RelativeLocation: TypeAlias = "tuple[Callable[[tuple[str, ...]], str], tuple[str, ...]] | str"
+
+
+class _Comparisons:
+    """The subschema pairs compared during one compatibility run.
+
+    The pairs are keyed by the identities of the normalized reader and writer
+    subschemas. Normalization shares the nodes of the definitions used by
+    several `$ref`, so a pair reached through several paths is compared once.
+    Its result is kept without the location of the first path, and reported at
+    the location of every path that reaches it. The subschemas are kept with
+    the result so that their ids are not reused while the run lasts.
+    """
+
+    __slots__ = ("results", "in_progress", "lowest_assumed_depth")
+
+    def __init__(self) -> None:
+        self.results: dict[
+            tuple[int, int],
+            tuple[Any, Any, SchemaCompatibilityResult, frozenset[_RelativeLocation]],
+        ] = {}
+        self.in_progress: dict[tuple[int, int], int] = {}
+        self.lowest_assumed_depth = sys.maxsize
+
+    def known_result(
+        self,
+        reader_schema: Any,
+        writer_schema: Any,
+        location: list[str],
+    ) -> SchemaCompatibilityResult | None:
+        key = (id(reader_schema), id(writer_schema))
+        depth = self.in_progress.get(key)
+        if depth is not None:
+            # Reached again through a recursive definition, the comparison in
+            # progress decides the outcome.
+            self.lowest_assumed_depth = min(self.lowest_assumed_depth, depth)
+            return SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
+        known = self.results.get(key)
+        if known is None:
+            return None
+        _, _, result, relative_locations = known
+        return SchemaCompatibilityResult(
+            compatibility=result.compatibility,
+            incompatibilities=list(result.incompatibilities),
+            messages=set(result.messages),
+            locations={
+                relative_location
+                if isinstance(relative_location, str)
+                else _Location(location + list(relative_location[1]), relative_location[0])
+                for relative_location in relative_locations
+            },
         )
 
-        if is_compatible(rec_result):
-            top_nodes.add(reader_node)
-            compatible_edges.append((reader_node, writer_node))
+    def compare(self, reader_schema: Any, writer_schema: Any, location: list[str]) -> SchemaCompatibilityResult:
+        key = (id(reader_schema), id(writer_schema))
+        depth = len(self.in_progress)
+        self.in_progress[key] = depth
+        lowest_assumed_depth = self.lowest_assumed_depth
+        self.lowest_assumed_depth = depth
+        try:
+            result = _compatibility_rec(reader_schema, writer_schema, location)
+        finally:
+            del self.in_progress[key]
+            assumed_depth = self.lowest_assumed_depth
+            self.lowest_assumed_depth = min(lowest_assumed_depth, assumed_depth)
+        # A result relying on a pair still compared further up may not hold
+        # once that pair is decided.
+        if assumed_depth >= depth:
+            self.results[key] = (
+                reader_schema,
+                writer_schema,
+                # Results are modified in place by the callers.
+                SchemaCompatibilityResult(
+                    compatibility=result.compatibility,
+                    incompatibilities=list(result.incompatibilities),
+                    messages=set(result.messages),
+                ),
+                _relative_locations(result, location),
+            )
+        return result
+
+
+def _relative_locations(result: SchemaCompatibilityResult, location: list[str]) -> frozenset[_RelativeLocation]:
+    prefix = tuple(location)
+    return frozenset(
+        (reported.formatter, reported.path[len(prefix) :])
+        if isinstance(reported, _Location) and reported.path[: len(prefix)] == prefix
+        else reported
+        for reported in result.locations
+    )
 
-    compatibility_graph = nx.Graph(compatible_edges)
-    matching = nx.algorithms.bipartite.maximum_matching(compatibility_graph, top_nodes)
 
-    # Dividing by two because the result has the arrows for both directions
-    assert len(matching) % 2 == 0, "the length of the matching must be even"
-    return len(matching) // 2
+_COMPARISONS: ContextVar[_Comparisons | None] = ContextVar("comparisons", default=None)
 
 
 def incompatible_schema(
@@ -197,14 +304,11 @@ def incompatible_schema(
     message: str,
     location: list[str],
 ) -> SchemaCompatibilityResult:
-    locations = "/".join(location)
-    if len(location) > 1:  # Remove ROOT_REFERENCE_TOKEN
-        locations = locations[1:]
     return SchemaCompatibilityResult(
         compatibility=SchemaCompatibilityType.incompatible,
         # TODO: https://github.com/aiven/karapace/issues/633
         incompatibilities=[incompat_type],  # type: ignore[list-item]
-        locations={locations},
+        locations={_Location(location, _format_location)},
         messages={message},
     )
 
@@ -227,7 +331,13 @@ def compatibility(reader: Draft7Validator, writer: Draft7Validator) -> SchemaCom
     reader_schema = normalize_schema(reader)
     writer_schema = normalize_schema(writer)
 
-    return compatibility_rec(reader_schema, writer_schema, [])
+    token = _COMPARISONS.set(_Comparisons())
+    try:
+        result = compatibility_rec(reader_schema, writer_schema, [])
+    finally:
+        _COMPARISONS.reset(token)
+    result.locations = {str(location) for location in result.locations}
+    return result
 
 
 def check_simple_subschema(
@@ -247,6 +357,21 @@ def compatibility_rec(
     reader_schema: Any | None,
     writer_schema: Any | None,
     location: list[str],
+) -> SchemaCompatibilityResult:
+    comparisons = _COMPARISONS.get()
+    if comparisons is None:
+        return _compatibility_rec(reader_schema, writer_schema, location)
+
+    result = comparisons.known_result(reader_schema, writer_schema, location)
+    if result is None:
+        result = comparisons.compare(reader_schema, writer_schema, location)
+    return result
+
+
+def _compatibility_rec(
+    reader_schema: Any | None,
+    writer_schema: Any | None,
+    location: list[str],
 ) -> SchemaCompatibilityResult:
     if introduced_constraint(reader_schema, writer_schema):
         return incompatible_schema(
@@ -616,7 +741,7 @@ def add_incompatibility(
     location: list[str],
 ) -> None:
     """Add an incompatibility, this will modify the object in-place."""
-    formatted_location = "/".join(location[1:] if len(location) > 1 else location)
+    formatted_location = _Location(location, _format_incompatibility_location)
 
     result.compatibility = SchemaCompatibilityType.incompatible
     # TODO: https://github.com/aiven/karapace/issues/633
@@ -921,12 +1046,7 @@ def compatibility_subschemas(
         else:
             qty_of_required_compatible_subschemas = len_writer_subschemas
 
-        compatible_schemas_count = count_uniquely_compatible_schemas(
-            reader_type,  # type: ignore
-            reader_subschemas,
-            writer_subschemas,
-            subschema_location,
-        )
+        compatible_schemas_count = count_uniquely_compatible_schemas(reader_subschemas, writer_subschemas)
         if compatible_schemas_count < qty_of_required_compatible_subschemas:
             return incompatible_schema(
                 Incompatibility.combined_type_subschemas_changed,
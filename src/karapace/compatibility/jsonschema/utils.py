@@ -5,7 +5,7 @@ See LICENSE for details
 from copy import copy
 from jsonschema import Draft7Validator
 from karapace.compatibility.jsonschema.types import BooleanSchema, Instance, Keyword, Subschema
-from typing import Any, Optional, TypeVar, Union
+from typing import Any, Callable, Optional, TypeVar, Union
 
 import re
 
@@ -15,10 +15,18 @@ JSONSCHEMA_TYPES = Union[Instance, Subschema, Keyword, type[BooleanSchema]]
 
 def normalize_schema(validator: Draft7Validator) -> Any:
     original_schema = validator.schema
-    return normalize_schema_rec(validator, original_schema)
+    return normalize_schema_rec(validator, original_schema, {})
 
 
-def normalize_schema_rec(validator: Draft7Validator, original_schema: Any) -> Any:
+def normalize_schema_rec(validator: Draft7Validator, original_schema: Any, resolved: dict[str, Any]) -> Any:
+    """Normalize `original_schema`, replacing every `$ref` with its target.
+
+    The targets are normalized once and shared by all the references to them,
+    keyed in `resolved` by their URL, so the result is a graph of the size of
+    the schema instead of a tree with a copy of a definition for every
+    reference. A target is registered before its subschemas are normalized,
+    so the references of a recursive definition point back to it.
+    """
     if isinstance(original_schema, (bool, str, float, int)) or original_schema is None:
         return original_schema
 
@@ -31,22 +39,27 @@ def normalize_schema_rec(validator: Draft7Validator, original_schema: Any) -> An
         if scope:
             resolver.push_scope(scope)
 
-        normalized = {}
         if ref is not None:
-            resolved_scope, resolved_schema = resolver.resolve(ref)
-            resolver.push_scope(resolved_scope)
-            normalized.update(normalize_schema_rec(validator, resolved_schema))
-            resolver.pop_scope()
+            resolved_url, resolved_schema = resolver.resolve(ref)
+            normalized = resolved.get(resolved_url)
+            if normalized is None:
+                if isinstance(resolved_schema, dict):
+                    normalized = resolved[resolved_url] = {}
+                    resolver.push_scope(resolved_url)
+                    normalized.update(normalize_schema_rec(validator, resolved_schema, resolved))
+                    resolver.pop_scope()
+                else:
+                    normalized = normalize_schema_rec(validator, resolved_schema, resolved)
         else:
-            normalized.update(
-                (keyword, normalize_schema_rec(validator, original_schema[keyword])) for keyword in original_schema
-            )
+            normalized = {
+                keyword: normalize_schema_rec(validator, original_schema[keyword], resolved) for keyword in original_schema
+            }
 
         if scope:
             resolver.pop_scope()
 
     elif isinstance(original_schema, list):
-        normalized = [normalize_schema_rec(validator, item) for item in original_schema]
+        normalized = [normalize_schema_rec(validator, item, resolved) for item in original_schema]
     else:
         raise ValueError(f"Cannot handle object of type {type(original_schema)}")
 
@@ -318,6 +331,36 @@ def schema_from_partially_open_content_model(schema: dict, target_property_name:
     return schema.get(Keyword.ADDITIONAL_PROPERTIES.value)
 
 
+def maximum_bipartite_matching(left: int, right: int, is_adjacent: Callable[[int, int], bool]) -> int:
+    """Size of a maximum matching between `left` and `right` vertices.
+
+    Uses augmenting paths, asking `is_adjacent(left_pos, right_pos)` only for
+    the edges the search reaches. Each left vertex first tries the right
+    vertex in the same position, so when the sides match in order most edges
+    are never evaluated, which matters as each edge is a compatibility check.
+
+    >>> maximum_bipartite_matching(2, 2, lambda left_pos, right_pos: right_pos == 0)
+    1
+    >>> maximum_bipartite_matching(2, 2, lambda left_pos, right_pos: left_pos == 0 or right_pos == 0)
+    2
+    """
+    matched_left: list[Optional[int]] = [None] * right
+
+    def augment(left_pos: int, visited: list[bool]) -> bool:
+        for offset in range(right):
+            right_pos = (left_pos + offset) % right
+            if visited[right_pos] or not is_adjacent(left_pos, right_pos):
+                continue
+            visited[right_pos] = True
+            other_left_pos = matched_left[right_pos]
+            if other_left_pos is None or augment(other_left_pos, visited):
+                matched_left[right_pos] = left_pos
+                return True
+        return False
+
+    return sum(augment(left_pos, [False] * right) for left_pos in range(left))
+
+
 def get_type_of(schema: Any) -> JSONSCHEMA_TYPES:
     # https://json-schema.org/draft/2020-12/json-schema-core.html#rfc.section.4.2.1
 
@@ -3,6 +3,9 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
+from collections.abc import Sequence
+from karapace.compatibility import CompatibilityModes
+from karapace.protobuf import protopace
 from karapace.protobuf.compare_result import CompareResult
 from karapace.protobuf.schema import ProtobufSchema
 
@@ -29,3 +32,34 @@ def check_protobuf_schema_compatibility(reader: ProtobufSchema, writer: Protobuf
         locations=set(locations),
         messages=set(messages),
     )
+
+
+def check_protopace_compatibility(
+    new_proto: protopace.Proto,
+    old_protos: Sequence[protopace.Proto],
+    compatibility_mode: CompatibilityModes,
+) -> SchemaCompatibilityResult:
+    """Check `new_proto` against all of `old_protos` with a single protopace call.
+
+    The result is the one of the first incompatible old schema.
+    """
+    if compatibility_mode is CompatibilityModes.NONE:
+        return SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
+
+    if compatibility_mode in {CompatibilityModes.BACKWARD, CompatibilityModes.BACKWARD_TRANSITIVE}:
+        mode = protopace.CheckMode.BACKWARD
+    elif compatibility_mode in {CompatibilityModes.FORWARD, CompatibilityModes.FORWARD_TRANSITIVE}:
+        mode = protopace.CheckMode.FORWARD
+    else:
+        mode = protopace.CheckMode.FULL
+
+    for error in protopace.check_compatibility_many(new_proto, old_protos, mode):
+        if error is not None:
+            return SchemaCompatibilityResult(
+                compatibility=SchemaCompatibilityType.incompatible,
+                # TODO: https://github.com/aiven/karapace/issues/633
+                incompatibilities=[error],  # type: ignore[list-item]
+                locations=set(),
+                messages={error},
+            )
+    return SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
@@ -2,16 +2,11 @@
 Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
-from avro.compatibility import (
-    merge,
-    ReaderWriterCompatibilityChecker as AvroChecker,
-    SchemaCompatibilityResult,
-    SchemaCompatibilityType,
-    SchemaIncompatibilityType,
-)
+from avro.compatibility import merge, SchemaCompatibilityResult, SchemaCompatibilityType, SchemaIncompatibilityType
 from avro.schema import Schema as AvroSchema
 from jsonschema import Draft7Validator
 from karapace.compatibility import CompatibilityModes
+from karapace.compatibility.avro.checks import check_avro_compatibility
 from karapace.compatibility.jsonschema.checks import compatibility as jsonschema_compatibility, incompatible_schema
 from karapace.compatibility.protobuf.checks import check_protobuf_schema_compatibility
 from karapace.protobuf.schema import ProtobufSchema
@@ -127,7 +122,7 @@ class SchemaCompatibility:
 
     @staticmethod
     def check_avro_compatibility(reader_schema: AvroSchema, writer_schema: AvroSchema) -> SchemaCompatibilityResult:
-        return AvroChecker().get_compatibility(reader=reader_schema, writer=writer_schema)
+        return check_avro_compatibility(reader=reader_schema, writer=writer_schema)
 
     @staticmethod
     def check_jsonschema_compatibility(reader: Draft7Validator, writer: Draft7Validator) -> SchemaCompatibilityResult:
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 from karapace.constants import DEFAULT_AIOHTTP_CLIENT_MAX_SIZE, DEFAULT_PRODUCER_MAX_REQUEST, DEFAULT_SCHEMA_TOPIC
-from karapace.typing import ElectionStrategy, NameStrategy
+from karapace.typing import ElectionStrategy, NameStrategy, SchemaExecutorType
 from karapace.utils import json_decode, json_encode, JSONDecodeError
 from pathlib import Path
 from typing import IO
@@ -86,6 +86,18 @@ class Config(TypedDict):
     kafka_retriable_errors_silenced: bool
     use_protobuf_formatter: bool
     waiting_time_before_acting_as_master_ms: int
+    schema_changes_buffer_size: int
+    read_your_writes_timeout_ms: int
+    forward_request_timeout_ms: int
+    forward_connection_pool_size: int
+    forward_keepalive_timeout_ms: int
+    schema_executor: str
+    schema_executor_workers: int
+    registry_workers: int
+    registry_primary_worker_port: int | None
+    registry_shared_database: bool
+    registry_shared_database_path: str | None
+    registry_worker_index: int | None
 
     sentry: NotRequired[Mapping[str, object]]
     tags: NotRequired[Mapping[str, object]]
@@ -165,6 +177,19 @@ DEFAULTS: ConfigDefaults = {
     "kafka_retriable_errors_silenced": True,
     "use_protobuf_formatter": False,
     "waiting_time_before_acting_as_master_ms": 5000,
+    "schema_changes_buffer_size": 10000,
+    "read_your_writes_timeout_ms": 2000,
+    "forward_request_timeout_ms": 60000,
+    "forward_connection_pool_size": 100,
+    "forward_keepalive_timeout_ms": 60000,
+    "schema_executor": "inline",
+    "schema_executor_workers": 4,
+    "registry_workers": 1,
+    "registry_primary_worker_port": None,
+    "registry_shared_database": False,
+    "registry_shared_database_path": None,
+    # Set for each worker process when running multiple registry workers.
+    "registry_worker_index": None,
 }
 SECRET_CONFIG_OPTIONS = [SASL_PLAIN_PASSWORD]
 
@@ -280,6 +305,33 @@ def validate_config(config: Config) -> None:
             f"Invalid default name strategy: {name_strategy}, valid values are {valid_strategies}"
         ) from None
 
+    schema_executor = config["schema_executor"]
+    try:
+        SchemaExecutorType(schema_executor)
+    except ValueError:
+        valid_executors = [executor.value for executor in SchemaExecutorType]
+        raise InvalidConfiguration(
+            f"Invalid schema executor: {schema_executor}, valid values are {valid_executors}"
+        ) from None
+
+    if config["registry_workers"] < 1:
+        raise InvalidConfiguration("'registry_workers' must be at least 1")
+    if config["registry_workers"] > 1:
+        if config["karapace_rest"]:
+            raise InvalidConfiguration(
+                "Running multiple 'registry_workers' is not supported with 'karapace_rest', REST proxy consumers are "
+                "bound to the process that created them"
+            )
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise InvalidConfiguration("Running multiple 'registry_workers' requires SO_REUSEPORT support")
+        if config["registry_primary_worker_port"] in (None, config["port"]):
+            raise InvalidConfiguration(
+                "Running multiple 'registry_workers' requires 'registry_primary_worker_port' to be set to a port "
+                "other than 'port'"
+            )
+    elif config["registry_shared_database"]:
+        raise InvalidConfiguration("Using 'registry_shared_database' requires multiple 'registry_workers'")
+
     if config["rest_authorization"] and config["sasl_bootstrap_uri"] is None:
         raise InvalidConfiguration(
             "Using 'rest_authorization' requires configuration value for 'sasl_bootstrap_uri' to be set"
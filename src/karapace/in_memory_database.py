@@ -8,24 +8,45 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, Sequence
-from dataclasses import dataclass, field
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from karapace.schema_changes import SchemaChange
 from karapace.schema_models import SchemaVersion, TypedSchema, Versioner
 from karapace.schema_references import Reference, Referents
 from karapace.typing import SchemaId, Subject, Version
 from threading import Lock, RLock
 
 import logging
+import sys
 
 LOG = logging.getLogger(__name__)
 
 
 @dataclass
 class SubjectData:
-    schemas: dict[Version, SchemaVersion] = field(default_factory=dict)
-    compatibility: str | None = None
+    __slots__ = ("schemas", "compatibility")
+
+    schemas: dict[Version, SchemaVersion]
+    compatibility: str | None
 
 
 class KarapaceDatabase(ABC):
+    def batch(self) -> AbstractContextManager[object]:
+        """Context in which the schema reader applies a batch of consumed records."""
+        return nullcontext()
+
+    def publish_progress(  # pylint: disable=unused-argument
+        self,
+        *,
+        offset: int,
+        highest_offset: int,
+        ready: bool,
+        compatibility: str,
+        changes: Sequence[SchemaChange],
+    ) -> None:
+        """Called by the schema reader after each batch, for databases followed by other processes."""
+        return None
+
     @abstractmethod
     def get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
         pass
@@ -146,14 +167,25 @@ class InMemoryDatabase(KarapaceDatabase):
         self.schemas: dict[SchemaId, TypedSchema] = {}
         self.schema_lock_thread = RLock()
         self.referenced_by: dict[tuple[Subject, Version], Referents] = {}
+        # Forward index of `referenced_by`, the versions each schema is
+        # registered as a referent of.
+        self.references_by_schema_id: dict[SchemaId, set[tuple[Subject, Version]]] = {}
 
         # Content based deduplication of schemas. This is used to reduce memory
         # usage when the same schema is produce multiple times to the same or
         # different subjects. The deduplication is based on the schema content
         # instead of the ids to handle corrupt data (where the ids are equal
-        # but the schema themselves don't match)
-        self._hash_to_schema: dict[str, TypedSchema] = {}
-        self._hash_to_schema_id_on_subject: dict[Subject, dict[str, SchemaId]] = {}
+        # but the schema themselves don't match). Fingerprints are the binary
+        # digests, and subject names are interned as they are repeated in
+        # several of the mappings and in every version of the subject.
+        self._hash_to_schema: dict[bytes, TypedSchema] = {}
+        self._hash_to_schema_id_on_subject: dict[Subject, dict[bytes, SchemaId]] = {}
+
+    def batch(self) -> AbstractContextManager[object]:
+        # Readers holding the lock see either none or all of the changes of a
+        # batch. Mutations taking the lock again within the batch only bump the
+        # recursion count of the RLock.
+        return self.schema_lock_thread
 
     def log_state(self) -> None:
         if LOG.isEnabledFor(logging.DEBUG):
@@ -227,6 +259,7 @@ class InMemoryDatabase(KarapaceDatabase):
         schema: TypedSchema,
         references: Sequence[Reference] | None,
     ) -> None:
+        subject = Subject(sys.intern(subject))
         with self.schema_lock_thread:
             self.global_schema_id = max(self.global_schema_id, schema_id)
 
@@ -264,7 +297,7 @@ class InMemoryDatabase(KarapaceDatabase):
                 )
 
     def insert_subject(self, *, subject: Subject) -> None:
-        self.subjects.setdefault(subject, SubjectData())
+        self.subjects.setdefault(Subject(sys.intern(subject)), SubjectData(schemas={}, compatibility=None))
 
     def get_subject_compatibility(self, *, subject: Subject) -> str | None:
         if subject in self.subjects:
@@ -379,11 +412,13 @@ class InMemoryDatabase(KarapaceDatabase):
 
     def insert_referenced_by(self, *, subject: Subject, version: Version, schema_id: SchemaId) -> None:
         with self.schema_lock_thread:
-            referents = self.referenced_by.get((subject, version), None)
-            if referents:
-                referents.append(schema_id)
-            else:
-                self.referenced_by[(subject, version)] = Referents([schema_id])
+            key = (subject, version)
+            referents = self.referenced_by.get(key, None)
+            if referents is None:
+                key = (Subject(sys.intern(subject)), version)
+                referents = self.referenced_by[key] = Referents({})
+            referents[schema_id] = None
+            self.references_by_schema_id.setdefault(schema_id, set()).add(key)
 
     def get_referenced_by(self, subject: Subject, version: Version) -> Referents | None:
         with self.schema_lock_thread:
@@ -391,7 +426,13 @@ class InMemoryDatabase(KarapaceDatabase):
 
     def remove_referenced_by(self, schema_id: SchemaId, references: Iterable[Reference]) -> None:
         with self.schema_lock_thread:
+            keys = self.references_by_schema_id.get(schema_id, None)
+            if not keys:
+                return
             for ref in references:
                 key = (ref.subject, ref.version)
-                if self.referenced_by.get(key, None) and schema_id in self.referenced_by[key]:
-                    self.referenced_by[key].remove(schema_id)
+                if key in keys:
+                    keys.remove(key)
+                    del self.referenced_by[key][schema_id]
+            if not keys:
+                del self.references_by_schema_id[schema_id]
@@ -0,0 +1,396 @@
+"""
+JSON Schema validation specialised per schema.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from jsonschema import Draft7Validator
+from karapace.dataclasses import default_dataclass
+from typing import Any, Callable, Final, Optional
+from urllib.parse import unquote
+
+import numbers
+import re
+
+__all__ = ("CompiledValidator", "compile_validator")
+
+
+Check = Callable[[Any], bool]
+
+# The types as checked by Draft7Validator, booleans are not numbers.
+_TYPE_CHECKS: Final[Mapping[str, Check]] = {
+    "array": lambda value: isinstance(value, list),
+    "boolean": lambda value: isinstance(value, bool),
+    "integer": lambda value: not isinstance(value, bool)
+    and (isinstance(value, int) or (isinstance(value, float) and value.is_integer())),
+    "null": lambda value: value is None,
+    "number": lambda value: isinstance(value, numbers.Number) and not isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "string": lambda value: isinstance(value, str),
+}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+@default_dataclass
+class CompiledValidator:
+    """Validates values against a JSON Schema.
+
+    The schema is compiled once into a function that only tells whether a value
+    is valid. Invalid values, and all the values of schemas using keywords the
+    compiler does not support, are validated by `draft7`, so the errors raised
+    are the ones of `Draft7Validator.validate`.
+    """
+
+    draft7: Draft7Validator
+    is_valid: Optional[Check]
+
+    def validate(self, value: Any) -> None:
+        """Raise `jsonschema.ValidationError` if `value` is not valid."""
+        if self.is_valid is None or not self.is_valid(value):
+            self.draft7.validate(value)
+
+    def validate_many(self, values: Iterable[Any]) -> None:
+        """Raise `jsonschema.ValidationError` for the first of `values` that is not valid."""
+        is_valid = self.is_valid
+        if is_valid is None:
+            for value in values:
+                self.draft7.validate(value)
+            return
+        for value in values:
+            if not is_valid(value):
+                self.draft7.validate(value)
+
+
+def compile_validator(validator: Draft7Validator) -> CompiledValidator:
+    try:
+        is_valid: Check | None = _Compiler(validator).compile(validator.schema)
+    except _Unsupported:
+        is_valid = None
+    return CompiledValidator(draft7=validator, is_valid=is_valid)
+
+
+def _unbool(value: Any, true: object = object(), false: object = object()) -> Any:
+    if value is True:
+        return true
+    if value is False:
+        return false
+    return value
+
+
+def _equal(one: Any, two: Any) -> bool:
+    # Same as the equality of the `enum` and `const` keywords of jsonschema, which
+    # tells booleans from numbers.
+    if one is two:
+        return True
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+    if isinstance(one, Sequence) and isinstance(two, Sequence):
+        return len(one) == len(two) and all(_equal(left, right) for left, right in zip(one, two))
+    if isinstance(one, Mapping) and isinstance(two, Mapping):
+        return len(one) == len(two) and all(key in two and _equal(value, two[key]) for key, value in one.items())
+    return _unbool(one) == _unbool(two)
+
+
+def _all(checks: list[Check]) -> Check:
+    if not checks:
+        return lambda value: True
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value: Any) -> bool:
+        for check_ in checks:
+            if not check_(value):
+                return False
+        return True
+
+    return check
+
+
+class _Compiler:
+    def __init__(self, validator: Draft7Validator) -> None:
+        self.root = validator.schema
+        self.asserts_format = validator.format_checker is not None
+        self.references: dict[str, Check | None] = {}
+
+    def compile(self, schema: Any) -> Check:
+        if schema is True:
+            return lambda value: True
+        if schema is False:
+            return lambda value: False
+        if not isinstance(schema, dict):
+            raise _Unsupported(f"schema {schema!r}")
+
+        # Up to draft 7 the keywords next to a reference are ignored.
+        if "$ref" in schema:
+            return self._reference(schema["$ref"])
+        if "$id" in schema and schema is not self.root:
+            # The references would resolve against another base URI.
+            raise _Unsupported("$id")
+
+        checks = []
+        for keyword, keyword_value in schema.items():
+            # Annotations and unknown keywords are ignored by Draft7Validator as well.
+            if keyword not in Draft7Validator.VALIDATORS:
+                continue
+            builder = _KEYWORDS.get(keyword)
+            if builder is None:
+                if keyword == "format" and not self.asserts_format:
+                    continue
+                raise _Unsupported(keyword)
+            check = builder(self, keyword_value, schema)
+            if check is not None:
+                checks.append(check)
+        return _all(checks)
+
+    def _reference(self, reference: str) -> Check:
+        if reference not in self.references:
+            self.references[reference] = None
+            self.references[reference] = self.compile(self._resolve(reference))
+        check = self.references[reference]
+        if check is None:
+            # A recursive definition, the check is known once compiled.
+            return lambda value: self.references[reference](value)  # type: ignore[misc]
+        return check
+
+    def _resolve(self, reference: str) -> Any:
+        # Only JSON pointers into this schema, plain-name fragments refer to an $id.
+        if reference != "#" and not reference.startswith("#/"):
+            raise _Unsupported(f"$ref {reference}")
+        target = self.root
+        for token in unquote(reference[1:]).split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(target, list):
+                try:
+                    target = target[int(token)]
+                except (ValueError, IndexError):
+                    raise _Unsupported(f"$ref {reference}") from None
+            elif isinstance(target, dict) and token in target:
+                target = target[token]
+            else:
+                raise _Unsupported(f"$ref {reference}")
+        return target
+
+
+# Build the check of a keyword from its value and the schema it is in, None when the
+# keyword does not assert anything.
+Builder = Callable[[_Compiler, Any, Mapping[str, Any]], Optional[Check]]
+
+# pylint: disable=unused-argument
+
+
+def _type(compiler: _Compiler, types: Any, schema: Mapping[str, Any]) -> Check:
+    try:
+        if isinstance(types, str):
+            return _TYPE_CHECKS[types]
+        type_checks = tuple(_TYPE_CHECKS[type_] for type_ in types)
+    except (KeyError, TypeError):
+        raise _Unsupported(f"type {types!r}") from None
+    return lambda value: any(type_check(value) for type_check in type_checks)
+
+
+def _enum(compiler: _Compiler, members: Any, schema: Mapping[str, Any]) -> Check:
+    if all(isinstance(member, str) for member in members):
+        strings = frozenset(members)
+        return lambda value: isinstance(value, str) and value in strings
+    return lambda value: any(_equal(member, value) for member in members)
+
+
+def _const(compiler: _Compiler, constant: Any, schema: Mapping[str, Any]) -> Check:
+    return lambda value: _equal(value, constant)
+
+
+def _properties(compiler: _Compiler, properties: Any, schema: Mapping[str, Any]) -> Check:
+    property_checks = tuple((name, compiler.compile(subschema)) for name, subschema in properties.items())
+
+    def check(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return True
+        for name, property_check in property_checks:
+            if name in value and not property_check(value[name]):
+                return False
+        return True
+
+    return check
+
+
+def _pattern_properties(compiler: _Compiler, patterns: Any, schema: Mapping[str, Any]) -> Check:
+    pattern_checks = tuple((re.compile(pattern), compiler.compile(subschema)) for pattern, subschema in patterns.items())
+
+    def check(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return True
+        for pattern, pattern_check in pattern_checks:
+            for name, property_value in value.items():
+                if pattern.search(name) and not pattern_check(property_value):
+                    return False
+        return True
+
+    return check
+
+
+def _additional_properties(compiler: _Compiler, additional: Any, schema: Mapping[str, Any]) -> Check | None:
+    if additional is True:
+        return None
+    known = frozenset(schema.get("properties", ()))
+    patterns = schema.get("patternProperties")
+    pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def additional_names(value: dict) -> Iterable[str]:
+        for name in value:
+            if name not in known and (pattern is None or not pattern.search(name)):
+                yield name
+
+    if isinstance(additional, dict):
+        additional_check = compiler.compile(additional)
+        return lambda value: not isinstance(value, dict) or all(
+            additional_check(value[name]) for name in additional_names(value)
+        )
+    return lambda value: not isinstance(value, dict) or next(iter(additional_names(value)), None) is None
+
+
+def _required(compiler: _Compiler, required: Any, schema: Mapping[str, Any]) -> Check:
+    names = tuple(required)
+    return lambda value: not isinstance(value, dict) or all(name in value for name in names)
+
+
+def _dependencies(compiler: _Compiler, dependencies: Any, schema: Mapping[str, Any]) -> Check:
+    dependency_checks: list[tuple[str, Check]] = []
+    for name, dependency in dependencies.items():
+        if isinstance(dependency, list):
+            names = tuple(dependency)
+            dependency_checks.append((name, lambda value, names=names: all(other in value for other in names)))
+        else:
+            dependency_checks.append((name, compiler.compile(dependency)))
+    return lambda value: not isinstance(value, dict) or all(
+        dependency_check(value) for name, dependency_check in dependency_checks if name in value
+    )
+
+
+def _property_names(compiler: _Compiler, names: Any, schema: Mapping[str, Any]) -> Check:
+    name_check = compiler.compile(names)
+    return lambda value: not isinstance(value, dict) or all(name_check(name) for name in value)
+
+
+def _items(compiler: _Compiler, items: Any, schema: Mapping[str, Any]) -> Check:
+    if isinstance(items, list):
+        item_checks = tuple(compiler.compile(item) for item in items)
+        return lambda value: not isinstance(value, list) or all(
+            item_check(item) for item_check, item in zip(item_checks, value)
+        )
+    item_check = compiler.compile(items)
+    return lambda value: not isinstance(value, list) or all(item_check(item) for item in value)
+
+
+def _additional_items(compiler: _Compiler, additional: Any, schema: Mapping[str, Any]) -> Check | None:
+    items = schema.get("items", {})
+    if isinstance(items, dict) or additional is True:
+        return None
+    tuple_size = len(items)
+    if isinstance(additional, dict):
+        additional_check = compiler.compile(additional)
+        return lambda value: not isinstance(value, list) or all(additional_check(item) for item in value[tuple_size:])
+    return lambda value: not isinstance(value, list) or len(value) <= tuple_size
+
+
+def _contains(compiler: _Compiler, contains: Any, schema: Mapping[str, Any]) -> Check:
+    contains_check = compiler.compile(contains)
+    return lambda value: not isinstance(value, list) or any(contains_check(item) for item in value)
+
+
+def _size(kind: str, compare: Callable[[int, Any], bool]) -> Builder:
+    type_check = _TYPE_CHECKS[kind]
+
+    def builder(compiler: _Compiler, limit: Any, schema: Mapping[str, Any]) -> Check:
+        return lambda value: not type_check(value) or compare(len(value), limit)
+
+    return builder
+
+
+def _bound(compare: Callable[[Any, Any], bool]) -> Builder:
+    is_number = _TYPE_CHECKS["number"]
+
+    def builder(compiler: _Compiler, limit: Any, schema: Mapping[str, Any]) -> Check:
+        return lambda value: not is_number(value) or compare(value, limit)
+
+    return builder
+
+
+def _pattern(compiler: _Compiler, pattern: Any, schema: Mapping[str, Any]) -> Check:
+    search = re.compile(pattern).search
+    return lambda value: not isinstance(value, str) or search(value) is not None
+
+
+def _all_of(compiler: _Compiler, subschemas: Any, schema: Mapping[str, Any]) -> Check:
+    return _all([compiler.compile(subschema) for subschema in subschemas])
+
+
+def _any_of(compiler: _Compiler, subschemas: Any, schema: Mapping[str, Any]) -> Check:
+    checks = tuple(compiler.compile(subschema) for subschema in subschemas)
+    return lambda value: any(check(value) for check in checks)
+
+
+def _one_of(compiler: _Compiler, subschemas: Any, schema: Mapping[str, Any]) -> Check:
+    checks = tuple(compiler.compile(subschema) for subschema in subschemas)
+
+    def check(value: Any) -> bool:
+        matched = False
+        for check_ in checks:
+            if check_(value):
+                if matched:
+                    return False
+                matched = True
+        return matched
+
+    return check
+
+
+def _not(compiler: _Compiler, subschema: Any, schema: Mapping[str, Any]) -> Check:
+    negated = compiler.compile(subschema)
+    return lambda value: not negated(value)
+
+
+def _if(compiler: _Compiler, condition: Any, schema: Mapping[str, Any]) -> Check | None:
+    if "then" not in schema and "else" not in schema:
+        return None
+    condition_check = compiler.compile(condition)
+    then_check = compiler.compile(schema.get("then", True))
+    else_check = compiler.compile(schema.get("else", True))
+    return lambda value: then_check(value) if condition_check(value) else else_check(value)
+
+
+_KEYWORDS: Final[Mapping[str, Builder]] = {
+    "type": _type,
+    "enum": _enum,
+    "const": _const,
+    "properties": _properties,
+    "patternProperties": _pattern_properties,
+    "additionalProperties": _additional_properties,
+    "required": _required,
+    "dependencies": _dependencies,
+    "propertyNames": _property_names,
+    "minProperties": _size("object", lambda size, limit: size >= limit),
+    "maxProperties": _size("object", lambda size, limit: size <= limit),
+    "items": _items,
+    "additionalItems": _additional_items,
+    "contains": _contains,
+    "minItems": _size("array", lambda size, limit: size >= limit),
+    "maxItems": _size("array", lambda size, limit: size <= limit),
+    "minLength": _size("string", lambda size, limit: size >= limit),
+    "maxLength": _size("string", lambda size, limit: size <= limit),
+    "pattern": _pattern,
+    "minimum": _bound(lambda value, limit: value >= limit),
+    "maximum": _bound(lambda value, limit: value <= limit),
+    "exclusiveMinimum": _bound(lambda value, limit: value > limit),
+    "exclusiveMaximum": _bound(lambda value, limit: value < limit),
+    "allOf": _all_of,
+    "anyOf": _any_of,
+    "oneOf": _one_of,
+    "not": _not,
+    "if": _if,
+}
@@ -1025,15 +1025,18 @@ class UserRestProxy:
         value_schema_id: int | None,
         default_partition: int | None = None,
     ) -> list[tuple]:
-        prepared_records = []
-        for record in data["records"]:
-            key = record.get("key")
-            value = record.get("value")
-            if key is not None:
-                key = await self.serialize(content_type, key, ser_format, key_schema_id)
-            value = await self.serialize(content_type, value, ser_format, value_schema_id)
-            prepared_records.append((key, value, record.get("partition", default_partition)))
-        return prepared_records
+        records = data["records"]
+        keys = [record.get("key") for record in records]
+        serialized_keys = iter(
+            await self.serialize_many(content_type, [key for key in keys if key is not None], ser_format, key_schema_id)
+        )
+        values = await self.serialize_many(
+            content_type, [record.get("value") for record in records], ser_format, value_schema_id
+        )
+        return [
+            (None if key is None else next(serialized_keys), value, record.get("partition", default_partition))
+            for record, key, value in zip(records, keys, values)
+        ]
 
     async def get_partition_info(self, topic: str, partition: str, content_type: str) -> dict:
         partition = self.validate_partition_id(partition, content_type)
@@ -1100,6 +1103,21 @@ class UserRestProxy:
             return await self.schema_serialize(obj, schema_id)
         raise FormatError(f"Unknown format: {ser_format}")
 
+    async def serialize_many(
+        self,
+        content_type: str,
+        objs: list,
+        ser_format: str | None = None,
+        schema_id: int | None = None,
+    ) -> list[bytes]:
+        # The JSON Schema records of a request are validated together.
+        present = [obj for obj in objs if obj]
+        if ser_format != "jsonschema" or not present:
+            return [await self.serialize(content_type, obj, ser_format, schema_id) for obj in objs]
+        schema, _ = await self.serializer.get_schema_for_id(schema_id)
+        serialized = iter(await self.serializer.serialize_many(schema, present))
+        return [next(serialized) if obj else b"" for obj in objs]
+
     async def schema_serialize(self, obj: dict, schema_id: int | None) -> bytes:
         schema, _ = await self.serializer.get_schema_for_id(schema_id)
         bytes_ = await self.serializer.serialize(schema, obj)
@@ -2,6 +2,8 @@
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
+from __future__ import annotations
+
 from .config import Config
 from collections.abc import Iterator
 from karapace.kafka.admin import KafkaAdminClient
@@ -26,7 +28,7 @@ def kafka_admin_from_config(config: Config) -> KafkaAdminClient:
 
 
 @contextlib.contextmanager
-def kafka_consumer_from_config(config: Config, topic: str) -> Iterator[KafkaConsumer]:
+def kafka_consumer_from_config(config: Config, topic: str | None) -> Iterator[KafkaConsumer]:
     consumer = KafkaConsumer(
         bootstrap_servers=config["bootstrap_uri"],
         topic=topic,
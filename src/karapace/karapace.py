@@ -47,12 +47,17 @@ class KarapaceBase(RestApp):
         self.log.info("Karapace initialized")
 
     @staticmethod
-    def r(body: dict | list, content_type: str, status: HTTPStatus = HTTPStatus.OK) -> NoReturn:
+    def r(
+        body: dict | list,
+        content_type: str,
+        status: HTTPStatus = HTTPStatus.OK,
+        headers: dict[str, str] | None = None,
+    ) -> NoReturn:
         raise HTTPResponse(
             body=body,
             status=status,
             content_type=content_type,
-            headers={},
+            headers=headers or {},
         )
 
     @staticmethod
@@ -5,17 +5,20 @@ See LICENSE for details
 from __future__ import annotations
 
 from aiohttp.web_log import AccessLogger
+from collections.abc import Sequence
 from contextlib import closing
 from karapace import version as karapace_version
 from karapace.config import Config, read_config
 from karapace.instrumentation.prometheus import PrometheusInstrumentation
 from karapace.kafka_rest_apis import KafkaRest
 from karapace.rapu import RestApp
+from karapace.registry_workers import run_workers
 from karapace.schema_registry_apis import KarapaceSchemaRegistryController
 from karapace.utils import DebugAccessLogger
 
 import argparse
 import logging
+import socket
 import sys
 
 
@@ -55,17 +58,7 @@ def _configure_logging(*, config: Config) -> None:
         config["access_log_class"] = AccessLogger
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(prog="karapace", description="Karapace: Your Kafka essentials in one tool")
-    parser.add_argument("--version", action="version", help="show program version", version=karapace_version.__version__)
-    parser.add_argument("config_file", help="configuration file path", type=argparse.FileType())
-    arg = parser.parse_args()
-
-    with closing(arg.config_file):
-        config = read_config(arg.config_file)
-
-    _configure_logging(config=config)
-
+def _run_app(config: Config, sockets: Sequence[socket.socket] | None = None) -> int:
     app: RestApp
     if config["karapace_rest"] and config["karapace_registry"]:
         info_str = "both services"
@@ -92,12 +85,28 @@ def main() -> int:
 
     try:
         PrometheusInstrumentation.setup_metrics(app=app)
-        app.run()  # `close` will be called by the callback `close_by_app` set by `KarapaceBase`
+        app.run(sockets=sockets)  # `close` will be called by the callback `close_by_app` set by `KarapaceBase`
     except Exception as ex:  # pylint: disable-broad-except
         app.stats.unexpected_exception(ex=ex, where="karapace")
         raise
     return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="karapace", description="Karapace: Your Kafka essentials in one tool")
+    parser.add_argument("--version", action="version", help="show program version", version=karapace_version.__version__)
+    parser.add_argument("config_file", help="configuration file path", type=argparse.FileType())
+    arg = parser.parse_args()
+
+    with closing(arg.config_file):
+        config = read_config(arg.config_file)
+
+    _configure_logging(config=config)
+
+    if config["registry_workers"] > 1:
+        return run_workers(config, _run_app)
+    return _run_app(config)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -4,7 +4,11 @@ karapace - Karapace offset watcher
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
-from threading import Condition
+from __future__ import annotations
+
+from threading import Condition, Lock
+
+import asyncio
 
 
 class OffsetWatcher:
@@ -37,3 +41,60 @@ class OffsetWatcher:
         """
         with self._condition:
             return self._condition.wait_for(lambda: expected_offset <= self._greatest_offset, timeout=timeout)
+
+
+class AsyncOffsetWatcher:
+    """Counterpart of `OffsetWatcher` for coroutines waiting until an offset is seen by another thread.
+
+    The waiters are futures of their event loop, resolved with `call_soon_threadsafe`
+    once the offset is seen, so no thread is blocked while waiting.
+    """
+
+    def __init__(self) -> None:
+        # Protects _greatest_offset and _waiters.
+        self._lock = Lock()
+        self._greatest_offset = -1
+        self._waiters: set[tuple[int, asyncio.AbstractEventLoop, asyncio.Future[None]]] = set()
+
+    def greatest_offset(self) -> int:
+        return self._greatest_offset
+
+    def offset_seen(self, new_offset: int) -> None:
+        with self._lock:
+            self._greatest_offset = max(self._greatest_offset, new_offset)
+            seen = [waiter for waiter in self._waiters if waiter[0] <= self._greatest_offset]
+            self._waiters.difference_update(seen)
+        for _, loop, future in seen:
+            try:
+                loop.call_soon_threadsafe(_set_seen, future)
+            except RuntimeError:
+                # The event loop of the waiting coroutine was closed meanwhile.
+                pass
+
+    async def wait_for_offset(self, expected_offset: int, timeout: float) -> bool:
+        """Wait until expected_offset is seen.
+
+        Args:
+            expected_offset: The message offset generated by the producer.
+            timeout: How long the caller will wait for the offset in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = (expected_offset, loop, loop.create_future())
+        with self._lock:
+            if expected_offset <= self._greatest_offset:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[2], timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        return True
+
+
+def _set_seen(future: asyncio.Future[None]) -> None:
+    # The waiter may have timed out meanwhile.
+    if not future.done():
+        future.set_result(None)
@@ -5,7 +5,9 @@ See LICENSE for details
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from cachetools import LRUCache
+from collections.abc import Mapping, Sequence
+from karapace.dependency import Dependency, DependencyVerifierResult
 from karapace.protobuf.enum_constant_element import EnumConstantElement
 from karapace.protobuf.enum_element import EnumElement
 from karapace.protobuf.extend_element import ExtendElement
@@ -21,8 +23,13 @@ from karapace.protobuf.schema import ProtobufSchema
 from karapace.protobuf.service_element import ServiceElement
 from karapace.protobuf.type_element import TypeElement
 from karapace.protobuf.type_tree import TypeTree
+from threading import Lock
+from typing import Final
 
 import abc
+import hashlib
+
+NORMALIZED_SCHEMAS_CACHE_SIZE: Final = 1024
 
 
 def sort_by_name(element: OptionElement) -> str:
@@ -75,11 +82,85 @@ class NormalizedGroupElement(GroupElement):
 
 
 class NormalizedProtobufSchema(ProtobufSchema):
-    proto_file_element: NormalizedProtoFileElement
+    """Normalized form of a Protobuf schema.
+
+    The text of the normalized schema is all that is needed to look up and
+    register it, the normalized elements are only built when they are used,
+    e.g. by a compatibility check. The normalized texts are cached by the
+    content of the schema and of its dependencies, as producers keep sending
+    the same schemas.
+    """
+
+    _normalized_strs: LRUCache[tuple, str] = LRUCache(maxsize=NORMALIZED_SCHEMAS_CACHE_SIZE)
+    _normalized_strs_lock = Lock()
+
+    def __init__(self, protobuf_schema: ProtobufSchema, normalized_str: str = "") -> None:
+        self._source = protobuf_schema
+        self._normalized_proto_file_element: NormalizedProtoFileElement | None = None
+        super().__init__(
+            protobuf_schema.schema,
+            protobuf_schema.references,
+            protobuf_schema.dependencies,
+            protobuf_schema.proto_file_element,
+        )
+        self.cache_string = normalized_str
+
+    @property  # type: ignore[override]
+    def proto_file_element(self) -> NormalizedProtoFileElement:
+        if self._normalized_proto_file_element is None:
+            self._normalized_proto_file_element = normalize_proto_file_element(self._source)
+        return self._normalized_proto_file_element
+
+    @proto_file_element.setter
+    def proto_file_element(self, _: ProtoFileElement) -> None:
+        # Set by the parent constructor with the element of the source schema,
+        # the normalized element is derived from the source on first use.
+        pass
+
+    # Normalization keeps the declared types, only the types used by the fields
+    # are rewritten, the types of the source schema are used as they are.
+    def types_tree(self) -> TypeTree:
+        return self._source.types_tree()
+
+    def types_tree_recursive(
+        self,
+        root_tree: TypeTree,
+        inserted_types: int,
+        filename: str,
+        added_dependencies: set[tuple[str, str]] | None = None,
+    ) -> int:
+        return self._source.types_tree_recursive(root_tree, inserted_types, filename, added_dependencies)
+
+    def inserted_types_count(self) -> int:
+        return self._source.inserted_types_count()
+
+    def verify_schema_dependencies(self) -> DependencyVerifierResult:
+        return self._source.verify_schema_dependencies()
 
     @staticmethod
     def from_protobuf_schema(protobuf_schema: ProtobufSchema) -> NormalizedProtobufSchema:
-        return normalize(protobuf_schema)
+        key = (
+            hashlib.sha1(protobuf_schema.schema.encode("utf8")).digest(),
+            _dependencies_key(protobuf_schema.dependencies),
+        )
+        with NormalizedProtobufSchema._normalized_strs_lock:
+            normalized_str = NormalizedProtobufSchema._normalized_strs.get(key, "")
+        normalized_schema = NormalizedProtobufSchema(protobuf_schema, normalized_str)
+        if not normalized_str:
+            normalized_str = str(normalized_schema)
+            with NormalizedProtobufSchema._normalized_strs_lock:
+                NormalizedProtobufSchema._normalized_strs[key] = normalized_str
+        return normalized_schema
+
+
+def _dependencies_key(dependencies: Mapping[str, Dependency] | None) -> tuple:
+    """Identify the dependencies by their names and the fingerprints of their schemas, recursively."""
+    if not dependencies:
+        return ()
+    return tuple(
+        (name, dependency.schema.fingerprint(), _dependencies_key(dependency.schema.dependencies))
+        for name, dependency in sorted(dependencies.items())
+    )
 
 
 class NormalizedOneOfElement(OneOfElement):
@@ -266,7 +347,7 @@ def service_element_with_sorted_options(service_element: ServiceElement) -> Norm
     )
 
 
-def normalize(protobuf_schema: ProtobufSchema) -> NormalizedProtobufSchema:
+def normalize_proto_file_element(protobuf_schema: ProtobufSchema) -> NormalizedProtoFileElement:
     proto_file_element = protobuf_schema.proto_file_element
     type_tree = protobuf_schema.types_tree()
     package = proto_file_element.package_name or ""
@@ -281,7 +362,7 @@ def normalize(protobuf_schema: ProtobufSchema) -> NormalizedProtobufSchema:
         extends_element_with_sorted_options(extend, package, type_tree) for extend in proto_file_element.extend_declarations
     ]
 
-    normalized_protobuf_element = NormalizedProtoFileElement(
+    return NormalizedProtoFileElement(
         location=proto_file_element.location,
         package_name=proto_file_element.package_name,
         syntax=proto_file_element.syntax,
@@ -293,9 +374,6 @@ def normalize(protobuf_schema: ProtobufSchema) -> NormalizedProtobufSchema:
         options=sorted_options,
     )
 
-    return NormalizedProtobufSchema(
-        protobuf_schema.schema,
-        protobuf_schema.references,
-        protobuf_schema.dependencies,
-        normalized_protobuf_element,
-    )
+
+def normalize(protobuf_schema: ProtobufSchema) -> NormalizedProtobufSchema:
+    return NormalizedProtobufSchema(protobuf_schema)
@@ -3,4 +3,11 @@ Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
 
-from .protopace import check_compatibility, format_proto, IncompatibleError, Proto  # noqa: F401
+from .protopace import (  # noqa: F401
+    check_compatibility,
+    check_compatibility_many,
+    CheckMode,
+    format_proto,
+    IncompatibleError,
+    Proto,
+)
@@ -3,9 +3,12 @@ Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
 
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from enum import IntEnum
 from functools import cached_property
 from karapace.errors import InvalidSchema
+from typing import Optional
 
 import ctypes
 import importlib.util
@@ -27,6 +30,18 @@ lib.FormatSchema.argtypes = [
 ]
 lib.FormatSchema.restype = ctypes.c_void_p
 lib.CheckCompatibility.restype = ctypes.c_char_p
+lib.CheckCompatibilityMany.argtypes = [
+    ctypes.Array,  # schema names, the new schema first
+    ctypes.Array,  # schema strings
+    ctypes.c_int,  # number of schemas
+    ctypes.Array,  # dependency names
+    ctypes.Array,  # dependency schema strings
+    ctypes.c_int,  # number of dependencies
+    ctypes.Array,  # dependency indexes of all the schemas
+    ctypes.Array,  # offsets of the dependency indexes of each schema
+    ctypes.c_int,  # check mode
+]
+lib.CheckCompatibilityMany.restype = ctypes.POINTER(ctypes.c_char_p)
 
 
 class FormatResult(ctypes.Structure):
@@ -56,6 +71,12 @@ class IncompatibleError(Exception):
     pass
 
 
+class CheckMode(IntEnum):
+    BACKWARD = 0
+    FORWARD = 1
+    FULL = 2
+
+
 def format_proto(proto: Proto) -> str:
     length = len(proto.all_dependencies)
     c_dependencies = (ctypes.c_char_p * length)(*[d.schema.encode() for d in proto.all_dependencies])
@@ -103,6 +124,45 @@ def check_compatibility(proto: Proto, prev_proto: Proto) -> None:
         raise IncompatibleError(msg)
 
 
+def check_compatibility_many(
+    proto: Proto, prev_protos: Sequence[Proto], mode: CheckMode = CheckMode.BACKWARD
+) -> list[Optional[str]]:
+    """Check `proto` against each of `prev_protos` in a single call.
+
+    The dependencies shared by the schemas are passed only once. Returns the
+    error of each previous schema, or None when it is compatible.
+    """
+    if not prev_protos:
+        return []
+
+    protos = [proto, *prev_protos]
+    dependency_indexes: dict[tuple[str, str], int] = {}
+    indexes: list[int] = []
+    offsets = [0]
+    for p in protos:
+        for dep in p.all_dependencies:
+            indexes.append(dependency_indexes.setdefault((dep.name, dep.schema), len(dependency_indexes)))
+        offsets.append(len(indexes))
+
+    length = len(protos)
+    dep_length = len(dependency_indexes)
+    res_ptr = lib.CheckCompatibilityMany(
+        (ctypes.c_char_p * length)(*[p.name.encode() for p in protos]),
+        (ctypes.c_char_p * length)(*[p.schema.encode() for p in protos]),
+        length,
+        (ctypes.c_char_p * dep_length)(*[name.encode() for name, _ in dependency_indexes]),
+        (ctypes.c_char_p * dep_length)(*[schema.encode() for _, schema in dependency_indexes]),
+        dep_length,
+        (ctypes.c_int * len(indexes))(*indexes),
+        (ctypes.c_int * len(offsets))(*offsets),
+        mode,
+    )
+    try:
+        return [None if res_ptr[i] is None else res_ptr[i].decode() for i in range(len(prev_protos))]
+    finally:
+        lib.FreeResults(res_ptr, len(prev_protos))
+
+
 SCHEMA = """
 syntax = "proto3";
 
@@ -183,6 +243,25 @@ def _time_check_compatibility() -> None:
     print(f"Execution time per loop: {_format_time(seconds / number)}")
 
 
+def _time_check_compatibility_many() -> None:
+    versions = 10
+
+    def test() -> None:
+        protos = [
+            Proto("test.proto", SCHEMA, [Proto("my/awesome/customer/v1/nested_value.proto", DEPENDENCY)])
+            for _ in range(versions + 1)
+        ]
+        check_compatibility_many(protos[0], protos[1:])
+
+    number = 1000
+    seconds = timeit.timeit(test, number=number)
+
+    print(f"----- Compatibility Check against {versions} versions -----")
+    print(f"Total time: {_format_time(seconds)}")
+    print(f"Execution time per loop: {_format_time(seconds / number)}")
+
+
 if __name__ == "__main__":
     _time_format()
     _time_check_compatibility()
+    _time_check_compatibility_many()
@@ -190,6 +190,14 @@ class ProtobufSchema:
         self.references = references
         self.dependencies = dependencies
 
+        # The schema is immutable, the structures derived from it are built on
+        # first use and shared by normalization, validation and compatibility.
+        self._types_tree: TypeTree | None = None
+        self._inserted_types_count: int | None = None
+        self._used_types: list[UsedType] | None = None
+        self._recursive_imports: frozenset[str] | None = None
+        self._dependencies_verification: DependencyVerifierResult | None = None
+
     def type_in_tree(self, tree: TypeTree, remaining_tokens: list[str]) -> TypeTree | None:
         if remaining_tokens:
             to_seek = remaining_tokens.pop()
@@ -226,14 +234,14 @@ class ProtobufSchema:
     def type_exist_in_tree(self, tree: TypeTree, remaining_tokens: list[str]) -> bool:
         return self.type_in_tree(tree, remaining_tokens) is not None
 
-    def recursive_imports(self) -> set[str]:
-        imports = set(self.proto_file_element.imports)
-
-        if self.dependencies:
-            for key in self.dependencies:
-                imports = imports | self.dependencies[key].get_schema().schema.recursive_imports()
-
-        return imports
+    def recursive_imports(self) -> frozenset[str]:
+        if self._recursive_imports is None:
+            imports = set(self.proto_file_element.imports)
+            if self.dependencies:
+                for key in self.dependencies:
+                    imports.update(self.dependencies[key].get_schema().schema.recursive_imports())
+            self._recursive_imports = frozenset(imports)
+        return self._recursive_imports
 
     def are_type_usage_valid(self, root_type_tree: TypeTree, used_types: list[UsedType]) -> tuple[bool, str | None]:
         # Please note that this check only ensures the requested type exists. However, for performance reasons, it works in
@@ -291,14 +299,15 @@ class ProtobufSchema:
         return True, None
 
     def verify_schema_dependencies(self) -> DependencyVerifierResult:
-        declared_types_root_tree = self.types_tree()
-        used_types_list = self.used_types()
-        are_declarations_valid, maybe_wrong_declaration = self.are_type_usage_valid(
-            declared_types_root_tree, used_types_list
-        )
-        if are_declarations_valid:
-            return DependencyVerifierResult(True)
-        return DependencyVerifierResult(False, f'type "{maybe_wrong_declaration}" is not defined')
+        if self._dependencies_verification is None:
+            are_declarations_valid, maybe_wrong_declaration = self.are_type_usage_valid(self.types_tree(), self.used_types())
+            if are_declarations_valid:
+                self._dependencies_verification = DependencyVerifierResult(True)
+            else:
+                self._dependencies_verification = DependencyVerifierResult(
+                    False, f'type "{maybe_wrong_declaration}" is not defined'
+                )
+        return self._dependencies_verification
 
     def nested_type_tree(
         self,
@@ -322,14 +331,24 @@ class ProtobufSchema:
         root_tree: TypeTree,
         inserted_types: int,
         filename: str,
+        added_dependencies: set[tuple[str, str]] | None = None,
     ) -> int:
         # verify that the import it's the same as the order of importing
         if self.dependencies:
+            # A dependency imported through several paths declares the same types
+            # again, they are already in the tree since its first import and only
+            # the insertion counter has to move on.
+            if added_dependencies is None:
+                added_dependencies = set()
             for dependency in self.dependencies:
-                inserted_types = (
-                    self.dependencies[dependency]
-                    .get_schema()
-                    .schema.types_tree_recursive(root_tree, inserted_types, dependency)
+                dependency_schema = self.dependencies[dependency].get_schema()
+                key = (dependency, dependency_schema.schema_str)
+                if key in added_dependencies:
+                    inserted_types += dependency_schema.schema.inserted_types_count()
+                    continue
+                added_dependencies.add(key)
+                inserted_types = dependency_schema.schema.types_tree_recursive(
+                    root_tree, inserted_types, dependency, added_dependencies
                 )
 
         # we can add an incremental number and a reference to the file
@@ -351,14 +370,30 @@ class ProtobufSchema:
 
         return inserted_types
 
+    def inserted_types_count(self) -> int:
+        """Returns how far `types_tree_recursive` moves the insertion counter for this schema."""
+        if self._inserted_types_count is None:
+            count = 0
+            if self.dependencies:
+                for dependency in self.dependencies.values():
+                    count += dependency.get_schema().schema.inserted_types_count()
+            for element_type in self.proto_file_element.types:
+                count += 1
+                for nested_type in element_type.nested_types:
+                    count += 1 + len(nested_type.nested_types)
+            self._inserted_types_count = count
+        return self._inserted_types_count
+
     def types_tree(self) -> TypeTree:
-        root_tree = TypeTree(
-            token=".",
-            children=[],
-            source_reference=None,
-        )
-        self.types_tree_recursive(root_tree, 0, "main_schema_file")
-        return root_tree
+        if self._types_tree is None:
+            root_tree = TypeTree(
+                token=".",
+                children=[],
+                source_reference=None,
+            )
+            self.types_tree_recursive(root_tree, 0, "main_schema_file")
+            self._types_tree = root_tree
+        return self._types_tree
 
     @staticmethod
     def used_type(parent: str, element_type: str) -> list[UsedType]:
@@ -392,10 +427,10 @@ class ProtobufSchema:
         return dependencies
 
     def used_types(self) -> list[UsedType]:
-        dependencies_used_types = []
-        if self.dependencies:
-            for key in self.dependencies:
-                dependencies_used_types += self.dependencies[key].get_schema().schema.used_types()
+        # Only the types used by this schema are checked, the dependencies were
+        # verified when they were registered.
+        if self._used_types is not None:
+            return self._used_types
 
         used_types = []
 
@@ -415,6 +450,7 @@ class ProtobufSchema:
             for nested_type in element_type.nested_types:
                 used_types += self.nested_used_type(package_name, type_name, nested_type)
 
+        self._used_types = used_types
         return used_types
 
     def nested_used_type(
@@ -8,6 +8,17 @@ from karapace.protobuf.exception import IllegalStateException
 from karapace.protobuf.location import Location
 from typing import NoReturn, Union
 
+import re
+
+# The reader consumes runs of characters with these patterns instead of one
+# character at a time.
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_WORD = re.compile(r"[a-zA-Z0-9_.\-]*")
+_QUOTED_STRING_CHARS = {
+    '"': re.compile(r'[^"\\\n]*'),
+    "'": re.compile(r"[^'\\\n]*"),
+}
+
 
 class SyntaxReader:
     def __init__(self, data: str, location: Location) -> None:
@@ -44,6 +55,10 @@ class SyntaxReader:
                 self.pos += 1
                 return True
             return False
+        if self.pos < len(self.data):
+            c = self.data[self.pos]
+            if c not in " \t\r\n/":
+                return c
         self.skip_whitespace(True)
         self.expect(self.pos < len(self.data), "unexpected end of file")
         return self.data[self.pos]
@@ -68,6 +83,12 @@ class SyntaxReader:
         result = []
 
         while self.pos < len(self.data):
+            end = _QUOTED_STRING_CHARS[start_quote].match(self.data, self.pos).end()
+            if end > self.pos:
+                result.append(self.data[self.pos : end])
+                self.pos = end
+                if self.pos == len(self.data):
+                    break
             c = self.data[self.pos]
             self.pos += 1
             if c == start_quote:
@@ -165,17 +186,7 @@ class SyntaxReader:
         """Reads a non-empty word and returns it."""
         self.skip_whitespace(True)
         start = self.pos
-        while self.pos < len(self.data):
-            c = self.data[self.pos]
-            if (
-                ord(c) in range(ord("a"), ord("z") + 1)
-                or ord(c) in range(ord("A"), ord("Z") + 1)
-                or ord(c) in range(ord("0"), ord("9") + 1)
-                or c in ["_", "-", "."]
-            ):
-                self.pos += 1
-            else:
-                break
+        self.pos = _WORD.match(self.data, start).end()
         self.expect(start < self.pos, "expected a word")
         return self.data[start : self.pos]
 
@@ -249,12 +260,12 @@ class SyntaxReader:
             if self.pos < len(self.data) and self.data[self.pos] == " ":
                 self.pos += 1  # Skip a single leading space, if present.
             start = self.pos
-            while self.pos < len(self.data):
-                c = self.data[self.pos]
-                self.pos += 1
-                if c == "\n":
-                    self.newline()
-                    break
+            end = self.data.find("\n", start)
+            if end == -1:
+                self.pos = len(self.data)
+            else:
+                self.pos = end + 1
+                self.newline()
             result = self.data[start : self.pos - 1]
         if not result:
             self.unexpected("unexpected '/'")
@@ -337,10 +348,13 @@ class SyntaxReader:
         """
         while self.pos < len(self.data):
             c = self.data[self.pos]
-            if c in [" ", "\t", "\r", "\n"]:
-                self.pos += 1
-                if c == "\n":
-                    self.newline()
+            if c in " \t\r\n":
+                start = self.pos
+                self.pos = _WHITESPACE.match(self.data, start).end()
+                last_newline = self.data.rfind("\n", start, self.pos)
+                if last_newline != -1:
+                    self.line += self.data.count("\n", start, last_newline + 1)
+                    self.line_start = last_newline + 1
             elif skip_comments and c == "/":
                 self.read_comment()
             else:
@@ -355,9 +369,8 @@ class SyntaxReader:
         return self._location.at(self.line + 1, self.pos - self.line_start + 1)
 
     def expect(self, condition: bool, message: str) -> None:
-        location = self.location()
         if not condition:
-            self.unexpected(message, location)
+            self.unexpected(message, self.location())
 
     def expect_with_location(self, condition: bool, location: Location, message: str) -> None:
         if not condition:
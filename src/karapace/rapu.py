@@ -7,11 +7,13 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from accept_types import get_best_match
+from collections.abc import Sequence
 from http import HTTPStatus
 from karapace.config import Config, create_server_ssl_context
 from karapace.statsd import StatsClient
 from karapace.utils import json_decode, json_encode
 from karapace.version import __version__
+from multidict import CIMultiDict
 from typing import Callable, NoReturn, Optional, overload, Union
 
 import aiohttp
@@ -22,6 +24,7 @@ import cgi  # pylint: disable=deprecated-module
 import hashlib
 import logging
 import re
+import socket
 import time
 
 SERVER_NAME = f"Karapace/{__version__}"
@@ -78,6 +81,7 @@ class HTTPRequest:
         self.path_for_stats = path_for_stats
         self.method = method
         self.json: Optional[dict] = None
+        self.body: bytes = b""
 
     @overload
     def get_header(self, header: str) -> Optional[str]:
@@ -281,6 +285,7 @@ class RestApp:
                 raise HTTPResponse(body=b"", status=HTTPStatus.OK, headers=headers)
 
             body = await request.read()
+            rapu_request.body = body
             if json_request:
                 if not body:
                     raise HTTPResponse(body="Missing request JSON body", status=HTTPStatus.BAD_REQUEST)
@@ -352,6 +357,10 @@ class RestApp:
                 headers = {"Content-Type": "application/json"}
                 data = {"error_code": HTTPStatus.INTERNAL_SERVER_ERROR.value, "message": "Internal server error"}
                 status = HTTPStatus.INTERNAL_SERVER_ERROR
+            # Responses passed through from another node carry header names in
+            # the case they were received with, they must be replaced rather
+            # than duplicated.
+            headers = CIMultiDict(headers)
             headers.update(self.cors_and_server_headers_for_request(request=rapu_request))
 
             if isinstance(data, (dict, list)):
@@ -365,10 +374,13 @@ class RestApp:
 
             # On 204 - NO CONTENT there is no point of calculating cache headers
             if is_success(status):
-                if resp_bytes:
-                    etag = f'"{hashlib.md5(resp_bytes).hexdigest()}"'
-                else:
-                    etag = '""'
+                # Responses passed through from another node already carry the etag of the same bytes
+                etag = headers.get("etag")
+                if etag is None:
+                    if resp_bytes:
+                        etag = f'"{hashlib.md5(resp_bytes).hexdigest()}"'
+                    else:
+                        etag = '""'
                 if_none_match = request.headers.get("if-none-match")
                 if if_none_match and if_none_match.replace("W/", "") == etag:
                     status = HTTPStatus.NOT_MODIFIED
@@ -482,13 +494,15 @@ class RestApp:
             if "Added route will never be executed, method OPTIONS is already registered" not in str(ex):
                 raise
 
-    def run(self) -> None:
+    def run(self, sockets: Optional[Sequence[socket.socket]] = None) -> None:
+        """Serve the app on `host` and `port`, or on already bound `sockets`."""
         ssl_context = create_server_ssl_context(self.config)
 
         aiohttp.web.run_app(
             app=self.app,
-            host=self.config["host"],
-            port=self.config["port"],
+            host=None if sockets else self.config["host"],
+            port=None if sockets else self.config["port"],
+            sock=sockets,
             ssl_context=ssl_context,
             access_log_class=self.config["access_log_class"],
             access_log_format='%Tfs %{x-client-ip}i "%r" %s "%{user-agent}i" response=%bb request_body=%{content-length}ib',
@@ -0,0 +1,138 @@
+"""
+karapace - Schema registry worker processes sharing one listening port
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from karapace.config import Config
+from karapace.shared_database import create_shared_database_file
+from multiprocessing.connection import wait
+from types import FrameType
+from typing import Callable, Final
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+
+LOG = logging.getLogger(__name__)
+
+PRIMARY_WORKER: Final = 0
+
+# Runs the registry of a worker on the given listening sockets and returns its exit code.
+WorkerTarget = Callable[[Config, Sequence[socket.socket]], int]
+
+
+def worker_config(config: Config, index: int) -> Config:
+    """Return the configuration of the worker with the given index.
+
+    Every worker replays the schemas topic on its own, but only the primary
+    worker is master eligible. It advertises its own port, so that writes
+    forwarded to the master reach it instead of any of the workers listening
+    on the shared port. An `advertised_port` configured to another port than
+    the shared one, e.g. one mapped to the primary worker port by a proxy, is
+    kept as is.
+    """
+    new_config = config.copy()
+    new_config["client_id"] = f"{config['client_id']}-{index}"
+    new_config["registry_worker_index"] = index
+    if index == PRIMARY_WORKER:
+        # Not configured, `set_config_defaults` falls back to the listening port.
+        if config["advertised_port"] == config["port"]:
+            new_config["advertised_port"] = config["registry_primary_worker_port"]
+    else:
+        new_config["master_eligibility"] = False
+    return new_config
+
+
+def listening_socket(host: str, port: int, *, reuse_port: bool) -> socket.socket:
+    family, type_, proto, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)[0]
+    sock = socket.socket(family, type_, proto)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            # The kernel balances the connections between the sockets of all
+            # workers bound to the port.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(address)
+    except OSError:
+        sock.close()
+        raise
+    sock.setblocking(False)
+    return sock
+
+
+def worker_sockets(config: Config, index: int) -> list[socket.socket]:
+    sockets = [listening_socket(config["host"], config["port"], reuse_port=True)]
+    if index == PRIMARY_WORKER:
+        sockets.append(listening_socket(config["host"], config["registry_primary_worker_port"], reuse_port=False))
+    return sockets
+
+
+def _run_worker(config: Config, index: int, target: WorkerTarget) -> None:
+    config = worker_config(config, index)
+    LOG.info("Starting registry worker %s", index)
+    sys.exit(target(config, worker_sockets(config, index)))
+
+
+def run_workers(config: Config, target: WorkerTarget) -> int:
+    """Fork `registry_workers` processes running `target` and supervise them.
+
+    The workers are forked before the registry is created, so that none of
+    its threads or connections are shared with them. When a worker exits the
+    others are stopped as well, as the primary worker cannot be replaced
+    while the others keep running. The exit code of the first worker to exit
+    is returned.
+
+    With `registry_shared_database` the journal file of the shared database is
+    created before the workers are started, and removed once they have exited.
+    """
+    if config["registry_shared_database"]:
+        config = config.copy()
+        if config["registry_shared_database_path"] is None:
+            fd, config["registry_shared_database_path"] = tempfile.mkstemp(
+                prefix="karapace-schemas-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None
+            )
+            os.close(fd)
+        create_shared_database_file(config["registry_shared_database_path"])
+        try:
+            return _supervise(config, target)
+        finally:
+            os.unlink(config["registry_shared_database_path"])
+    return _supervise(config, target)
+
+
+def _supervise(config: Config, target: WorkerTarget) -> int:
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_run_worker, args=(config, index, target), name=f"karapace-registry-worker-{index}")
+        for index in range(config["registry_workers"])
+    ]
+    for worker in workers:
+        worker.start()
+
+    def stop(signum: int, frame: FrameType | None) -> None:  # pylint: disable=unused-argument
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    previous_handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        sentinels = wait([worker.sentinel for worker in workers])
+        exited = next(worker for worker in workers if worker.sentinel in sentinels)
+        # The sentinel is ready before the process can be reaped.
+        exited.join()
+        LOG.info("Registry worker %s exited with %s, stopping the other workers", exited.name, exited.exitcode)
+        stop(signal.SIGTERM, None)
+        for worker in workers:
+            worker.join()
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    return exited.exitcode or 0
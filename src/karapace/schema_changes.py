@@ -0,0 +1,138 @@
+"""
+karapace - Schema registry change feed
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections import deque
+from karapace.dataclasses import default_dataclass
+from karapace.typing import JsonObject, SchemaId, Subject, Version
+from threading import Lock
+
+import asyncio
+
+
+@default_dataclass
+class SchemaChange:
+    offset: int
+    keytype: str
+    subject: Subject | None
+    version: Version | None
+    schema_id: SchemaId | None
+    deleted: bool
+
+    def to_dict(self) -> JsonObject:
+        return {
+            "offset": self.offset,
+            "keytype": self.keytype,
+            "subject": self.subject,
+            "version": self.version.value if self.version is not None else None,
+            "id": self.schema_id,
+            "deleted": self.deleted,
+        }
+
+
+def schema_change_from_record(offset: int, key: dict, value: dict | None) -> SchemaChange | None:
+    """Describe an applied `_schemas` record as a change, `None` for records that change nothing."""
+    keytype = key.get("keytype")
+    if keytype == "SCHEMA":
+        return SchemaChange(
+            offset=offset,
+            keytype=keytype,
+            subject=Subject(key["subject"]),
+            version=Version(key["version"]),
+            schema_id=SchemaId(value["id"]) if value else None,
+            # A record without a value is a hard delete of the version.
+            deleted=bool(value.get("deleted", False)) if value else True,
+        )
+    if keytype == "CONFIG":
+        subject = key.get("subject")
+        return SchemaChange(
+            offset=offset,
+            keytype=keytype,
+            subject=Subject(subject) if subject is not None else None,
+            version=None,
+            schema_id=None,
+            deleted=not value,
+        )
+    if keytype == "DELETE_SUBJECT" and value is not None:
+        return SchemaChange(
+            offset=offset,
+            keytype=keytype,
+            subject=Subject(value["subject"]),
+            version=Version(value["version"]),
+            schema_id=None,
+            deleted=True,
+        )
+    return None
+
+
+class SchemaChangeFeed:
+    """Bounded buffer of the most recent changes applied by the schema reader.
+
+    Changes are appended by the schema reader thread and read by the REST API,
+    clients use the offset of the last change they have seen as a token to
+    fetch only the changes applied after it. Requests waiting for changes are
+    woken up on their event loop when a change is appended.
+    """
+
+    def __init__(self, max_changes: int) -> None:
+        self._lock = Lock()
+        self._changes: deque[SchemaChange] = deque(maxlen=max_changes)
+        # Offset of the last change dropped from the buffer, clients with an
+        # older token have missed changes and must reload the full state.
+        self._evicted_offset = -1
+        self._latest_offset = -1
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def latest_offset(self) -> int:
+        return self._latest_offset
+
+    def append(self, change: SchemaChange) -> None:
+        with self._lock:
+            if self._changes.maxlen is not None and len(self._changes) == self._changes.maxlen:
+                self._evicted_offset = self._changes[0].offset
+            self._changes.append(change)
+            self._latest_offset = change.offset
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The event loop of the waiting request was closed meanwhile.
+                pass
+
+    async def wait_for_changes(self, offset: int, timeout: float) -> None:
+        """Wait until a change after `offset` is appended, at most `timeout` seconds."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._latest_offset > offset:
+                return
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def changes_since(self, offset: int) -> tuple[list[SchemaChange], bool]:
+        """Return the buffered changes after `offset` and whether changes were lost.
+
+        The changes are lost if the buffer has dropped changes newer than the
+        given offset, in that case the returned list is incomplete.
+        """
+        with self._lock:
+            truncated = offset < self._evicted_offset
+            if offset >= self._latest_offset:
+                return [], truncated
+            changes: list[SchemaChange] = []
+            for change in reversed(self._changes):
+                if change.offset <= offset:
+                    break
+                changes.append(change)
+        changes.reverse()
+        return changes, truncated
@@ -0,0 +1,319 @@
+"""
+karapace - Executor for CPU-heavy schema operations
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from karapace.compatibility import CompatibilityModes
+from karapace.compatibility.jsonschema.checks import is_incompatible
+from karapace.compatibility.protobuf.checks import check_protopace_compatibility
+from karapace.compatibility.schema_compatibility import SchemaCompatibility
+from karapace.config import Config
+from karapace.dataclasses import default_dataclass
+from karapace.dependency import Dependency
+from karapace.protobuf import protopace
+from karapace.schema_models import ParsedTypedSchema, TypedSchema, ValidatedTypedSchema
+from karapace.schema_references import Reference
+from karapace.schema_type import SchemaType
+from karapace.statsd import StatsClient
+from karapace.typing import SchemaExecutorType, Subject, Version
+from typing import Any, Callable, Final, TypeVar
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+
+LOG = logging.getLogger(__name__)
+
+METRIC_QUEUE_TIME: Final = "karapace_schema_executor_queue_time"
+METRIC_RUN_TIME: Final = "karapace_schema_executor_run_time"
+
+T = TypeVar("T")
+P = TypeVar("P", bound=ParsedTypedSchema)
+
+
+@default_dataclass
+class SchemaSource:
+    """Picklable description of a schema, its references and the sources of its dependencies.
+
+    Parsed schemas are not cheap to transfer between processes, the source is
+    parsed again by the worker running the operation.
+    """
+
+    schema_type: SchemaType
+    schema_str: str
+    references: Sequence[Reference] | None = None
+    dependencies: Sequence[tuple[Reference, SchemaSource]] | None = None
+
+
+def schema_source(schema: TypedSchema) -> SchemaSource:
+    return _schema_source(
+        schema_type=schema.schema_type,
+        schema_str=schema.schema_str,
+        references=schema.references,
+        dependencies=schema.dependencies,
+    )
+
+
+def _schema_source(
+    *,
+    schema_type: SchemaType,
+    schema_str: str,
+    references: Sequence[Reference] | None,
+    dependencies: Mapping[str, Dependency] | None,
+) -> SchemaSource:
+    dependency_sources = None
+    if dependencies:
+        dependency_sources = tuple(
+            (Reference(name=dep.name, subject=dep.subject, version=dep.version), schema_source(dep.get_schema()))
+            for dep in dependencies.values()
+        )
+    return SchemaSource(
+        schema_type=schema_type,
+        schema_str=schema_str,
+        references=tuple(references) if references else None,
+        dependencies=dependency_sources,
+    )
+
+
+def _parse_dependencies(
+    source: SchemaSource,
+    parsed: dict[tuple[Subject, Version], ValidatedTypedSchema] | None = None,
+) -> dict[str, Dependency] | None:
+    """Parse the dependencies of `source`.
+
+    The schemas parsed are kept in `parsed` by subject and version, versions
+    referenced by several schemas are parsed once.
+    """
+    if source.dependencies is None:
+        return None
+    if parsed is None:
+        parsed = {}
+    dependencies = {}
+    for reference, dependency_source in source.dependencies:
+        key = (reference.subject, reference.version)
+        dependency_schema = parsed.get(key)
+        if dependency_schema is None:
+            dependency_schema = ValidatedTypedSchema.parse(
+                schema_type=dependency_source.schema_type,
+                schema_str=dependency_source.schema_str,
+                references=dependency_source.references,
+                dependencies=_parse_dependencies(dependency_source, parsed),
+            )
+            parsed[key] = dependency_schema
+        dependencies[reference.name] = Dependency.of(reference, dependency_schema)
+    return dependencies
+
+
+def _proto(source: SchemaSource, name: str = "schema.proto") -> protopace.Proto:
+    dependencies = [_proto(dependency_source, reference.name) for reference, dependency_source in source.dependencies or ()]
+    return protopace.Proto(name, source.schema_str, dependencies)
+
+
+def check_compatibility(
+    old_schemas: Sequence[ParsedTypedSchema | SchemaSource],
+    new_schema: ValidatedTypedSchema | SchemaSource,
+    compatibility_mode: CompatibilityModes,
+    use_protobuf_formatter: bool = False,
+) -> SchemaCompatibilityResult:
+    """Check the new schema against the old schemas, stopping at the first incompatible one.
+
+    Schemas given as sources are parsed first, the versions they reference are
+    parsed once. With `use_protobuf_formatter` Protobuf schemas are checked by
+    protopace against all the old schemas in one call, without parsing them in Python.
+    """
+    if (
+        use_protobuf_formatter
+        and new_schema.schema_type is SchemaType.PROTOBUF
+        and all(old_schema.schema_type is SchemaType.PROTOBUF for old_schema in old_schemas)
+    ):
+        return check_protopace_compatibility(
+            _proto(_as_source(new_schema)),
+            [_proto(_as_source(old_schema)) for old_schema in old_schemas],
+            compatibility_mode,
+        )
+
+    parsed_dependencies: dict[tuple[Subject, Version], ValidatedTypedSchema] = {}
+    if isinstance(new_schema, SchemaSource):
+        new_schema = ValidatedTypedSchema.parse(
+            schema_type=new_schema.schema_type,
+            schema_str=new_schema.schema_str,
+            references=new_schema.references,
+            dependencies=_parse_dependencies(new_schema, parsed_dependencies),
+        )
+
+    result = SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
+    for old_schema in old_schemas:
+        if isinstance(old_schema, SchemaSource):
+            old_schema = ParsedTypedSchema.parse(
+                schema_type=old_schema.schema_type,
+                schema_str=old_schema.schema_str,
+                references=old_schema.references,
+                dependencies=_parse_dependencies(old_schema, parsed_dependencies),
+            )
+        result = SchemaCompatibility.check_compatibility(
+            old_schema=old_schema,
+            new_schema=new_schema,
+            compatibility_mode=compatibility_mode,
+        )
+        if is_incompatible(result):
+            return result
+    return result
+
+
+def _as_source(schema: ParsedTypedSchema | SchemaSource) -> SchemaSource:
+    return schema if isinstance(schema, SchemaSource) else schema_source(schema)
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[float, T | None, BaseException | None, BaseException | None]:
+    # Exception chains are lost when pickled, the cause is returned alongside
+    # the error so that the caller can rebuild the chain.
+    started_at = time.time()
+    try:
+        return started_at, func(*args), None, None
+    except Exception as e:  # pylint: disable=broad-except
+        return started_at, None, e, e.__cause__
+
+
+class SchemaExecutor:
+    """Runs schema parsing and compatibility checks off the event loop.
+
+    With the `inline` executor the operations run directly on the event loop.
+    The `thread` executor runs them in a thread pool, the `process` executor
+    runs compatibility checks in a process pool and parsing in a thread pool,
+    as parsed schemas are returned to the event loop. At most
+    `schema_executor_workers` operations of each kind run concurrently, the
+    rest wait for their turn and the waiting time is reported as the queue time.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.executor_type: Final = SchemaExecutorType(config["schema_executor"])
+        self.use_protobuf_formatter: Final = config["use_protobuf_formatter"]
+        workers = config["schema_executor_workers"]
+        self.stats = StatsClient(config=config)
+        self._parse_executor: Executor | None = None
+        self._compatibility_executor: Executor | None = None
+        if self.executor_type is not SchemaExecutorType.inline:
+            self._parse_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="karapace_schema")
+            if self.executor_type is SchemaExecutorType.process:
+                # The workers start lazily, once the Kafka clients and the executor
+                # threads run, forking would copy locks held by those threads.
+                self._compatibility_executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+                )
+            else:
+                self._compatibility_executor = self._parse_executor
+        self._parse_semaphore = asyncio.Semaphore(workers)
+        self._compatibility_semaphore = asyncio.Semaphore(workers)
+
+    def close(self) -> None:
+        if self._compatibility_executor is not None and self._compatibility_executor is not self._parse_executor:
+            self._compatibility_executor.shutdown(wait=False, cancel_futures=True)
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(
+        self,
+        executor: Executor | None,
+        semaphore: asyncio.Semaphore,
+        operation: str,
+        func: Callable[..., T],
+        *args: Any,
+    ) -> T:
+        if executor is None:
+            return func(*args)
+
+        tags = {"operation": operation, "executor": str(self.executor_type)}
+        submitted_at = time.time()
+        async with semaphore:
+            started_at, result, error, cause = await asyncio.get_running_loop().run_in_executor(
+                executor, _timed_call, func, *args
+            )
+        self.stats.timing(METRIC_QUEUE_TIME, max(started_at - submitted_at, 0.0), tags=tags)
+        self.stats.timing(METRIC_RUN_TIME, time.time() - started_at, tags=tags)
+        if error is not None:
+            raise error from cause
+        return result  # type: ignore[return-value]
+
+    async def parse(
+        self,
+        schema_class: type[P],
+        *,
+        schema_type: SchemaType,
+        schema_str: str,
+        references: Sequence[Reference] | None = None,
+        dependencies: Mapping[str, Dependency] | None = None,
+        normalize: bool = False,
+        use_protobuf_formatter: bool = False,
+    ) -> P:
+        parse = functools.partial(
+            schema_class.parse,
+            schema_type=schema_type,
+            schema_str=schema_str,
+            references=references,
+            dependencies=dependencies,
+            normalize=normalize,
+            use_protobuf_formatter=use_protobuf_formatter,
+        )
+        return await self._run(self._parse_executor, self._parse_semaphore, "parse", parse)
+
+    async def stored_schema(
+        self,
+        schema: TypedSchema,
+        *,
+        references: Sequence[Reference] | None = None,
+        dependencies: Mapping[str, Dependency] | None = None,
+    ) -> ParsedTypedSchema | SchemaSource:
+        """Prepare a stored schema, with its already resolved dependencies, for `check_compatibility`.
+
+        The process executor parses the schema in the worker running the check,
+        the other executors parse it here as the parsed schema can be passed as is.
+        Protobuf schemas checked by protopace are not parsed in Python at all.
+        """
+        if self.executor_type is SchemaExecutorType.process or (
+            self.use_protobuf_formatter and schema.schema_type is SchemaType.PROTOBUF
+        ):
+            return _schema_source(
+                schema_type=schema.schema_type,
+                schema_str=schema.schema_str,
+                references=references,
+                dependencies=dependencies,
+            )
+        return await self.parse(
+            ParsedTypedSchema,
+            schema_type=schema.schema_type,
+            schema_str=schema.schema_str,
+            references=references,
+            dependencies=dependencies,
+        )
+
+    async def check_compatibility(
+        self,
+        old_schemas: Sequence[ParsedTypedSchema | SchemaSource],
+        new_schema: ValidatedTypedSchema,
+        compatibility_mode: CompatibilityModes,
+    ) -> SchemaCompatibilityResult:
+        if not old_schemas:
+            return SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
+        new: ValidatedTypedSchema | SchemaSource = new_schema
+        if self.executor_type is SchemaExecutorType.process:
+            # Parsed schemas are not sent to the worker processes.
+            new = schema_source(new_schema)
+            old_schemas = [_as_source(old_schema) for old_schema in old_schemas]
+        return await self._run(
+            self._compatibility_executor,
+            self._compatibility_semaphore,
+            "compatibility",
+            check_compatibility,
+            tuple(old_schemas),
+            new,
+            compatibility_mode,
+            self.use_protobuf_formatter,
+        )
@@ -100,6 +100,9 @@ def parse_protobuf_schema_definition(
 
 
 class TypedSchema:
+    # Millions of schemas and versions may be kept in memory by the registry.
+    __slots__ = ("schema_type", "references", "dependencies", "schema_str", "max_id", "_fingerprint_cached")
+
     def __init__(
         self,
         *,
@@ -122,20 +125,21 @@ class TypedSchema:
         self.dependencies: Final = dependencies
         self.schema_str: Final = TypedSchema.normalize_schema_str(schema_str, schema_type, schema)
         self.max_id: SchemaId | None = None
-        self._fingerprint_cached: str | None = None
+        self._fingerprint_cached: bytes | None = None
 
     def to_dict(self) -> JsonObject:
         if self.schema_type is SchemaType.PROTOBUF:
             raise InvalidSchema("Protobuf do not support to_dict serialization")
         return json_decode(self.schema_str, dict[str, Any])
 
-    def fingerprint(self) -> str:
+    def fingerprint(self) -> bytes:
+        """SHA-1 digest of the schema and its references, used to deduplicate schemas."""
         if self._fingerprint_cached is None:
             fingerprint_str = str(self)
             if self.references is not None:
                 reference_str = "\n".join([repr(reference) for reference in self.references])
                 fingerprint_str = fingerprint_str + reference_str
-            self._fingerprint_cached = hashlib.sha1(fingerprint_str.encode("utf8")).hexdigest()
+            self._fingerprint_cached = hashlib.sha1(fingerprint_str.encode("utf8")).digest()
         return self._fingerprint_cached
 
     # This is marked @final because __init__ references this statically, hence
@@ -278,6 +282,8 @@ class ParsedTypedSchema(TypedSchema):
     are considered by the current version of the SDK invalid.
     """
 
+    __slots__ = ("_schema_cached",)
+
     def __init__(
         self,
         schema_type: SchemaType,
@@ -366,6 +372,8 @@ class ValidatedTypedSchema(ParsedTypedSchema):
     are considered by the current version of the SDK invalid.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         schema_type: SchemaType,
@@ -407,6 +415,8 @@ class ValidatedTypedSchema(ParsedTypedSchema):
 
 @dataclass
 class SchemaVersion:
+    __slots__ = ("subject", "version", "deleted", "schema_id", "schema", "references")
+
     subject: Subject
     version: Version
     deleted: bool
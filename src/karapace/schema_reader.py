@@ -24,11 +24,13 @@ from avro.schema import Schema as AvroSchema
 from collections.abc import Mapping, Sequence
 from confluent_kafka import Message, TopicCollection, TopicPartition
 from contextlib import closing, ExitStack
+from dataclasses import dataclass, field
 from enum import Enum
 from jsonschema.validators import Draft7Validator
 from karapace import constants
 from karapace.config import Config
 from karapace.coordinator.master_coordinator import MasterCoordinator
+from karapace.dataclasses import default_dataclass
 from karapace.dependency import Dependency
 from karapace.errors import InvalidReferences, InvalidSchema, InvalidVersion, ShutdownException
 from karapace.in_memory_database import KarapaceDatabase
@@ -37,13 +39,15 @@ from karapace.kafka.common import translate_from_kafkaerror
 from karapace.kafka.consumer import KafkaConsumer
 from karapace.kafka_error_handler import KafkaErrorHandler, KafkaErrorLocation
 from karapace.key_format import is_key_in_canonical_format, KeyFormatter, KeyMode
-from karapace.offset_watcher import OffsetWatcher
+from karapace.offset_watcher import AsyncOffsetWatcher, OffsetWatcher
 from karapace.protobuf.exception import ProtobufException
 from karapace.protobuf.schema import ProtobufSchema
+from karapace.schema_changes import schema_change_from_record, SchemaChange, SchemaChangeFeed
 from karapace.schema_models import parse_protobuf_schema_definition, SchemaType, TypedSchema, ValidatedTypedSchema
 from karapace.schema_references import LatestVersionReference, Reference, reference_from_mapping, Referents
+from karapace.shared_database import SharedDatabaseReader
 from karapace.statsd import StatsClient
-from karapace.typing import JsonObject, SchemaId, SchemaReaderStoppper, Subject, Version
+from karapace.typing import JsonData, JsonObject, SchemaId, SchemaReaderStoppper, Subject, Version
 from karapace.utils import json_decode, JSONDecodeError, shutdown
 from threading import Event, Lock, Thread
 from typing import Final
@@ -78,12 +82,41 @@ MAX_MESSAGES_TO_CONSUME_ON_STARTUP: Final = 1000
 MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP: Final = 1
 MESSAGE_CONSUME_TIMEOUT_SECONDS: Final = 0.2
 
+# How often the workers following the primary worker check its progress
+SHARED_DATABASE_FOLLOW_INTERVAL_SECONDS: Final = 0.05
+
 # Metric names
 METRIC_SCHEMA_TOPIC_RECORDS_PROCESSED_COUNT: Final = "karapace_schema_reader_records_processed"
 METRIC_SCHEMA_TOPIC_RECORDS_PER_KEYMODE_GAUGE: Final = "karapace_schema_reader_records_per_keymode"
 METRIC_SCHEMAS_GAUGE: Final = "karapace_schema_reader_schemas"
 METRIC_SUBJECTS_GAUGE: Final = "karapace_schema_reader_subjects"
 METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE: Final = "karapace_schema_reader_subject_data_schema_versions"
+METRIC_REPLAY_RECORDS_PER_SECOND_GAUGE: Final = "karapace_schema_reader_replay_records_per_second"
+
+
+@default_dataclass
+class _ConsumedRecord:
+    offset: int
+    key: JsonData = None
+    value: JsonObject | None = None
+    # Set when the message could not be decoded.
+    error: Exception | None = None
+
+
+@default_dataclass
+class _ParsedSchema:
+    """The schema of a SCHEMA record, parsed before the record is applied to the database."""
+
+    schema: TypedSchema
+    references: list[Reference] | None
+
+
+@dataclass
+class _AppliedRecords:
+    schema_records_processed_keymode_canonical: int = 0
+    schema_records_processed_keymode_deprecated_karapace: int = 0
+    offset_seen: int | None = None
+    changes: list[SchemaChange] = field(default_factory=list)
 
 
 class MessageType(Enum):
@@ -166,6 +199,8 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         # the soft delete message and return the correct data instead of the
         # old stale version that has not been deleted yet.)
         self.offset = OFFSET_UNINITIALIZED
+        # Unlike `_offset_watcher`, notified of every offset applied, also on followers.
+        self._applied_offsets = AsyncOffsetWatcher()
         self._highest_offset = OFFSET_UNINITIALIZED
         # when a master its elected as master we should read the last arrived messages at least
         # once. This lock prevent the concurrent modification of the `ready` flag.
@@ -178,6 +213,19 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
         self.key_formatter = key_formatter
 
+        # Recent changes applied to the database, served to clients following
+        # the registry state instead of polling the full listings.
+        self.changes = SchemaChangeFeed(max_changes=config["schema_changes_buffer_size"])
+
+        # Validated schemas of the referenced versions, so that a schema shared
+        # by many others is parsed once. An entry is dropped when its version,
+        # or a version it depends on, is changed or deleted. The generation
+        # counts the invalidations, a schema resolved concurrently with one is
+        # not cached.
+        self._resolved_schemas: dict[tuple[Subject, Version], ValidatedTypedSchema] = {}
+        self._resolved_schemas_lock = Lock()
+        self._resolved_schemas_generation = 0
+
         # Metrics
         self.processed_canonical_keys_total = 0
         self.processed_deprecated_karapace_keys_total = 0
@@ -358,6 +406,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             progress_pct,
             startup_processed_message_per_second,
         )
+        self.stats.gauge(metric=METRIC_REPLAY_RECORDS_PER_SECOND_GAUGE, value=startup_processed_message_per_second)
         self.last_check = cur_time
         self.startup_previous_processed_offset = self.offset
         ready = self.offset >= self._highest_offset
@@ -366,6 +415,20 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             LOG.info("Ready in %s seconds", time.monotonic() - self.start_time)
         return ready
 
+    async def wait_for_offset(self, expected_offset: int, timeout: float) -> bool:
+        """Wait until the record at `expected_offset` has been applied.
+
+        Unlike the offset watcher shared with the producer this works on
+        followers too. Neither the event loop nor a thread is blocked while waiting.
+
+        Args:
+            expected_offset: The offset of the record in the schemas topic.
+            timeout: How long the caller will wait for the offset in seconds.
+        """
+        if self.offset >= expected_offset:
+            return True
+        return await self._applied_offsets.wait_for_offset(expected_offset, timeout)
+
     def highest_offset(self) -> int:
         return max(self._highest_offset, self._offset_watcher.greatest_offset())
 
@@ -403,82 +466,156 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
         self.consume_messages(msgs, watch_offsets)
 
-    def consume_messages(self, msgs: list[Message], watch_offsets: bool) -> None:
-        schema_records_processed_keymode_canonical = 0
-        schema_records_processed_keymode_deprecated_karapace = 0
-        for msg in msgs:
-            try:
-                message_key = msg.key()
-                message_error = msg.error()
-                if message_error is not None:
-                    raise translate_from_kafkaerror(message_error)
-
-                assert message_key is not None
-                key = json_decode(message_key)
-            except AssertionError as exc:
-                LOG.warning("Empty msg.key() at offset %s", msg.offset())
-                self.offset = msg.offset()  # Invalid entry shall also move the offset so Karapace makes progress.
-                self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
-                continue  # [non-strict mode]
-            except JSONDecodeError as exc:
-                non_bytes_key = msg.key().decode()  # type: ignore[union-attr]
-                LOG.warning("Invalid JSON in msg.key(): %s at offset %s", non_bytes_key, msg.offset())
-                self.offset = msg.offset()  # Invalid entry shall also move the offset so Karapace makes progress.
-                self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
-                continue  # [non-strict mode]
-            except (GroupAuthorizationFailedError, TopicAuthorizationFailedError) as exc:
-                LOG.error(
-                    "Kafka authorization error when consuming from %s: %s %s",
-                    self.config["topic_name"],
-                    exc,
-                    msg.error(),
-                )
-                if self.kafka_error_handler.schema_reader_strict_mode:
-                    raise ShutdownException from exc
-                continue
-
-            assert isinstance(key, dict)
-            msg_keymode = KeyMode.CANONICAL if is_key_in_canonical_format(key) else KeyMode.DEPRECATED_KARAPACE
-            # Key mode detection happens on startup.
-            # Default keymode is CANONICAL and preferred unless any data consumed
-            # has key in non-canonical format. If keymode is set to DEPRECATED_KARAPACE
-            # the subsequent keys are omitted from detection.
-            if self.key_formatter.get_keymode() == KeyMode.CANONICAL and msg_keymode == KeyMode.DEPRECATED_KARAPACE:
-                self.key_formatter.set_keymode(KeyMode.DEPRECATED_KARAPACE)
-
-            value = None
-            message_value = msg.value()
-            if message_value:
-                try:
-                    value = self._parse_message_value(message_value)
-                except (JSONDecodeError, TypeError) as exc:
-                    LOG.warning("Invalid JSON in msg.value() at offset %s", msg.offset())
-                    self.offset = msg.offset()  # Invalid entry shall also move the offset so Karapace makes progress.
-                    self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
-                    continue  # [non-strict mode]
+    def _decode_message(self, msg: Message) -> _ConsumedRecord:
+        """Decode the key and value of a consumed message.
 
+        Errors are returned with the record rather than raised, so that they are
+        handled in offset order when the batch is applied.
+        """
+        offset = msg.offset()
+        try:
+            message_key = msg.key()
+            message_error = msg.error()
+            if message_error is not None:
+                raise translate_from_kafkaerror(message_error)
+
+            assert message_key is not None
+            key = json_decode(message_key)
+        except AssertionError as exc:
+            LOG.warning("Empty msg.key() at offset %s", offset)
+            return _ConsumedRecord(offset=offset, error=exc)
+        except JSONDecodeError as exc:
+            non_bytes_key = msg.key().decode()  # type: ignore[union-attr]
+            LOG.warning("Invalid JSON in msg.key(): %s at offset %s", non_bytes_key, offset)
+            return _ConsumedRecord(offset=offset, error=exc)
+        except (GroupAuthorizationFailedError, TopicAuthorizationFailedError) as exc:
+            LOG.error(
+                "Kafka authorization error when consuming from %s: %s %s",
+                self.config["topic_name"],
+                exc,
+                msg.error(),
+            )
+            return _ConsumedRecord(offset=offset, error=exc)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Raised once the records before it in the batch are applied.
+            return _ConsumedRecord(offset=offset, error=exc)
+
+        value = None
+        message_value = msg.value()
+        if message_value:
             try:
-                self.handle_msg(key, value)
-            except (InvalidSchema, InvalidVersion, TypeError) as exc:
-                self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
-                continue
-            finally:
-                self.offset = msg.offset()
-
-            if msg_keymode == KeyMode.CANONICAL:
-                schema_records_processed_keymode_canonical += 1
-            else:
-                schema_records_processed_keymode_deprecated_karapace += 1
+                value = self._parse_message_value(message_value)
+            except (JSONDecodeError, TypeError) as exc:
+                LOG.warning("Invalid JSON in msg.value() at offset %s", offset)
+                return _ConsumedRecord(offset=offset, error=exc)
+
+        return _ConsumedRecord(offset=offset, key=key, value=value)
+
+    def _handle_decode_error(self, record: _ConsumedRecord) -> None:
+        assert record.error is not None
+        if isinstance(record.error, (GroupAuthorizationFailedError, TopicAuthorizationFailedError)):
+            if self.kafka_error_handler.schema_reader_strict_mode:
+                raise ShutdownException from record.error
+            return
+        if not isinstance(record.error, (AssertionError, JSONDecodeError, TypeError)):
+            raise record.error
+        self.offset = record.offset  # Invalid entry shall also move the offset so Karapace makes progress.
+        self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=record.error)
 
-            with self._ready_lock:
-                if self._ready and watch_offsets:
-                    self._offset_watcher.offset_seen(self.offset)
+    def consume_messages(self, msgs: list[Message], watch_offsets: bool) -> None:
+        # The whole batch is decoded and its schemas are parsed first, the records
+        # are then applied to the database holding its lock once, only for the
+        # mutations. A schema with references is parsed once the records before it
+        # are applied, as they may register the referenced versions. The greatest
+        # applied offset is published to the offset watcher once per batch.
+        records = [self._decode_message(msg) for msg in msgs]
+
+        applied = _AppliedRecords()
+        pending: list[tuple[_ConsumedRecord, _ParsedSchema | Exception | None]] = []
+        try:
+            for record in records:
+                if pending and isinstance(record.value, dict) and record.value.get("references"):
+                    self._apply_records(pending, applied)
+                    pending = []
+                pending.append((record, self._parse_record(record)))
+            self._apply_records(pending, applied)
+        finally:
+            if watch_offsets and applied.offset_seen is not None:
+                with self._ready_lock:
+                    if self._ready:
+                        self._offset_watcher.offset_seen(applied.offset_seen)
+            self.database.publish_progress(
+                offset=self.offset,
+                highest_offset=self._highest_offset,
+                ready=self.ready(),
+                compatibility=self.config["compatibility"],
+                changes=applied.changes,
+            )
+            self._applied_offsets.offset_seen(self.offset)
 
         self._report_schema_metrics(
-            schema_records_processed_keymode_canonical,
-            schema_records_processed_keymode_deprecated_karapace,
+            applied.schema_records_processed_keymode_canonical,
+            applied.schema_records_processed_keymode_deprecated_karapace,
         )
 
+    def _parse_record(self, record: _ConsumedRecord) -> _ParsedSchema | Exception | None:
+        """Parse the schema of a SCHEMA record, None for the other records.
+
+        Errors are returned rather than raised, so that they are handled in offset
+        order when the record is applied.
+        """
+        key = record.key
+        if record.error is not None or not isinstance(key, dict) or key.get("keytype") != MessageType.schema.value:
+            return None
+        if not record.value:
+            # Hard deletes have nothing to parse.
+            return None
+        try:
+            return self._parse_msg_schema(record.value)
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+
+    def _apply_records(
+        self,
+        records: list[tuple[_ConsumedRecord, _ParsedSchema | Exception | None]],
+        applied: _AppliedRecords,
+    ) -> None:
+        with self.database.batch():
+            for record, parsed_schema in records:
+                if record.error is not None:
+                    self._handle_decode_error(record)
+                    continue
+
+                key = record.key
+                assert isinstance(key, dict)
+                msg_keymode = KeyMode.CANONICAL if is_key_in_canonical_format(key) else KeyMode.DEPRECATED_KARAPACE
+                # Key mode detection happens on startup.
+                # Default keymode is CANONICAL and preferred unless any data consumed
+                # has key in non-canonical format. If keymode is set to DEPRECATED_KARAPACE
+                # the subsequent keys are omitted from detection.
+                if self.key_formatter.get_keymode() == KeyMode.CANONICAL and msg_keymode == KeyMode.DEPRECATED_KARAPACE:
+                    self.key_formatter.set_keymode(KeyMode.DEPRECATED_KARAPACE)
+
+                try:
+                    self.handle_msg(key, record.value, parsed_schema)
+                except (InvalidSchema, InvalidVersion, TypeError) as exc:
+                    self.kafka_error_handler.handle_error(location=KafkaErrorLocation.SCHEMA_READER, error=exc)
+                    continue
+                finally:
+                    self.offset = record.offset
+
+                change = schema_change_from_record(self.offset, key, record.value)
+                if change is not None:
+                    self.forget_resolved_schemas(change)
+                    self.changes.append(change)
+                    applied.changes.append(change)
+
+                if msg_keymode == KeyMode.CANONICAL:
+                    applied.schema_records_processed_keymode_canonical += 1
+                else:
+                    applied.schema_records_processed_keymode_deprecated_karapace += 1
+                applied.offset_seen = self.offset
+
     def _update_is_ready_flag(self) -> None:
         update_ready_flag = False
 
@@ -585,17 +722,9 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                 LOG.info("Hard delete last version, subject %r is gone", subject)
                 self.database.delete_subject_hard(subject=subject)
 
-    def _handle_msg_schema(self, key: dict, value: dict | None) -> None:
-        if not value:
-            self._handle_msg_schema_hard_delete(key)
-            return
-
+    def _parse_msg_schema(self, value: dict) -> _ParsedSchema:
         schema_type = value.get("schemaType", "AVRO")
         schema_str = value["schema"]
-        schema_subject = value["subject"]
-        schema_id = value["id"]
-        schema_version = Version(value["version"])
-        schema_deleted = value.get("deleted", False)
         schema_references = value.get("references", None)
         resolved_references: list[Reference] | None = None
 
@@ -650,21 +779,45 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             )
         except (InvalidSchema, JSONDecodeError) as exc:
             raise InvalidSchema from exc
+        return _ParsedSchema(schema=typed_schema, references=resolved_references)
+
+    def _handle_msg_schema(
+        self,
+        key: dict,
+        value: dict | None,
+        parsed_schema: _ParsedSchema | Exception | None = None,
+    ) -> None:
+        if not value:
+            self._handle_msg_schema_hard_delete(key)
+            return
+
+        if isinstance(parsed_schema, Exception):
+            raise parsed_schema
+        if parsed_schema is None:
+            parsed_schema = self._parse_msg_schema(value)
+        schema_subject = value["subject"]
+        schema_id = value["id"]
+        schema_version = Version(value["version"])
+        schema_deleted = value.get("deleted", False)
 
         self.database.insert_schema_version(
             subject=schema_subject,
             schema_id=schema_id,
             version=schema_version,
             deleted=schema_deleted,
-            schema=typed_schema,
-            references=resolved_references,
+            schema=parsed_schema.schema,
+            references=parsed_schema.references,
         )
 
-        if resolved_references:
-            for ref in resolved_references:
+        if parsed_schema.references:
+            for ref in parsed_schema.references:
                 self.database.insert_referenced_by(subject=ref.subject, version=ref.version, schema_id=schema_id)
 
-    def handle_msg(self, key: dict, value: dict | None) -> None:
+    def handle_msg(self, key: dict, value: dict | None, parsed_schema: _ParsedSchema | Exception | None = None) -> None:
+        """Apply a record to the database, the schema of a SCHEMA record is parsed unless given.
+
+        An error raised while parsing the schema beforehand is raised as if raised here.
+        """
         if "keytype" in key:
             try:
                 message_type = MessageType(key["keytype"])
@@ -672,7 +825,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                 if message_type == MessageType.config:
                     self._handle_msg_config(key, value)
                 elif message_type == MessageType.schema:
-                    self._handle_msg_schema(key, value)
+                    self._handle_msg_schema(key, value, parsed_schema)
                 elif message_type == MessageType.delete_subject:
                     self._handle_msg_delete_subject(key, value)
                 elif message_type == MessageType.no_operation:
@@ -734,7 +887,15 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         if not schema_version.schema:
             raise InvalidReferences(f"No schema in {reference.subject} with version {reference.version}.")
 
-        validated_schema = self._resolve_and_validate(schema_version.schema)
+        key = (reference.subject, reference.version)
+        with self._resolved_schemas_lock:
+            validated_schema = self._resolved_schemas.get(key)
+            generation = self._resolved_schemas_generation
+        if validated_schema is None:
+            validated_schema = self._resolve_and_validate(schema_version.schema)
+            with self._resolved_schemas_lock:
+                if generation == self._resolved_schemas_generation:
+                    self._resolved_schemas[key] = validated_schema
 
         return reference, Dependency.of(reference, validated_schema)
 
@@ -751,3 +912,93 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             dependencies[resolved_reference.name] = dependency
             resolved_references.append(resolved_reference)
         return resolved_references, dependencies
+
+    def forget_resolved_schemas(self, change: SchemaChange) -> None:
+        """Drop the resolved schemas of the versions changed by `change` and of the versions referencing them."""
+        if change.subject is None or change.version is None or change.keytype not in {"SCHEMA", "DELETE_SUBJECT"}:
+            return
+        with self._resolved_schemas_lock:
+            # Schemas being resolved may have used the state before the change.
+            self._resolved_schemas_generation += 1
+            if not self._resolved_schemas:
+                return
+            if change.keytype == "DELETE_SUBJECT":
+                keys = [key for key in self._resolved_schemas if key[0] == change.subject and key[1] <= change.version]
+            else:
+                keys = [(change.subject, change.version)]
+
+        # The references are followed without holding the lock, the database
+        # has its own.
+        forgotten: set[tuple[Subject, Version]] = set()
+        while keys:
+            key = keys.pop()
+            if key in forgotten:
+                continue
+            forgotten.add(key)
+            # Copied as the referents are modified by the thread consuming the schemas.
+            for schema_id in list(self.database.get_referenced_by(*key) or ()):
+                schema_versions = self.database.find_schema_versions_by_schema_id(schema_id=schema_id, include_deleted=True)
+                keys.extend((schema_version.subject, schema_version.version) for schema_version in schema_versions)
+        with self._resolved_schemas_lock:
+            self._resolved_schemas_generation += 1
+            for key in forgotten:
+                self._resolved_schemas.pop(key, None)
+
+
+class SharedSchemaReader(KafkaSchemaReader):
+    """Schema reader of the registry workers following the primary worker.
+
+    Instead of consuming the schemas topic it follows the journal written by the
+    schema reader of the primary worker, and reports the progress of that reader.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        offset_watcher: OffsetWatcher,
+        key_formatter: KeyFormatter,
+        database: SharedDatabaseReader,
+        master_coordinator: MasterCoordinator | None = None,
+    ) -> None:
+        super().__init__(
+            config=config,
+            offset_watcher=offset_watcher,
+            key_formatter=key_formatter,
+            database=database,
+            master_coordinator=master_coordinator,
+        )
+        self.database: SharedDatabaseReader = database
+        self.database.reference_resolver = self.resolve_references
+        self._updated_at = time.time()
+
+    def run(self) -> None:
+        while not self._stop_schema_reader.is_set():
+            try:
+                self.follow()
+            except Exception as e:  # pylint: disable=broad-except
+                self.stats.unexpected_exception(ex=e, where="shared_schema_reader_loop")
+                LOG.exception("Unexpected exception following the primary worker")
+            self._stop_schema_reader.wait(timeout=SHARED_DATABASE_FOLLOW_INTERVAL_SECONDS)
+
+    def follow(self) -> None:
+        progress, changes, compatibility = self.database.follow()
+        if compatibility is not None:
+            self.config["compatibility"] = compatibility
+        for change in changes:
+            self.forget_resolved_schemas(change)
+            self.changes.append(change)
+        self._highest_offset = progress.highest_offset
+        self._updated_at = progress.updated_at
+        with self._ready_lock:
+            self.offset = progress.offset
+            self._ready = progress.ready
+        self._applied_offsets.offset_seen(progress.offset)
+
+    async def is_healthy(self) -> bool:
+        # The primary worker publishes its progress after every consume round.
+        if time.time() - self._updated_at >= UNHEALTHY_TIMEOUT_SECONDS:
+            LOG.warning(
+                "Health check failed, the primary worker has not made progress in %s seconds", UNHEALTHY_TIMEOUT_SECONDS
+            )
+            return False
+        return True
@@ -12,7 +12,9 @@ from karapace.dataclasses import default_dataclass
 from karapace.typing import JsonData, JsonObject, SchemaId, Subject, Version
 from typing import cast, NewType, TypeVar
 
-Referents = NewType("Referents", list[SchemaId])
+# The ids of the schemas referencing a version, in insertion order. Stored as
+# the keys of a dict to make membership checks and removals constant time.
+Referents = NewType("Referents", dict[SchemaId, None])
 
 T = TypeVar("T")
 
@@ -4,12 +4,11 @@ See LICENSE for details
 """
 from __future__ import annotations
 
-from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
+from avro.compatibility import SchemaCompatibilityResult
 from collections.abc import Sequence
 from contextlib import AsyncExitStack, closing
 from karapace.compatibility import CompatibilityModes
 from karapace.compatibility.jsonschema.checks import is_incompatible
-from karapace.compatibility.schema_compatibility import SchemaCompatibility
 from karapace.config import Config
 from karapace.coordinator.master_coordinator import MasterCoordinator
 from karapace.dependency import Dependency
@@ -28,9 +27,12 @@ from karapace.in_memory_database import InMemoryDatabase
 from karapace.key_format import KeyFormatter
 from karapace.messaging import KarapaceProducer
 from karapace.offset_watcher import OffsetWatcher
+from karapace.registry_workers import PRIMARY_WORKER
+from karapace.schema_executor import SchemaExecutor, SchemaSource
 from karapace.schema_models import ParsedTypedSchema, SchemaType, SchemaVersion, TypedSchema, ValidatedTypedSchema, Versioner
-from karapace.schema_reader import KafkaSchemaReader
+from karapace.schema_reader import KafkaSchemaReader, SharedSchemaReader
 from karapace.schema_references import LatestVersionReference, Reference
+from karapace.shared_database import SharedDatabaseReader, SharedDatabaseWriter
 from karapace.typing import JsonObject, Mode, SchemaId, Subject, Version
 
 import asyncio
@@ -50,15 +52,34 @@ class KarapaceSchemaRegistry:
         )
 
         self.mc = MasterCoordinator(config=self.config)
-        self.database = InMemoryDatabase()
-        self.schema_reader = KafkaSchemaReader(
-            config=self.config,
-            offset_watcher=offset_watcher,
-            key_formatter=self._key_formatter,
-            master_coordinator=self.mc,
-            database=self.database,
-        )
+        self.database: InMemoryDatabase
+        self.schema_reader: KafkaSchemaReader
+        if self.config["registry_shared_database"] and self.config["registry_worker_index"] != PRIMARY_WORKER:
+            # The other workers follow the database of the primary worker instead of the schemas topic.
+            assert self.config["registry_shared_database_path"] is not None
+            self.database = SharedDatabaseReader(self.config["registry_shared_database_path"])
+            self.schema_reader = SharedSchemaReader(
+                config=self.config,
+                offset_watcher=offset_watcher,
+                key_formatter=self._key_formatter,
+                master_coordinator=self.mc,
+                database=self.database,
+            )
+        else:
+            if self.config["registry_shared_database"]:
+                assert self.config["registry_shared_database_path"] is not None
+                self.database = SharedDatabaseWriter(self.config["registry_shared_database_path"])
+            else:
+                self.database = InMemoryDatabase()
+            self.schema_reader = KafkaSchemaReader(
+                config=self.config,
+                offset_watcher=offset_watcher,
+                key_formatter=self._key_formatter,
+                master_coordinator=self.mc,
+                database=self.database,
+            )
         self.mc.set_stoppper(self.schema_reader)
+        self.schema_executor = SchemaExecutor(config=self.config)
 
         self.schema_lock = asyncio.Lock()
         self._master_lock = asyncio.Lock()
@@ -84,6 +105,7 @@ class KarapaceSchemaRegistry:
             stack.push_async_callback(self.mc.close)
             stack.enter_context(closing(self.schema_reader))
             stack.enter_context(closing(self.producer))
+            stack.enter_context(closing(self.schema_executor))
 
     async def get_master(self, ignore_readiness: bool = False) -> tuple[bool, str | None]:
         """Resolve if current node is the primary and the primary node address.
@@ -350,7 +372,7 @@ class KarapaceSchemaRegistry:
                     )
                     return schema_id
 
-                result = self.check_schema_compatibility(new_schema, subject)
+                result = await self.check_schema_compatibility(new_schema, subject)
 
                 if is_incompatible(result):
                     LOG.warning(
@@ -450,13 +472,16 @@ class KarapaceSchemaRegistry:
         value = {"subject": subject, "version": version.value}
         self.producer.send_message(key=key, value=value)
 
-    def check_schema_compatibility(
+    async def stored_schema_for_check(self, schema: TypedSchema) -> ParsedTypedSchema | SchemaSource:
+        """Prepare a stored schema for a compatibility check, the schemas it references are resolved by the reader."""
+        references, dependencies = self.resolve_references(schema.references)
+        return await self.schema_executor.stored_schema(schema, references=references, dependencies=dependencies)
+
+    async def check_schema_compatibility(
         self,
         new_schema: ValidatedTypedSchema,
         subject: Subject,
     ) -> SchemaCompatibilityResult:
-        result = SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
-
         compatibility_mode = self.get_compatibility_mode(subject=subject)
         all_schema_versions: dict[Version, SchemaVersion] = self.database.find_subject_schemas(
             subject=subject, include_deleted=True
@@ -472,19 +497,14 @@ class KarapaceSchemaRegistry:
             # Only check against latest version
             old_versions = [live_versions[-1]]
 
-        for old_version in old_versions:
-            old_parsed_schema = self.resolve_and_parse(all_schema_versions[old_version].schema)
-
-            result = SchemaCompatibility.check_compatibility(
-                old_schema=old_parsed_schema,
-                new_schema=new_schema,
-                compatibility_mode=compatibility_mode,
-            )
-
-            if is_incompatible(result):
-                return result
-
-        return result
+        old_schemas = [
+            await self.stored_schema_for_check(all_schema_versions[old_version].schema) for old_version in old_versions
+        ]
+        return await self.schema_executor.check_compatibility(
+            old_schemas=old_schemas,
+            new_schema=new_schema,
+            compatibility_mode=compatibility_mode,
+        )
 
     @staticmethod
     def get_live_versions_sorted(all_schema_versions: dict[Version, SchemaVersion]) -> list[Version]:
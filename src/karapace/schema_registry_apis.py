@@ -11,7 +11,6 @@ from http import HTTPStatus
 from karapace.auth import HTTPAuthorizer, Operation, User
 from karapace.compatibility import CompatibilityModes
 from karapace.compatibility.jsonschema.checks import is_incompatible
-from karapace.compatibility.schema_compatibility import SchemaCompatibility
 from karapace.config import Config
 from karapace.errors import (
     IncompatibleSchema,
@@ -37,10 +36,21 @@ from karapace.schema_references import LatestVersionReference, Reference, refere
 from karapace.schema_registry import KarapaceSchemaRegistry
 from karapace.typing import JsonData, JsonObject, SchemaId, Subject, Version
 from karapace.utils import JSONDecodeError
-from typing import Any
+from typing import Any, Final
 
 import aiohttp
 import async_timeout
+import time
+
+# Offset of the last write in the schemas topic, returned on writes and accepted on reads
+SCHEMAS_OFFSET_HEADER: Final = "X-Karapace-Schemas-Offset"
+# Headers of the client request passed on when forwarding it to the primary
+FORWARDED_REQUEST_HEADERS: Final = ("Authorization", "Content-Type", "Accept")
+# Headers of the primary response that only apply to its connection
+HOP_BY_HOP_HEADERS: Final = frozenset(("connection", "keep-alive", "transfer-encoding", "content-length"))
+METRIC_FORWARD_REQUEST: Final = "karapace_schema_registry_forward_request"
+# Upper bound for how long a /changes request waits for new changes
+CHANGES_MAX_WAIT_MS: Final = 30_000
 
 
 @unique
@@ -129,7 +139,16 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
     async def _create_forward_client(self, app: aiohttp.web.Application) -> None:  # pylint: disable=unused-argument
         """Callback for aiohttp.Application.on_startup"""
-        self._forward_client = aiohttp.ClientSession(headers={"User-Agent": SERVER_NAME})
+        connector = aiohttp.TCPConnector(
+            limit=self.config["forward_connection_pool_size"],
+            keepalive_timeout=self.config["forward_keepalive_timeout_ms"] / 1000,
+        )
+        # Responses are passed through as they are, including their encoding.
+        self._forward_client = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": SERVER_NAME},
+            auto_decompress=False,
+        )
 
     async def _start_authorizer(self, app: aiohttp.web.Application) -> None:  # pylint: disable=unused-argument
         """Callback for aiohttp.Application.on_startup"""
@@ -142,30 +161,66 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
     async def _forward_if_not_ready_to_serve(self, request: HTTPRequest, content_type: str | None = None) -> None:
         if self.schema_registry.schema_reader.ready():
-            pass
+            if await self._wait_for_offset_token(request):
+                return
+            # The client has seen a write this node has not yet applied, the
+            # primary has applied it and can serve the read instead.
+            are_we_master, _ = self.schema_registry.mc.get_master_info()
+            if are_we_master:
+                return
+
+        # Not ready, still loading the state.
+        # Needs only the master_url
+        _, master_url = await self.schema_registry.get_master(ignore_readiness=True)
+        returned_content_type = request.get_header("Content-Type") if content_type is None else content_type
+        if not master_url:
+            self.no_master_error(request.content_type)
+        elif f"{self.config['advertised_hostname']}:{self.config['advertised_port']}" in master_url:
+            # If master url is the same as the url of this Karapace respond 503.
+            self.r(
+                body="",
+                content_type=returned_content_type,
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
         else:
-            # Not ready, still loading the state.
-            # Needs only the master_url
-            _, master_url = await self.schema_registry.get_master(ignore_readiness=True)
-            returned_content_type = request.get_header("Content-Type") if content_type is None else content_type
-            if not master_url:
-                self.no_master_error(request.content_type)
-            elif f"{self.config['advertised_hostname']}:{self.config['advertised_port']}" in master_url:
-                # If master url is the same as the url of this Karapace respond 503.
-                self.r(
-                    body="",
-                    content_type=returned_content_type,
-                    status=HTTPStatus.SERVICE_UNAVAILABLE,
-                )
-            else:
-                url = f"{master_url}{request.url.path}"
-                await self._forward_request_remote(
-                    request=request,
-                    body=request.json,
-                    url=url,
-                    content_type=returned_content_type,
-                    method=request.method,
-                )
+            url = f"{master_url}{request.url.path}"
+            await self._forward_request_remote(
+                request=request,
+                body=request.body,
+                url=url,
+                content_type=returned_content_type,
+                method=request.method,
+            )
+
+    async def _wait_for_offset_token(self, request: HTTPRequest) -> bool:
+        """Wait for the schemas topic offset of a write seen by the client, if it sent one.
+
+        Write responses carry the offset of the written record in the
+        `SCHEMAS_OFFSET_HEADER` header. A client sending it back on reads is
+        guaranteed to see its own writes, which allows serving the reads from
+        any node. Returns False if the offset was not reached in time.
+        """
+        offset_token = request.get_header(SCHEMAS_OFFSET_HEADER)
+        if offset_token is None or request.method != "GET":
+            return True
+        try:
+            expected_offset = int(offset_token)
+        except ValueError:
+            self.r(
+                body={
+                    "error_code": SchemaErrorCodes.HTTP_BAD_REQUEST.value,
+                    "message": f"Invalid {SCHEMAS_OFFSET_HEADER} header value: {offset_token}",
+                },
+                content_type=JSON_CONTENT_TYPE,
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        timeout = self.config["read_your_writes_timeout_ms"] / 1000
+        return await self.schema_registry.schema_reader.wait_for_offset(expected_offset, timeout=timeout)
+
+    def _offset_token_headers(self) -> dict[str, str]:
+        # The producer waits until the reader has applied the written record,
+        # so the reader offset includes the write after it has been done.
+        return {SCHEMAS_OFFSET_HEADER: str(self.schema_registry.schema_reader.offset)}
 
     def _add_schema_registry_routes(self) -> None:
         self.route(
@@ -321,6 +376,15 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             json_body=False,
             auth=self._auth,
         )
+        self.route(
+            "/changes",
+            callback=self.changes_get,
+            method="GET",
+            schema_request=True,
+            with_request=True,
+            json_body=False,
+            auth=self._auth,
+        )
         self.route(
             "/mode",
             callback=self.get_global_mode,
@@ -408,15 +472,19 @@ class KarapaceSchemaRegistryController(KarapaceBase):
                 status=HTTPStatus.INTERNAL_SERVER_ERROR,
             )
 
-        new_schema = self.get_new_schema(request.json, content_type)
-        old_schema = self.get_old_schema(subject, Versioner.V(version), content_type)
+        new_schema = await self.get_new_schema(request.json, content_type)
+        old_schema = await self.get_old_schema(subject, Versioner.V(version), content_type)
         if compatibility_mode.is_transitive():
             # Ignore the schema version provided in the rest api call (`version`)
             # Instead check against all previous versions (including `version` if existing)
-            result = self.schema_registry.check_schema_compatibility(new_schema, subject)
+            result = await self.schema_registry.check_schema_compatibility(new_schema, subject)
         else:
             # Check against the schema version provided in the rest api call (`version`)
-            result = SchemaCompatibility.check_compatibility(old_schema, new_schema, compatibility_mode)
+            result = await self.schema_registry.schema_executor.check_compatibility(
+                old_schemas=[old_schema],
+                new_schema=new_schema,
+                compatibility_mode=compatibility_mode,
+            )
 
         if is_incompatible(result):
             self.r({"is_compatible": False, "messages": list(result.messages)}, content_type)
@@ -560,8 +628,6 @@ class KarapaceSchemaRegistryController(KarapaceBase):
     async def config_set(self, content_type: str, *, request: HTTPRequest, user: User | None = None) -> None:
         self._check_authorization(user, Operation.Write, "Config:")
 
-        body = request.json
-
         try:
             compatibility_level = CompatibilityModes(request.json["compatibility"])
         except (ValueError, KeyError):
@@ -581,9 +647,15 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             self.no_master_error(content_type)
         else:
             url = f"{master_url}/config"
-            await self._forward_request_remote(request=request, body=body, url=url, content_type=content_type, method="PUT")
+            await self._forward_request_remote(
+                request=request, body=request.body, url=url, content_type=content_type, method="PUT"
+            )
 
-        self.r({"compatibility": self.schema_registry.schema_reader.config["compatibility"]}, content_type)
+        self.r(
+            {"compatibility": self.schema_registry.schema_reader.config["compatibility"]},
+            content_type,
+            headers=self._offset_token_headers(),
+        )
 
     async def config_subject_get(
         self, content_type: str, subject: str, *, request: HTTPRequest, user: User | None = None
@@ -653,10 +725,10 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         else:
             url = f"{master_url}/config/{subject}"
             await self._forward_request_remote(
-                request=request, body=request.json, url=url, content_type=content_type, method="PUT"
+                request=request, body=request.body, url=url, content_type=content_type, method="PUT"
             )
 
-        self.r({"compatibility": compatibility_level.value}, content_type)
+        self.r({"compatibility": compatibility_level.value}, content_type, headers=self._offset_token_headers())
 
     async def config_subject_delete(
         self,
@@ -681,7 +753,11 @@ class KarapaceSchemaRegistryController(KarapaceBase):
                 request=request, body=request.json, url=url, content_type=content_type, method="PUT"
             )
 
-        self.r({"compatibility": self.schema_registry.schema_reader.config["compatibility"]}, content_type)
+        self.r(
+            {"compatibility": self.schema_registry.schema_reader.config["compatibility"]},
+            content_type,
+            headers=self._offset_token_headers(),
+        )
 
     async def master_available(self, *, request: HTTPRequest) -> None:
         no_cache_header = {"Cache-Control": "no-store, no-cache, must-revalidate"}
@@ -723,6 +799,43 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             )
         self.r(subjects, content_type, status=HTTPStatus.OK)
 
+    async def changes_get(self, content_type: str, *, request: HTTPRequest, user: User | None = None) -> None:
+        try:
+            offset = int(request.query["offset"]) if "offset" in request.query else None
+            timeout_ms = int(request.query.get("timeout", "0"))
+        except ValueError:
+            self.r(
+                body={
+                    "error_code": SchemaErrorCodes.HTTP_BAD_REQUEST.value,
+                    "message": "Query parameters `offset` and `timeout` must be integers",
+                },
+                content_type=content_type,
+                status=HTTPStatus.BAD_REQUEST,
+            )
+
+        change_feed = self.schema_registry.schema_reader.changes
+        if offset is None:
+            self.r({"changes": [], "offset": change_feed.latest_offset(), "truncated": False}, content_type)
+
+        timeout_ms = min(max(timeout_ms, 0), CHANGES_MAX_WAIT_MS)
+        if timeout_ms > 0:
+            await change_feed.wait_for_changes(offset, timeout=timeout_ms / 1000)
+
+        changes, truncated = change_feed.changes_since(offset)
+        next_offset = changes[-1].offset if changes else offset
+        if self._auth is not None:
+            changes = [
+                change
+                for change in changes
+                if self._auth.check_authorization(
+                    user, Operation.Read, "Config:" if change.subject is None else f"Subject:{change.subject}"
+                )
+            ]
+        self.r(
+            {"changes": [change.to_dict() for change in changes], "offset": next_offset, "truncated": truncated},
+            content_type,
+        )
+
     async def subject_delete(
         self, content_type: str, *, subject: str, request: HTTPRequest, user: User | None = None
     ) -> None:
@@ -734,7 +847,12 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         if are_we_master:
             try:
                 version_list = await self.schema_registry.subject_delete_local(subject=subject, permanent=permanent)
-                self.r([version.value for version in version_list], content_type, status=HTTPStatus.OK)
+                self.r(
+                    [version.value for version in version_list],
+                    content_type,
+                    status=HTTPStatus.OK,
+                    headers=self._offset_token_headers(),
+                )
             except (SubjectNotFoundException, SchemasNotFoundException):
                 self.r(
                     body={
@@ -825,7 +943,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
                 resolved_version = await self.schema_registry.subject_version_delete_local(
                     subject, Versioner.V(version), permanent
                 )
-                self.r(str(resolved_version), content_type, status=HTTPStatus.OK)
+                self.r(str(resolved_version), content_type, status=HTTPStatus.OK, headers=self._offset_token_headers())
             except (SubjectNotFoundException, SchemasNotFoundException):
                 self.r(
                     body={
@@ -1111,7 +1229,8 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         try:
             # When checking if schema is already registered, allow unvalidated schema in as
             # there might be stored schemas that are non-compliant from the past.
-            new_schema = ParsedTypedSchema.parse(
+            new_schema = await self.schema_registry.schema_executor.parse(
+                ParsedTypedSchema,
                 schema_type=schema_type,
                 schema_str=schema_str,
                 references=references,
@@ -1144,9 +1263,10 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         for schema_version in sorted(subject_data.values(), key=lambda item: item.version, reverse=True):
             other_references, other_dependencies = self.schema_registry.resolve_references(schema_version.references)
             try:
-                parsed_typed_schema = ParsedTypedSchema.parse(
-                    schema_version.schema.schema_type,
-                    schema_version.schema.schema_str,
+                parsed_typed_schema = await self.schema_registry.schema_executor.parse(
+                    ParsedTypedSchema,
+                    schema_type=schema_version.schema.schema_type,
+                    schema_str=schema_version.schema.schema_str,
                     references=other_references,
                     dependencies=other_dependencies,
                     normalize=normalize,
@@ -1213,7 +1333,8 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         try:
             references, resolved_dependencies = self.schema_registry.resolve_references(references)
-            new_schema = ValidatedTypedSchema.parse(
+            new_schema = await self.schema_registry.schema_executor.parse(
+                ValidatedTypedSchema,
                 schema_type=schema_type,
                 schema_str=body["schema"],
                 references=references,
@@ -1239,7 +1360,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
 
         schema_id = self.get_schema_id_if_exists(subject=subject, schema=new_schema, include_deleted=False)
         if schema_id is not None:
-            self.r({"id": schema_id}, content_type)
+            self.r({"id": schema_id}, content_type, headers=self._offset_token_headers())
 
         are_we_master, master_url = await self.schema_registry.get_master()
         if are_we_master:
@@ -1248,6 +1369,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
                 self.r(
                     body={"id": schema_id},
                     content_type=content_type,
+                    headers=self._offset_token_headers(),
                 )
             except InvalidSchema as ex:
                 self.r(
@@ -1283,7 +1405,9 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             self.no_master_error(content_type)
         else:
             url = f"{master_url}/subjects/{subject}/versions"
-            await self._forward_request_remote(request=request, body=body, url=url, content_type=content_type, method="POST")
+            await self._forward_request_remote(
+                request=request, body=request.body, url=url, content_type=content_type, method="POST"
+            )
 
     async def get_global_mode(
         self,
@@ -1330,27 +1454,48 @@ class KarapaceSchemaRegistryController(KarapaceBase):
         return schema_id
 
     async def _forward_request_remote(
-        self, *, request: HTTPRequest, body: dict | None, url: str, content_type: str, method: str = "POST"
+        self, *, request: HTTPRequest, body: bytes | dict | None, url: str, content_type: str, method: str = "POST"
     ) -> None:
+        """Forward the request to the primary and respond with its response.
+
+        A `bytes` body is sent as is with the request's content type, pass the
+        raw request body to avoid decoding and encoding it again. The response
+        of the primary is always passed through without decoding it.
+        """
         assert self._forward_client is not None, "Server must be initialized"
 
         self.log.info("Forwarding %s request to remote url: %r since we're not the master", method, url)
-        timeout = 60.0
-        func = getattr(self._forward_client, method.lower())
-        auth_header = request.headers.get("Authorization")
+        timeout = self.config["forward_request_timeout_ms"] / 1000
         headers = {}
-        if auth_header is not None:
-            headers["Authorization"] = auth_header
+        for header in FORWARDED_REQUEST_HEADERS:
+            header_value = request.headers.get(header)
+            if header_value is not None:
+                headers[header] = header_value
+        if isinstance(body, bytes):
+            request_kwargs: dict[str, Any] = {"data": body}
+        else:
+            headers.pop("Content-Type", None)
+            request_kwargs = {"json": body}
 
-        async with async_timeout.timeout(timeout):
-            async with func(url, headers=headers, json=body) as response:
-                if response.headers.get("content-type", "").startswith(JSON_CONTENT_TYPE):
-                    resp_content = await response.json()
-                else:
-                    resp_content = await response.text()
+        start_time = time.monotonic()
+        status = 0
+        try:
+            async with async_timeout.timeout(timeout):
+                async with self._forward_client.request(method, url, headers=headers, **request_kwargs) as response:
+                    status = response.status
+                    resp_content = await response.read()
+        finally:
+            self.stats.timing(
+                METRIC_FORWARD_REQUEST,
+                time.monotonic() - start_time,
+                tags={"method": method, "result": status},
+            )
 
+        response_headers = {
+            header: value for header, value in response.headers.items() if header.lower() not in HOP_BY_HOP_HEADERS
+        }
         raise HTTPResponse(
-            body=resp_content, content_type=content_type, status=HTTPStatus(response.status), headers=response.headers
+            body=resp_content, content_type=content_type, status=HTTPStatus(response.status), headers=response_headers
         )
 
     def no_master_error(self, content_type: str) -> None:
@@ -1363,12 +1508,13 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             status=HTTPStatus.INTERNAL_SERVER_ERROR,
         )
 
-    def get_new_schema(self, body: JsonObject, content_type: str) -> ValidatedTypedSchema:
+    async def get_new_schema(self, body: JsonObject, content_type: str) -> ValidatedTypedSchema:
         schema_type = self._validate_schema_type(content_type=content_type, data=body)
         references = self._validate_references(content_type, schema_type, body)
         try:
             references, new_schema_dependencies = self.schema_registry.resolve_references(references)
-            return ValidatedTypedSchema.parse(
+            return await self.schema_registry.schema_executor.parse(
+                ValidatedTypedSchema,
                 schema_type=schema_type,
                 schema_str=body["schema"],
                 references=references,
@@ -1385,7 +1531,7 @@ class KarapaceSchemaRegistryController(KarapaceBase):
                 status=HTTPStatus.UNPROCESSABLE_ENTITY,
             )
 
-    def get_old_schema(self, subject: Subject, version: Version, content_type: str) -> ParsedTypedSchema:
+    async def get_old_schema(self, subject: Subject, version: Version, content_type: str) -> ParsedTypedSchema:
         try:
             old = self.schema_registry.subject_version_get(subject=subject, version=version)
         except InvalidVersion:
@@ -1405,7 +1551,13 @@ class KarapaceSchemaRegistryController(KarapaceBase):
             old_dependencies = None
             if old_references:
                 old_references, old_dependencies = self.schema_registry.resolve_references(old_references)
-            old_schema = ParsedTypedSchema.parse(old_schema_type, old["schema"], old_references, old_dependencies)
+            old_schema = await self.schema_registry.schema_executor.parse(
+                ParsedTypedSchema,
+                schema_type=old_schema_type,
+                schema_str=old["schema"],
+                references=old_references,
+                dependencies=old_dependencies,
+            )
             return old_schema
         except InvalidSchema:
             self.r(
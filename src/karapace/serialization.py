@@ -6,14 +6,15 @@ from __future__ import annotations
 
 from aiohttp import BasicAuth
 from avro.io import BinaryDecoder, BinaryEncoder, DatumReader, DatumWriter
-from cachetools import TTLCache
-from collections.abc import MutableMapping
+from cachetools import LRUCache, TTLCache
+from collections.abc import MutableMapping, Sequence
 from functools import lru_cache
 from google.protobuf.message import DecodeError
 from jsonschema import ValidationError
 from karapace.client import Client
 from karapace.dependency import Dependency
 from karapace.errors import InvalidReferences
+from karapace.jsonschema_validation import compile_validator, CompiledValidator
 from karapace.protobuf.exception import ProtobufTypeException
 from karapace.protobuf.io import ProtobufDatumReader, ProtobufDatumWriter
 from karapace.protobuf.schema import ProtobufSchema
@@ -34,6 +35,9 @@ START_BYTE = 0x0
 HEADER_FORMAT = ">bI"
 HEADER_SIZE = 5
 
+# Compiled validators of the JSON Schemas, by schema fingerprint.
+_JSONSCHEMA_VALIDATORS: MutableMapping[bytes, CompiledValidator] = LRUCache(maxsize=1000)
+
 
 class DeserializationError(Exception):
     pass
@@ -361,6 +365,17 @@ class SchemaRegistrySerializer:
             except avro.errors.AvroTypeException as e:
                 raise InvalidMessageSchema("Object does not fit to stored schema") from e
 
+    async def serialize_many(self, schema: TypedSchema, values: Sequence[dict]) -> list[bytes]:
+        """Serialize the records of a request, JSON Schema records are validated in one call."""
+        if schema.schema_type is not SchemaType.JSONSCHEMA:
+            return [await self.serialize(schema, value) for value in values]
+        header = struct.pack(HEADER_FORMAT, START_BYTE, self.schemas_to_ids[str(schema)])
+        try:
+            jsonschema_validator(schema).validate_many(values)
+        except ValidationError as e:
+            raise InvalidPayload from e
+        return [header + json_encode(value, binary=True) for value in values]
+
     async def deserialize(self, bytes_: bytes) -> dict:
         with io.BytesIO(bytes_) as bio:
             byte_arr = bio.read(HEADER_SIZE)
@@ -442,6 +457,14 @@ def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
     return value
 
 
+def jsonschema_validator(schema: TypedSchema) -> CompiledValidator:
+    fingerprint = schema.fingerprint()
+    validator = _JSONSCHEMA_VALIDATORS.get(fingerprint)
+    if validator is None:
+        validator = _JSONSCHEMA_VALIDATORS[fingerprint] = compile_validator(schema.schema)
+    return validator
+
+
 def read_value(config: dict, schema: TypedSchema, bio: io.BytesIO):
     if schema.schema_type is SchemaType.AVRO:
         reader = DatumReader(writers_schema=schema.schema)
@@ -449,7 +472,7 @@ def read_value(config: dict, schema: TypedSchema, bio: io.BytesIO):
     if schema.schema_type is SchemaType.JSONSCHEMA:
         value = json_decode(bio)
         try:
-            schema.schema.validate(value)
+            jsonschema_validator(schema).validate(value)
         except ValidationError as e:
             raise InvalidPayload from e
         return value
@@ -476,7 +499,7 @@ def write_value(config: dict, schema: TypedSchema, bio: io.BytesIO, value: dict)
         writer.write(data, BinaryEncoder(bio))
     elif schema.schema_type is SchemaType.JSONSCHEMA:
         try:
-            schema.schema.validate(value)
+            jsonschema_validator(schema).validate(value)
         except ValidationError as e:
             raise InvalidPayload from e
         bio.write(json_encode(value, binary=True))
@@ -0,0 +1,467 @@
+"""
+karapace - Schema database shared between registry worker processes
+
+The primary registry worker applies the schemas topic to a `SharedDatabaseWriter`,
+which keeps the usual in memory database and also appends every change to a
+journal in a memory mapped file. The other workers map the file read-only and
+replay the journal into a `SharedDatabaseReader`, whose schemas are handles to
+the offset of the schema in the file instead of parsed copies of it. The schema
+text is kept once in the page cache, whatever the number of workers.
+
+The journal is never compacted while the workers run: it grows with every
+change applied, deleted versions included, though the text of a schema is
+written only once. The file is created anew each time the workers are started,
+so its size is bounded by the changes applied since then.
+
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import AbstractContextManager, contextmanager
+from enum import IntEnum
+from karapace.dataclasses import default_dataclass
+from karapace.dependency import Dependency
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.schema_changes import SchemaChange
+from karapace.schema_models import SchemaType, TypedSchema
+from karapace.schema_references import Reference
+from karapace.typing import JsonObject, SchemaId, Subject, Version
+from karapace.utils import json_decode, json_encode
+from threading import Lock
+from typing import Any, Final
+
+import mmap
+import os
+import struct
+import time
+
+__all__ = (
+    "create_shared_database_file",
+    "SharedDatabaseReader",
+    "SharedDatabaseWriter",
+    "SharedProgress",
+)
+
+MAGIC: Final = b"KSHRDB01"
+INITIAL_SIZE: Final = 16 * 1024 * 1024
+# Decoded schemas kept by each reader, the schema text is read from the file again
+# for the others.
+DECODED_SCHEMAS_CACHE_SIZE: Final = 1024
+
+# magic, sequence, committed, offset, highest_offset, ready, updated_at
+_HEADER: Final = struct.Struct("<8sQQqq?7xd")
+_SEQUENCE_AT: Final = 8
+_SEQUENCE: Final = struct.Struct("<Q")
+_RECORD: Final = struct.Struct("<BI")
+HEADER_SIZE: Final = 64
+
+ReferenceResolver = Callable[[Sequence[Reference]], tuple[list[Reference], dict[str, Dependency]]]
+
+
+class _Op(IntEnum):
+    schema = 1
+    schema_version = 2
+    subject = 3
+    subject_compatibility = 4
+    delete_subject = 5
+    delete_subject_hard = 6
+    delete_subject_schema = 7
+    insert_referenced_by = 8
+    remove_referenced_by = 9
+    change = 10
+    global_compatibility = 11
+
+
+@default_dataclass
+class SharedProgress:
+    """Progress of the schema reader of the primary worker."""
+
+    offset: int
+    highest_offset: int
+    ready: bool
+    # Wall clock time of the last batch applied by the primary worker.
+    updated_at: float
+
+
+def create_shared_database_file(path: str) -> None:
+    """Create an empty journal at `path`, before the workers are started.
+
+    A journal left at `path` by previous workers is truncated, the primary
+    worker writes it again from the schemas topic.
+    """
+    with open(path, "wb") as file:
+        file.truncate(INITIAL_SIZE)
+        file.write(_HEADER.pack(MAGIC, 0, HEADER_SIZE, -1, -1, False, 0.0))
+
+
+def _references_to_json(references: Sequence[Reference] | None) -> list | None:
+    return None if references is None else [reference.to_dict() for reference in references]
+
+
+def _references_from_json(data: list | None) -> list[Reference] | None:
+    return None if data is None else [Reference.from_dict(reference) for reference in data]
+
+
+class _Region:
+    """Memory mapping of the journal file.
+
+    The header is updated with a sequence lock: the writer makes the sequence
+    odd while it updates the header and even again once done, readers retry
+    until they have read the header between two equal, even sequence values.
+    Records are only written past the committed length and become visible to
+    the readers when the committed length is moved past them.
+    """
+
+    def __init__(self, path: str, *, writable: bool) -> None:
+        self.writable = writable
+        self._fd = os.open(path, os.O_RDWR if writable else os.O_RDONLY)
+        self._map = self._mmap()
+        # Held while mapping the file again after the writer has grown it.
+        self._map_lock = Lock()
+        magic = self._map[:8]
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a shared schema database")
+        self.end = self.header()[2]
+
+    def _mmap(self) -> mmap.mmap:
+        return mmap.mmap(self._fd, 0, access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+
+    def header(self) -> tuple:
+        while True:
+            # The mapping may be replaced by `read` in another thread.
+            with self._map_lock:
+                (sequence,) = _SEQUENCE.unpack_from(self._map, _SEQUENCE_AT)
+                header = _HEADER.unpack_from(self._map, 0)
+                if sequence % 2 == 0 and _SEQUENCE.unpack_from(self._map, _SEQUENCE_AT)[0] == sequence:
+                    return header
+            time.sleep(0)
+
+    def publish(self, *, offset: int, highest_offset: int, ready: bool) -> None:
+        assert self.writable
+        (sequence,) = _SEQUENCE.unpack_from(self._map, _SEQUENCE_AT)
+        _SEQUENCE.pack_into(self._map, _SEQUENCE_AT, sequence + 1)
+        _HEADER.pack_into(self._map, 0, MAGIC, sequence + 1, self.end, offset, highest_offset, ready, time.time())
+        _SEQUENCE.pack_into(self._map, _SEQUENCE_AT, sequence + 2)
+
+    def append(self, op: _Op, payload: JsonObject) -> int:
+        data = json_encode(payload, binary=True, compact=True)
+        position = self.end
+        end = position + _RECORD.size + len(data)
+        if end > len(self._map):
+            # Readers map the file again when the committed length is past their mapping.
+            with self._map_lock:
+                self._map.close()
+                os.ftruncate(self._fd, max(end, 2 * os.fstat(self._fd).st_size))
+                self._map = self._mmap()
+        _RECORD.pack_into(self._map, position, op, len(data))
+        self._map[position + _RECORD.size : end] = data
+        self.end = end
+        return position
+
+    def read(self, position: int) -> tuple[_Op, dict[str, Any], int]:
+        """Return the record at `position` and the position of the next one."""
+        with self._map_lock:
+            if position + _RECORD.size > len(self._map):
+                self._map.close()
+                self._map = self._mmap()
+            op, size = _RECORD.unpack_from(self._map, position)
+            start = position + _RECORD.size
+            if start + size > len(self._map):
+                self._map.close()
+                self._map = self._mmap()
+            data = self._map[start : start + size]
+        return _Op(op), json_decode(data, dict[str, Any]), start + size
+
+
+class SharedDatabaseWriter(InMemoryDatabase):
+    """In memory database of the primary worker, journaling its changes for the other workers."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self._region = _Region(path, writable=True)
+        # Offset of the journal record of each schema, the text of a schema is
+        # written once whatever the number of versions using it.
+        self._schema_positions: dict[bytes, int] = {}
+        self._compatibility: str | None = None
+        self._batch_depth = 0
+
+    @contextmanager
+    def _journal(self) -> Iterator[None]:
+        with self.schema_lock_thread:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    # Make the changes visible, also the ones applied before an error.
+                    self._publish_journal()
+
+    def _publish_journal(self) -> None:
+        offset, highest_offset, ready = self._region.header()[3:6]
+        self._region.publish(offset=offset, highest_offset=highest_offset, ready=ready)
+
+    def batch(self) -> AbstractContextManager[object]:
+        # The readers see all or none of the changes of a batch.
+        return self._journal()
+
+    def publish_progress(
+        self,
+        *,
+        offset: int,
+        highest_offset: int,
+        ready: bool,
+        compatibility: str,
+        changes: Sequence[SchemaChange],
+    ) -> None:
+        with self.schema_lock_thread:
+            for change in changes:
+                self._region.append(_Op.change, change.to_dict())
+            if compatibility != self._compatibility:
+                self._region.append(_Op.global_compatibility, {"compatibility": compatibility})
+                self._compatibility = compatibility
+            self._region.publish(offset=offset, highest_offset=highest_offset, ready=ready)
+
+    def insert_schema_version(
+        self,
+        *,
+        subject: Subject,
+        schema_id: SchemaId,
+        version: Version,
+        deleted: bool,
+        schema: TypedSchema,
+        references: Sequence[Reference] | None,
+    ) -> None:
+        with self._journal():
+            super().insert_schema_version(
+                subject=subject,
+                schema_id=schema_id,
+                version=version,
+                deleted=deleted,
+                schema=schema,
+                references=references,
+            )
+            fingerprint = schema.fingerprint()
+            position = self._schema_positions.get(fingerprint)
+            if position is None:
+                position = self._region.append(
+                    _Op.schema,
+                    {
+                        "schema_type": schema.schema_type.value,
+                        "schema_str": schema.schema_str,
+                        "references": _references_to_json(schema.references),
+                    },
+                )
+                self._schema_positions[fingerprint] = position
+            self._region.append(
+                _Op.schema_version,
+                {
+                    "subject": subject,
+                    "schema_id": schema_id,
+                    "version": version.value,
+                    "deleted": deleted,
+                    "schema": position,
+                    "fingerprint": fingerprint.hex(),
+                    "references": _references_to_json(references),
+                },
+            )
+
+    def insert_subject(self, *, subject: Subject) -> None:
+        with self._journal():
+            super().insert_subject(subject=subject)
+            self._region.append(_Op.subject, {"subject": subject})
+
+    def delete_subject_compatibility(self, *, subject: Subject) -> None:
+        with self._journal():
+            super().delete_subject_compatibility(subject=subject)
+            self._region.append(_Op.subject_compatibility, {"subject": subject, "compatibility": None})
+
+    def set_subject_compatibility(self, *, subject: Subject, compatibility: str) -> None:
+        with self._journal():
+            super().set_subject_compatibility(subject=subject, compatibility=compatibility)
+            self._region.append(_Op.subject_compatibility, {"subject": subject, "compatibility": compatibility})
+
+    def delete_subject(self, *, subject: Subject, version: Version) -> None:
+        with self._journal():
+            super().delete_subject(subject=subject, version=version)
+            self._region.append(_Op.delete_subject, {"subject": subject, "version": version.value})
+
+    def delete_subject_hard(self, *, subject: Subject) -> None:
+        with self._journal():
+            super().delete_subject_hard(subject=subject)
+            self._region.append(_Op.delete_subject_hard, {"subject": subject})
+
+    def delete_subject_schema(self, *, subject: Subject, version: Version) -> None:
+        with self._journal():
+            super().delete_subject_schema(subject=subject, version=version)
+            self._region.append(_Op.delete_subject_schema, {"subject": subject, "version": version.value})
+
+    def insert_referenced_by(self, *, subject: Subject, version: Version, schema_id: SchemaId) -> None:
+        with self._journal():
+            super().insert_referenced_by(subject=subject, version=version, schema_id=schema_id)
+            self._region.append(
+                _Op.insert_referenced_by, {"subject": subject, "version": version.value, "schema_id": schema_id}
+            )
+
+    def remove_referenced_by(self, schema_id: SchemaId, references: Iterable[Reference]) -> None:
+        references = list(references)
+        with self._journal():
+            super().remove_referenced_by(schema_id, references)
+            self._region.append(
+                _Op.remove_referenced_by, {"schema_id": schema_id, "references": _references_to_json(references)}
+            )
+
+
+class _StoredSchema:
+    __slots__ = ("schema_type", "schema_str", "references", "dependencies")
+
+    def __init__(self, schema_type: SchemaType, schema_str: str, references: list[Reference] | None) -> None:
+        self.schema_type = schema_type
+        self.schema_str = schema_str
+        self.references = references
+        self.dependencies: Mapping[str, Dependency] | None = None
+
+
+class _SharedSchema(TypedSchema):
+    """Schema in the journal of the primary worker, decoded when used."""
+
+    __slots__ = ("_database", "_position")
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, database: SharedDatabaseReader, position: int, fingerprint: bytes) -> None:
+        self._database = database
+        self._position = position
+        self.max_id = None
+        self._fingerprint_cached = fingerprint
+
+    @property
+    def schema_type(self) -> SchemaType:  # type: ignore[misc,override]
+        return self._database.stored_schema(self._position).schema_type
+
+    @property
+    def schema_str(self) -> str:  # type: ignore[misc,override]
+        return self._database.stored_schema(self._position).schema_str
+
+    @property
+    def references(self) -> list[Reference] | None:  # type: ignore[misc,override]
+        return self._database.stored_schema(self._position).references
+
+    @property
+    def dependencies(self) -> Mapping[str, Dependency] | None:  # type: ignore[misc,override]
+        return self._database.stored_dependencies(self._position)
+
+
+class SharedDatabaseReader(InMemoryDatabase):
+    """Database of the other workers, following the journal of the primary worker.
+
+    Only the subjects, versions and ids are kept in the process, the schemas
+    are read from the journal when used. The database is changed by `follow`
+    only, the other workers never apply records of the schemas topic.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self._region = _Region(path, writable=False)
+        self._position = HEADER_SIZE
+        self._decoded: OrderedDict[int, _StoredSchema] = OrderedDict()
+        self._decoded_lock = Lock()
+        # Resolves the references of a schema to their dependencies, set by the schema reader.
+        self.reference_resolver: ReferenceResolver | None = None
+
+    def follow(self) -> tuple[SharedProgress, list[SchemaChange], str | None]:
+        """Apply the changes committed by the primary worker since the previous call.
+
+        Returns the progress of the primary worker, the changes applied, and the
+        global compatibility if it was changed.
+        """
+        _, _, committed, offset, highest_offset, ready, updated_at = self._region.header()
+        changes: list[SchemaChange] = []
+        compatibility = None
+        if committed > self._position:
+            with self.schema_lock_thread:
+                while self._position < committed:
+                    op, payload, self._position = self._region.read(self._position)
+                    if op is _Op.change:
+                        changes.append(self._change(payload))
+                    elif op is _Op.global_compatibility:
+                        compatibility = str(payload["compatibility"])
+                    else:
+                        self._apply(op, payload)
+        progress = SharedProgress(offset=offset, highest_offset=highest_offset, ready=ready, updated_at=updated_at)
+        return progress, changes, compatibility
+
+    @staticmethod
+    def _change(payload: dict[str, Any]) -> SchemaChange:
+        return SchemaChange(
+            offset=payload["offset"],
+            keytype=payload["keytype"],
+            subject=payload["subject"],
+            version=None if payload["version"] is None else Version(payload["version"]),
+            schema_id=payload["id"],
+            deleted=payload["deleted"],
+        )
+
+    def _apply(self, op: _Op, payload: dict[str, Any]) -> None:
+        if op is _Op.schema:
+            # Read when a version using it is looked up.
+            pass
+        elif op is _Op.schema_version:
+            InMemoryDatabase.insert_schema_version(
+                self,
+                subject=payload["subject"],
+                schema_id=payload["schema_id"],
+                version=Version(payload["version"]),
+                deleted=payload["deleted"],
+                schema=_SharedSchema(self, payload["schema"], bytes.fromhex(payload["fingerprint"])),
+                references=_references_from_json(payload["references"]),
+            )
+        elif op is _Op.subject:
+            InMemoryDatabase.insert_subject(self, subject=payload["subject"])
+        elif op is _Op.subject_compatibility:
+            if payload["compatibility"] is None:
+                InMemoryDatabase.delete_subject_compatibility(self, subject=payload["subject"])
+            else:
+                InMemoryDatabase.set_subject_compatibility(
+                    self, subject=payload["subject"], compatibility=payload["compatibility"]
+                )
+        elif op is _Op.delete_subject:
+            InMemoryDatabase.delete_subject(self, subject=payload["subject"], version=Version(payload["version"]))
+        elif op is _Op.delete_subject_hard:
+            InMemoryDatabase.delete_subject_hard(self, subject=payload["subject"])
+        elif op is _Op.delete_subject_schema:
+            InMemoryDatabase.delete_subject_schema(self, subject=payload["subject"], version=Version(payload["version"]))
+        elif op is _Op.insert_referenced_by:
+            InMemoryDatabase.insert_referenced_by(
+                self, subject=payload["subject"], version=Version(payload["version"]), schema_id=payload["schema_id"]
+            )
+        elif op is _Op.remove_referenced_by:
+            InMemoryDatabase.remove_referenced_by(
+                self, payload["schema_id"], _references_from_json(payload["references"]) or []
+            )
+
+    def stored_schema(self, position: int) -> _StoredSchema:
+        with self._decoded_lock:
+            stored = self._decoded.get(position)
+            if stored is not None:
+                self._decoded.move_to_end(position)
+                return stored
+            _, payload, _ = self._region.read(position)
+            stored = _StoredSchema(
+                schema_type=SchemaType(payload["schema_type"]),
+                schema_str=str(payload["schema_str"]),
+                references=_references_from_json(payload["references"]),
+            )
+            self._decoded[position] = stored
+            if len(self._decoded) > DECODED_SCHEMAS_CACHE_SIZE:
+                self._decoded.popitem(last=False)
+            return stored
+
+    def stored_dependencies(self, position: int) -> Mapping[str, Dependency] | None:
+        stored = self.stored_schema(position)
+        if stored.references and stored.dependencies is None:
+            assert self.reference_resolver is not None, "The schema reader resolves the references"
+            _, stored.dependencies = self.reference_resolver(stored.references)
+        return stored.dependencies
@@ -52,6 +52,13 @@ class NameStrategy(StrEnum, Enum):
     topic_record_name = "topic_record_name"
 
 
+@unique
+class SchemaExecutorType(StrEnum, Enum):
+    inline = "inline"
+    thread = "thread"
+    process = "process"
+
+
 @unique
 class SubjectType(StrEnum, Enum):
     key = "key"
@@ -70,6 +77,8 @@ class Version:
     LATEST_VERSION_TAG: ClassVar[str] = "latest"
     MINUS_1_VERSION_TAG: ClassVar[int] = -1
 
+    __slots__ = ("_value",)
+
     def __init__(self, version: int) -> None:
         if not isinstance(version, int):
             raise InvalidVersion(f"Invalid version {version}")
@@ -806,6 +806,7 @@ class TestInspect:
                     "record_count": 2,
                     "start_offset": 0,
                     "end_offset": 1,
+                    "compression": None,
                 },
             ],
         }
@@ -853,6 +854,7 @@ class TestInspect:
                     "record_count": 2,
                     "start_offset": 0,
                     "end_offset": 1,
+                    "compression": None,
                 },
             ],
         }
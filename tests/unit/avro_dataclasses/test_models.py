@@ -2,10 +2,15 @@
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
-from dataclasses import dataclass, field
+from avro.errors import AvroTypeException
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from karapace.avro_dataclasses.introspect import record_schema
 from karapace.avro_dataclasses.models import AvroModel
-from typing import Optional
+from typing import Optional, Union
 
+import avro.io
+import avro.schema
 import datetime
 import enum
 import io
@@ -44,34 +49,67 @@ class HasOptionalBytes(AvroModel):
     value: Optional[bytes]
 
 
-class TestAvroModel:
-    @pytest.mark.parametrize(
-        "instance",
-        (
-            RecordModel(
-                symbol=Symbol.b,
-                height=123_321_098,
-                name="name of a record",
-                nested=(),
-                id=uuid.uuid4(),
-                dt=datetime.datetime.now(tz=datetime.timezone.utc).replace(microsecond=0),
-            ),
-            RecordModel(
-                symbol=Symbol.a,
-                height=-1,
-                name="",
-                nested=(
-                    NestedModel(bool_field=True, values=(1, 2, 3)),
-                    NestedModel(bool_field=False, values=()),
-                    NestedModel(bool_field=False, values=(3, 2, 1)),
-                ),
-                id=uuid.UUID(int=0),
-                dt=datetime.datetime.now(tz=datetime.timezone.utc).replace(microsecond=0),
-            ),
-            HasOptionalBytes(value=b"foo bar"),
-            HasOptionalBytes(value=None),
+@dataclass(frozen=True)
+class HasNullFirstUnion(AvroModel):
+    symbol: Union[None, Symbol] = None
+
+
+@dataclass(frozen=True)
+class HasMap(AvroModel):
+    values: Mapping[str, str]
+    excluded: int = field(default=0, metadata={"exclude": True})
+
+
+def avro_library_datum(value: object) -> object:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    if isinstance(value, (tuple, list)):
+        return [avro_library_datum(item) for item in value]
+    if isinstance(value, dict):
+        return {key: avro_library_datum(item) for key, item in value.items() if key != "excluded"}
+    return value
+
+
+INSTANCES = (
+    RecordModel(
+        symbol=Symbol.b,
+        height=123_321_098,
+        name="name of a record",
+        nested=(),
+        id=uuid.uuid4(),
+        dt=datetime.datetime.now(tz=datetime.timezone.utc).replace(microsecond=0),
+    ),
+    RecordModel(
+        symbol=Symbol.a,
+        height=-1,
+        name="",
+        nested=(
+            NestedModel(bool_field=True, values=(1, 2, 3)),
+            NestedModel(bool_field=False, values=()),
+            NestedModel(bool_field=False, values=(3, 2, 1)),
         ),
-    )
+        id=uuid.UUID(int=0),
+        dt=datetime.datetime.now(tz=datetime.timezone.utc).replace(microsecond=0),
+    ),
+    HasList(values=[NestedModel(bool_field=True, values=(-3,))]),
+    HasOptionalBytes(value=b"foo bar"),
+    HasOptionalBytes(value=None),
+    HasNullFirstUnion(symbol=Symbol.b),
+    HasNullFirstUnion(),
+    HasMap(values={"a": "b", "ü": ""}),
+    HasMap(values={}),
+)
+
+
+class NonSeekableBuffer(io.BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+class TestAvroModel:
+    @pytest.mark.parametrize("instance", INSTANCES)
     def test_can_roundtrip_instance(self, instance: AvroModel) -> None:
         with io.BytesIO() as buffer:
             instance.serialize(buffer)
@@ -79,3 +117,37 @@ class TestAvroModel:
             parsed = type(instance).parse(buffer)
 
         assert parsed == instance
+
+    @pytest.mark.parametrize("instance", INSTANCES)
+    def test_encoding_matches_avro_library(self, instance: AvroModel) -> None:
+        schema = avro.schema.make_avsc_object(record_schema(type(instance)))
+        with io.BytesIO() as buffer:
+            avro.io.DatumWriter(schema).write(avro_library_datum(asdict(instance)), avro.io.BinaryEncoder(buffer))
+            expected = buffer.getvalue()
+
+        assert instance.encode() == expected
+        assert type(instance).decode(expected) == instance
+
+    def test_parse_leaves_buffer_after_record(self) -> None:
+        with io.BytesIO() as buffer:
+            HasOptionalBytes(value=b"foo").serialize(buffer)
+            HasOptionalBytes(value=None).serialize(buffer)
+            buffer.seek(0)
+            assert HasOptionalBytes.parse(buffer) == HasOptionalBytes(value=b"foo")
+            assert HasOptionalBytes.parse(buffer) == HasOptionalBytes(value=None)
+
+    def test_parse_raises_for_data_after_record_in_non_seekable_buffer(self) -> None:
+        encoded = HasOptionalBytes(value=b"foo").encode()
+        with NonSeekableBuffer(encoded) as buffer:
+            assert HasOptionalBytes.parse(buffer) == HasOptionalBytes(value=b"foo")
+        with NonSeekableBuffer(encoded + HasOptionalBytes(value=None).encode()) as buffer:
+            with pytest.raises(io.UnsupportedOperation):
+                HasOptionalBytes.parse(buffer)
+
+    def test_decodes_blocks_with_negative_counts(self) -> None:
+        # Blocks with a negative count are followed by their size in bytes.
+        assert HasMap.decode(b"\x01\x08\x02a\x02b\x00") == HasMap(values={"a": "b"})
+
+    def test_raises_avro_type_exception_for_invalid_value(self) -> None:
+        with pytest.raises(AvroTypeException):
+            HasOptionalBytes(value="not bytes").encode()  # type: ignore[arg-type]
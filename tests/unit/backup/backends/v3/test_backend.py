@@ -4,7 +4,13 @@ See LICENSE for details
 """
 from dataclasses import replace
 from karapace.backup.backends.reader import ProducerSend, RestoreTopic
-from karapace.backup.backends.v3.backend import _PartitionStats, SchemaBackupV3Reader, SchemaBackupV3Writer
+from karapace.backup.backends.v3.backend import (
+    _PartitionStats,
+    SchemaBackupV3Reader,
+    SchemaBackupV3Writer,
+    VerifyFailure,
+    VerifySuccess,
+)
 from karapace.backup.backends.v3.errors import (
     InconsistentOffset,
     InvalidChecksum,
@@ -13,8 +19,8 @@ from karapace.backup.backends.v3.errors import (
     TooManyRecords,
     UnknownChecksumAlgorithm,
 )
-from karapace.backup.backends.v3.readers import read_records
-from karapace.backup.backends.v3.schema import ChecksumAlgorithm, DataFile
+from karapace.backup.backends.v3.readers import mapped_file, read_record_views
+from karapace.backup.backends.v3.schema import ChecksumAlgorithm, CompressionCodec, DataFile
 from karapace.kafka.types import Timestamp
 from pathlib import Path
 from tests.utils import StubMessage
@@ -543,11 +549,11 @@ def test_writer_respects_max_records_per_checkpoint(tmp_path: Path) -> None:
     data_file_path = backup_path / data_file.filename
 
     checksum = xxhash.xxh64()
-    with data_file_path.open("rb") as buffer:
+    with mapped_file(data_file_path) as view:
         checkpoints = tuple(
             isinstance(record.checksum_checkpoint, bytes)
-            for record in read_records(
-                buffer=buffer,
+            for record in read_record_views(
+                view=view,
                 num_records=11,
                 running_checksum=checksum,
             )
@@ -611,11 +617,11 @@ def test_writer_respects_max_bytes_per_checkpoint(tmp_path: Path) -> None:
     data_file_path = backup_path / data_file.filename
 
     checksum = xxhash.xxh64()
-    with data_file_path.open("rb") as buffer:
+    with mapped_file(data_file_path) as view:
         checkpoints = tuple(
             isinstance(record.checksum_checkpoint, bytes)
-            for record in read_records(
-                buffer=buffer,
+            for record in read_record_views(
+                view=view,
                 num_records=11,
                 running_checksum=checksum,
             )
@@ -758,3 +764,228 @@ class TestPartitionStats:
             ),
         ):
             stats.update(bytes_offset=1, record_offset=19)
+
+
+def test_writer_reader_roundtrip_multiple_partitions(tmp_path: Path) -> None:
+    topic_name = "a-topic"
+    backup_writer = SchemaBackupV3Writer()
+
+    data_files = []
+    # Partitions are finalized in arbitrary order when backed up concurrently.
+    for partition_index in (2, 0):
+        file_path = backup_writer.start_partition(path=tmp_path, topic_name=topic_name, index=partition_index)
+        with backup_writer.safe_writer(file_path, False) as buffer:
+            for offset in range(3):
+                backup_writer.store_record(buffer, make_record(topic_name, partition_index, offset))
+        data_files.append(backup_writer.finalize_partition(index=partition_index, filename=file_path.name))
+    # Empty partitions are started, but never finalized.
+    backup_writer.start_partition(path=tmp_path, topic_name=topic_name, index=1)
+
+    backup_writer.store_metadata(
+        path=tmp_path,
+        topic_name=topic_name,
+        topic_id=None,
+        started_at=datetime.datetime.now(datetime.timezone.utc),
+        finished_at=datetime.datetime.now(datetime.timezone.utc),
+        replication_factor=2,
+        topic_configurations={},
+        data_files=data_files,
+        partition_count=3,
+    )
+
+    backup_reader = SchemaBackupV3Reader()
+    metadata_path = tmp_path / f"{topic_name}.metadata"
+    metadata = backup_reader.read_metadata(metadata_path)
+    assert metadata.partition_count == 3
+    assert metadata.record_count == 6
+    assert [data_file.partition for data_file in metadata.data_files] == [0, 2]
+
+    restore_topic, data_file_instructions = backup_reader.read_data_files(metadata_path, topic_name)
+    assert restore_topic.partition_count == 3
+    assert [{instruction.partition_index for instruction in instructions} for instructions in data_file_instructions] == [
+        {0},
+        {2},
+    ]
+
+
+def test_writer_refuses_more_data_files_than_partitions(tmp_path: Path) -> None:
+    backup_writer = SchemaBackupV3Writer()
+    data_file = DataFile(
+        filename="a-topic:0.data",
+        partition=0,
+        checksum=b"abc123",
+        record_count=1,
+        start_offset=0,
+        end_offset=0,
+    )
+    with pytest.raises(RuntimeError, match="more data files than the topic has partitions"):
+        backup_writer.store_metadata(
+            path=tmp_path,
+            topic_name="a-topic",
+            topic_id=None,
+            started_at=datetime.datetime.now(datetime.timezone.utc),
+            finished_at=datetime.datetime.now(datetime.timezone.utc),
+            replication_factor=2,
+            topic_configurations={},
+            data_files=(data_file, replace(data_file, partition=1)),
+            partition_count=1,
+        )
+
+
+def _write_compressed_backup(tmp_path: Path, codec: CompressionCodec, num_records: int) -> tuple[Path, DataFile]:
+    topic_name = "a-topic"
+    # A small block size makes sure records are spread across several blocks.
+    backup_writer = SchemaBackupV3Writer(
+        max_records_per_checkpoint=3,
+        compression=codec,
+        compression_block_size=100,
+    )
+    file_path = backup_writer.start_partition(path=tmp_path, topic_name=topic_name, index=0)
+    with backup_writer.safe_writer(file_path, False) as buffer:
+        for offset in range(num_records):
+            backup_writer.store_record(buffer, make_record(topic_name, 0, offset))
+        backup_writer.end_partition(buffer, 0)
+    data_file = backup_writer.finalize_partition(index=0, filename=file_path.name)
+    backup_writer.store_metadata(
+        path=tmp_path,
+        topic_name=topic_name,
+        topic_id=None,
+        started_at=datetime.datetime.now(datetime.timezone.utc),
+        finished_at=datetime.datetime.now(datetime.timezone.utc),
+        replication_factor=2,
+        topic_configurations={},
+        data_files=(data_file,),
+        partition_count=1,
+    )
+    return tmp_path / f"{topic_name}.metadata", data_file
+
+
+@pytest.mark.parametrize("codec", list(CompressionCodec))
+def test_writer_reader_roundtrip_compressed(tmp_path: Path, codec: CompressionCodec) -> None:
+    metadata_path, data_file = _write_compressed_backup(tmp_path, codec, num_records=20)
+    assert data_file.compression is codec
+    assert data_file.record_count == 20
+
+    backup_reader = SchemaBackupV3Reader()
+    assert backup_reader.read_metadata(metadata_path).data_files == (data_file,)
+    instructions = tuple(backup_reader.read(metadata_path, "a-topic"))
+    assert [(instruction.key, instruction.value) for instruction in instructions[1:]] == [(b"foo", b"bar")] * 20
+    assert tuple(backup_reader.verify_files(metadata_path)) == (VerifySuccess(data_file=data_file),)
+
+
+def test_reader_raises_invalid_checksum_for_corrupt_block(tmp_path: Path) -> None:
+    metadata_path, data_file = _write_compressed_backup(tmp_path, CompressionCodec.zstd, num_records=20)
+    data_file_path = tmp_path / data_file.filename
+    data = bytearray(data_file_path.read_bytes())
+    # Flip a byte in the compressed payload of the first block.
+    data[8] ^= 0xFF
+    data_file_path.write_bytes(data)
+
+    with pytest.raises(InvalidChecksum, match=r"^Found invalid block checksum at file byte offset 0\.$"):
+        tuple(SchemaBackupV3Reader().read(metadata_path, "a-topic"))
+
+
+def test_writer_refuses_to_finalize_partition_with_pending_block(tmp_path: Path) -> None:
+    backup_writer = SchemaBackupV3Writer(compression=CompressionCodec.lz4)
+    file_path = backup_writer.start_partition(path=tmp_path, topic_name="a-topic", index=0)
+    with backup_writer.safe_writer(file_path, False) as buffer:
+        backup_writer.store_record(buffer, make_record("a-topic", 0, 0))
+
+    with pytest.raises(RuntimeError, match="before the last block is written"):
+        backup_writer.finalize_partition(index=0, filename=file_path.name)
+
+
+def _store_checkpoint(backup_writer: SchemaBackupV3Writer, path: Path, data_files: list[DataFile]) -> None:
+    backup_writer.store_metadata(
+        path=path,
+        topic_name="a-topic",
+        topic_id=None,
+        started_at=datetime.datetime.now(datetime.timezone.utc),
+        finished_at=datetime.datetime.now(datetime.timezone.utc),
+        replication_factor=2,
+        topic_configurations={},
+        data_files=data_files,
+        partition_count=1,
+        checkpoint=True,
+    )
+
+
+def test_writer_reader_roundtrip_chained_data_files(tmp_path: Path) -> None:
+    backup_writer = SchemaBackupV3Writer()
+    data_files: list[DataFile] = []
+    # Each run of an incremental backup chains a data file and stores a checkpoint.
+    for offsets in (range(0, 3), range(5, 7)):
+        file_path = backup_writer.start_partition(path=tmp_path, topic_name="a-topic", index=0, start_offset=offsets[0])
+        with backup_writer.safe_writer(file_path, False) as buffer:
+            for offset in offsets:
+                backup_writer.store_record(buffer, make_record("a-topic", 0, offset))
+        data_files.append(backup_writer.finalize_partition(index=0, filename=file_path.name))
+        _store_checkpoint(backup_writer, tmp_path, data_files)
+
+    assert [data_file.filename for data_file in data_files] == ["a-topic:0:0.data", "a-topic:0:5.data"]
+
+    backup_reader = SchemaBackupV3Reader()
+    metadata_path = tmp_path / "a-topic.metadata"
+    assert backup_reader.read_metadata(metadata_path).record_count == 5
+    _, partition_streams = backup_reader.read_data_files(metadata_path, "a-topic")
+    assert len(partition_streams) == 1
+    assert len(tuple(partition_streams[0])) == 5
+
+
+def test_writer_refuses_overlapping_data_files(tmp_path: Path) -> None:
+    data_file = DataFile(
+        filename="a-topic:0:0.data",
+        partition=0,
+        checksum=b"abc123",
+        record_count=3,
+        start_offset=0,
+        end_offset=2,
+    )
+    with pytest.raises(RuntimeError, match="overlapping data files for partition 0"):
+        _store_checkpoint(
+            SchemaBackupV3Writer(),
+            tmp_path,
+            [data_file, replace(data_file, filename="a-topic:0:2.data", start_offset=2, end_offset=4)],
+        )
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_verify_data_files_in_parallel(tmp_path: Path, workers: int) -> None:
+    backup_writer = SchemaBackupV3Writer()
+    data_files = []
+    for partition_index in range(3):
+        file_path = backup_writer.start_partition(path=tmp_path, topic_name="a-topic", index=partition_index)
+        with backup_writer.safe_writer(file_path, False) as buffer:
+            for offset in range(3):
+                backup_writer.store_record(buffer, make_record("a-topic", partition_index, offset))
+        data_files.append(backup_writer.finalize_partition(index=partition_index, filename=file_path.name))
+    backup_writer.store_metadata(
+        path=tmp_path,
+        topic_name="a-topic",
+        topic_id=None,
+        started_at=datetime.datetime.now(datetime.timezone.utc),
+        finished_at=datetime.datetime.now(datetime.timezone.utc),
+        replication_factor=2,
+        topic_configurations={},
+        data_files=data_files,
+        partition_count=3,
+    )
+    # Flip a byte in the key of the last record of partition 1.
+    corrupt_path = tmp_path / data_files[1].filename
+    data = bytearray(corrupt_path.read_bytes())
+    data[data.rindex(b"foo")] ^= 0xFF
+    corrupt_path.write_bytes(data)
+
+    backup_reader = SchemaBackupV3Reader()
+    metadata_path = tmp_path / "a-topic.metadata"
+    assert tuple(backup_reader.verify_files(metadata_path, workers=workers)) == (
+        VerifySuccess(data_file=data_files[0]),
+        VerifyFailure(data_file=data_files[1], exception=None),
+        VerifySuccess(data_file=data_files[2]),
+    )
+    first, failure, last = backup_reader.verify_records(metadata_path, workers=workers)
+    assert first == VerifySuccess(data_file=data_files[0])
+    assert isinstance(failure, VerifyFailure)
+    assert failure.data_file == data_files[1]
+    assert isinstance(failure.exception, InvalidChecksum)
+    assert last == VerifySuccess(data_file=data_files[2])
@@ -2,8 +2,10 @@
 Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
+from dataclasses import replace
 from hypothesis import given
 from hypothesis.strategies import integers
+from karapace.backup.backends.v3.constants import V3_MARKER
 from karapace.backup.backends.v3.errors import (
     IntegerAboveBound,
     IntegerBelowBound,
@@ -12,27 +14,45 @@ from karapace.backup.backends.v3.errors import (
     TooFewRecords,
     TooManyRecords,
 )
-from karapace.backup.backends.v3.readers import read_metadata, read_record, read_records, read_uint32, read_uint64
-from karapace.backup.backends.v3.schema import DataFile, Header, Metadata, Record
+from karapace.backup.backends.v3.readers import mapped_file, read_metadata, read_record_views, read_uint32, read_uint64
+from karapace.backup.backends.v3.schema import CompressionCodec, DataFile, Header, Metadata, Record
 from karapace.backup.backends.v3.writers import (
     UINT32_RANGE,
     UINT64_RANGE,
     write_metadata,
     write_record,
+    write_sized,
     write_uint32,
     write_uint64,
 )
+from pathlib import Path
 from tests.unit.backup.backends.v3.conftest import setup_buffer
 from typing import IO
 from xxhash import xxh64
 
 import datetime
 import io
+import mmap
 import pytest
 import time
 import uuid
 
 
+def read_records(buffer: IO[bytes], num_records: int, running_checksum: xxh64) -> tuple[Record, ...]:
+    """Decode the rest of `buffer` with `read_record_views`, copying the records out of it."""
+    return tuple(
+        Record(
+            key=None if record.key is None else bytes(record.key),
+            value=None if record.value is None else bytes(record.value),
+            headers=tuple(Header(key=key, value=value) for key, value in record.headers),
+            offset=record.offset,
+            timestamp=record.timestamp,
+            checksum_checkpoint=record.checksum_checkpoint,
+        )
+        for record in read_record_views(memoryview(buffer.read()), num_records, running_checksum)
+    )
+
+
 @pytest.mark.parametrize(
     ("byte_value", "expected_result"),
     (
@@ -170,8 +190,9 @@ def test_uint64_roundtrip(value: int) -> None:
 
 
 class TestMetadata:
-    def test_metadata_roundtrip(self, buffer: IO[bytes]) -> None:
-        instance = Metadata(
+    @staticmethod
+    def metadata() -> Metadata:
+        return Metadata(
             version=3,
             tool_name="Karapace",
             tool_version="1.2.3",
@@ -194,10 +215,32 @@ class TestMetadata:
                 ),
             ),
         )
+
+    def test_metadata_roundtrip(self, buffer: IO[bytes]) -> None:
+        instance = self.metadata()
+        write_metadata(buffer, instance)
+        buffer.seek(0)
+        assert read_metadata(buffer) == instance
+
+    def test_metadata_roundtrip_with_compressed_data_file(self, buffer: IO[bytes]) -> None:
+        metadata = self.metadata()
+        instance = replace(
+            metadata,
+            data_files=(replace(metadata.data_files[0], compression=CompressionCodec.zstd),),
+        )
         write_metadata(buffer, instance)
         buffer.seek(0)
         assert read_metadata(buffer) == instance
 
+    def test_reads_metadata_without_extension(self, buffer: IO[bytes]) -> None:
+        # Metadata files written before the extension was introduced end after the
+        # Metadata record.
+        instance = self.metadata()
+        buffer.write(V3_MARKER)
+        write_sized(buffer, instance)
+        buffer.seek(0)
+        assert read_metadata(buffer) == instance
+
     def test_raises_invalid_header_for_unknown_marker(self, buffer: IO[bytes]) -> None:
         buffer.write(b"abcd")
         buffer.seek(0)
@@ -232,7 +275,7 @@ class TestRecordSerialisation:
         )
         write_record(buffer, instance, writer_checksum)
         buffer.seek(0)
-        assert read_record(buffer, reader_checksum) == instance
+        assert read_records(buffer, 1, reader_checksum) == (instance,)
         assert writer_checksum.intdigest() == writer_checksum.intdigest()
 
     def test_unseeded_roundtrip(self, buffer: IO[bytes]) -> None:
@@ -257,7 +300,7 @@ class TestRecordSerialisation:
         )
         write_record(buffer, instance, writer_checksum)
         buffer.seek(0)
-        assert read_record(buffer, reader_checksum) == instance
+        assert read_records(buffer, 1, reader_checksum) == (instance,)
         assert writer_checksum.intdigest() == writer_checksum.intdigest()
 
     def test_reader_raises_invalid_checksum_for_mismatch(self, buffer: IO[bytes]) -> None:
@@ -275,7 +318,7 @@ class TestRecordSerialisation:
         buffer.seek(0)
 
         with pytest.raises(InvalidChecksum):
-            read_record(buffer, reader_checksum)
+            read_records(buffer, 1, reader_checksum)
 
     def test_read_records(self, buffer: IO[bytes]) -> None:
         writer_checksum = xxh64()
@@ -344,12 +387,10 @@ def test_read_records_raises_too_few_records(buffer: io.BytesIO) -> None:
 
     buffer.seek(0)
     with pytest.raises(TooFewRecords):
-        tuple(
-            read_records(
-                buffer=buffer,
-                num_records=2,
-                running_checksum=xxh64(),
-            )
+        read_records(
+            buffer=buffer,
+            num_records=2,
+            running_checksum=xxh64(),
         )
 
 
@@ -379,10 +420,100 @@ def test_read_records_raises_too_many_records(buffer: io.BytesIO) -> None:
 
     buffer.seek(0)
     with pytest.raises(TooManyRecords):
-        tuple(
-            read_records(
-                buffer=buffer,
-                num_records=2,
-                running_checksum=xxh64(),
-            )
+        read_records(
+            buffer=buffer,
+            num_records=2,
+            running_checksum=xxh64(),
         )
+
+
+def test_read_record_views_from_mapped_file(tmp_path: Path) -> None:
+    writer_checksum = xxh64()
+    records = (
+        Record(
+            key=None,
+            value=b"some-value" * 100,
+            headers=(Header(key=b"some-header", value=b"some-header-value"),),
+            offset=123,
+            timestamp=round(time.time()),
+            checksum_checkpoint=None,
+        ),
+        Record(
+            key=b"some-key",
+            value=None,
+            headers=(),
+            offset=2**40,
+            timestamp=round(time.time()),
+            checksum_checkpoint=b"replaced when written",
+        ),
+    )
+    data_path = tmp_path / "records.data"
+    written = []
+    with data_path.open("wb") as buffer:
+        for record in records:
+            if record.checksum_checkpoint is not None:
+                # A checkpoint holds the checksum of all preceding records.
+                record = replace(record, checksum_checkpoint=writer_checksum.digest())
+            write_record(buffer, record, writer_checksum)
+            written.append(record)
+
+    view_checksum = xxh64()
+    with mapped_file(data_path) as view:
+        record_views = read_record_views(view=view, num_records=2, running_checksum=view_checksum)
+        for record_view, record in zip(record_views, written):
+            assert record_view.key == record.key
+            assert record_view.value == record.value
+            assert record_view.headers == tuple((header.key, header.value) for header in record.headers)
+            assert record_view.offset == record.offset
+            assert record_view.timestamp == record.timestamp
+            assert record_view.checksum_checkpoint == record.checksum_checkpoint
+
+    assert view_checksum.intdigest() == writer_checksum.intdigest()
+
+
+def test_read_record_views_raises_too_few_and_too_many_records(tmp_path: Path) -> None:
+    data_path = tmp_path / "records.data"
+    record = Record(
+        key=b"some-key",
+        value=b"some-value",
+        headers=(),
+        offset=123,
+        timestamp=round(time.time()),
+        checksum_checkpoint=None,
+    )
+    with data_path.open("wb") as buffer:
+        write_record(buffer, record, xxh64())
+        buffer.write(b"0")
+
+    with mapped_file(data_path) as view:
+        with pytest.raises(TooManyRecords):
+            tuple(read_record_views(view=view, num_records=1, running_checksum=xxh64()))
+        with pytest.raises(TooFewRecords):
+            tuple(read_record_views(view=view, num_records=2, running_checksum=xxh64()))
+
+
+def test_mapped_file_handles_empty_files(tmp_path: Path) -> None:
+    data_path = tmp_path / "empty.data"
+    data_path.touch()
+    with mapped_file(data_path) as view:
+        assert tuple(read_record_views(view=view, num_records=0, running_checksum=xxh64())) == ()
+
+
+def test_mapped_file_unmaps_the_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mappings = []
+
+    class RecordingMap(mmap.mmap):
+        def __init__(self, *args, **kwargs) -> None:
+            mappings.append(self)
+
+    monkeypatch.setattr(mmap, "mmap", RecordingMap)
+    data_path = tmp_path / "records.data"
+    data_path.write_bytes(b"some-data")
+
+    with mapped_file(data_path) as view:
+        assert view[5:] == b"data"
+
+    (mapped,) = mappings
+    assert mapped.closed
+    with pytest.raises(ValueError, match="released memoryview"):
+        view.tobytes()
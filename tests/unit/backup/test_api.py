@@ -5,32 +5,46 @@ See LICENSE for details
 from __future__ import annotations
 
 from aiokafka.errors import KafkaError, TopicAlreadyExistsError
+from confluent_kafka import Message, TopicPartition
 from karapace import config
 from karapace.backup.api import (
     _admin,
+    _consume_records,
     _consumer,
+    _handle_producer_send,
     _handle_restore_topic,
     _handle_restore_topic_legacy,
     _maybe_create_topic,
     _producer,
+    _write_partitions,
+    BackupVersion,
+    create_backup,
     locate_backup_file,
     normalize_location,
     normalize_topic_name,
 )
-from karapace.backup.backends.reader import RestoreTopic, RestoreTopicLegacy
+from karapace.backup.backends.reader import ProducerSend, RestoreTopic, RestoreTopicLegacy
+from karapace.backup.backends.v3.backend import SchemaBackupV3Reader, SchemaBackupV3Writer
+from karapace.backup.backends.v3.schema import ChecksumAlgorithm
 from karapace.backup.backends.writer import StdOut
-from karapace.backup.errors import BackupError, PartitionCountError
+from karapace.backup.errors import BackupError, MissingRecordsError, PartitionCountError
+from karapace.backup.poll_timeout import PollTimeout
 from karapace.config import Config
 from karapace.constants import DEFAULT_SCHEMA_TOPIC
 from karapace.kafka.consumer import KafkaConsumer, PartitionMetadata
 from karapace.kafka.producer import KafkaProducer
+from karapace.kafka.types import Timestamp
 from pathlib import Path
+from tests.utils import StubMessage
+from threading import Lock
 from types import FunctionType
 from typing import Callable, cast, ContextManager
 from unittest import mock
 from unittest.mock import MagicMock
 
+import datetime
 import pytest
+import time
 
 patch_admin_new = mock.patch(
     "karapace.backup.api.KafkaAdminClient.__new__",
@@ -203,6 +217,16 @@ class TestClients:
                     assert client == client_mock
             assert getattr(client_mock, close_method_name).call_count == 1
 
+    def test_producer_accepts_expected_partition_count(self) -> None:
+        with mock.patch(f"{KafkaProducer.__module__}.{KafkaProducer.__qualname__}.__new__", autospec=True) as client_ctor:
+            client_mock = client_ctor.return_value
+            client_mock.partitions_for.return_value = self._partition_metadata(3)
+            with _producer(config.DEFAULTS, "topic", 3) as client:
+                assert client is client_mock
+            with pytest.raises(PartitionCountError, match="but the backup has 2 partitions"):
+                with _producer(config.DEFAULTS, "topic", 2):
+                    pass
+
 
 class TestNormalizeLocation:
     @pytest.mark.parametrize("alias", ("", "-"))
@@ -274,3 +298,110 @@ class TestNormalizeTopicName:
     def test_defaults_to_config(self) -> None:
         fake_config = cast(Config, {"topic_name": "default-topic"})
         assert normalize_topic_name(None, fake_config) == "default-topic"
+
+
+class TestConsumeRecords:
+    def test_raises_missing_records_error_for_deleted_records(self) -> None:
+        consumer = MagicMock(spec=KafkaConsumer)
+        consumer.get_watermark_offsets.return_value = (10, 20)
+
+        with pytest.raises(MissingRecordsError):
+            next(_consume_records(consumer, TopicPartition("topic", 0), PollTimeout.default(), from_offset=5))
+        consumer.poll.assert_not_called()
+
+    def test_starts_at_given_offset(self) -> None:
+        consumer = MagicMock(spec=KafkaConsumer)
+        consumer.get_watermark_offsets.return_value = (10, 20)
+        record = MagicMock(spec=Message)
+        record.error.return_value = None
+        record.offset.return_value = 19
+        consumer.poll.return_value = record
+
+        assert list(_consume_records(consumer, TopicPartition("topic", 0), PollTimeout.default(), from_offset=15)) == [
+            record
+        ]
+
+
+class TestWritePartitions:
+    def test_backs_up_at_most_parallelism_partitions_concurrently(self, tmp_path: Path) -> None:
+        lock = Lock()
+        running = 0
+        max_running = 0
+
+        def backup_partition(*args: object) -> None:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+        with mock.patch("karapace.backup.api._backup_partition", side_effect=backup_partition) as backup_partition_mock:
+            data_files = _write_partitions(
+                config=config.DEFAULTS,
+                path=tmp_path,
+                backend=SchemaBackupV3Writer(),
+                topic_name="a-topic",
+                partitions=range(8),
+                poll_timeout=PollTimeout.default(),
+                allow_overwrite=False,
+                parallelism=2,
+            )
+
+        assert data_files == []
+        assert backup_partition_mock.call_count == 8
+        assert max_running == 2
+
+    def test_create_backup_rejects_parallelism_below_one(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="Backup parallelism must be at least 1."):
+            create_backup(
+                config=config.DEFAULTS,
+                backup_location=tmp_path,
+                topic_name="a-topic",
+                version=BackupVersion.V3,
+                replication_factor=1,
+                parallelism=0,
+            )
+
+
+class TestHandleProducerSend:
+    def test_sends_v3_records_with_kafka_producer(self, tmp_path: Path) -> None:
+        record = StubMessage(
+            key=b"foo",
+            value=b"bar",
+            topic="a-topic",
+            partition=0,
+            offset=0,
+            timestamp=(Timestamp.CREATE_TIME, 1),
+            headers=[("some-key", b"some-value")],
+        )
+        writer = SchemaBackupV3Writer(checksum_algorithm=ChecksumAlgorithm.xxhash3_64_be)
+        file_path = writer.start_partition(path=tmp_path, topic_name="a-topic", index=0)
+        with writer.safe_writer(file_path, False) as buffer:
+            writer.store_record(buffer, record)
+        writer.store_metadata(
+            path=tmp_path,
+            topic_name="a-topic",
+            topic_id=None,
+            started_at=datetime.datetime.now(datetime.timezone.utc),
+            finished_at=datetime.datetime.now(datetime.timezone.utc),
+            replication_factor=1,
+            topic_configurations={},
+            data_files=(writer.finalize_partition(index=0, filename=file_path.name),),
+            partition_count=1,
+        )
+        (instruction,) = (
+            instruction
+            for instruction in SchemaBackupV3Reader().read(tmp_path / "a-topic.metadata", "a-topic")
+            if isinstance(instruction, ProducerSend)
+        )
+        # The producer is never connected, the record stays in its queue.
+        producer = KafkaProducer(bootstrap_servers="127.0.0.1:1", verify_connection=False)
+        callback = MagicMock()
+
+        _handle_producer_send(instruction, producer, callback)
+
+        assert len(producer) == 1
+        callback.assert_not_called()
+        producer.purge()
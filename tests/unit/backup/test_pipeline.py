@@ -0,0 +1,89 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from collections.abc import Iterator
+from karapace.backup.api import _dry_run_producer, _restore_instructions
+from karapace.backup.backends.reader import ProducerSend, RestoreTopic
+from karapace.backup.pipeline import InFlightWindow, PipelineOptions, read_ahead, RestoreProgress
+
+import pytest
+
+
+def _sends(count: int) -> Iterator[ProducerSend]:
+    for index in range(count):
+        yield ProducerSend(topic_name="a-topic", partition_index=0, key=b"key", value=str(index).encode())
+
+
+class TestReadAhead:
+    def test_yields_instructions_in_order(self) -> None:
+        assert list(read_ahead(iter(range(100)), queue_size=3)) == list(range(100))
+
+    def test_raises_reader_exception(self) -> None:
+        def instructions() -> Iterator[int]:
+            yield 1
+            raise ValueError("broken backup")
+
+        stream = read_ahead(instructions(), queue_size=3)
+        assert next(stream) == 1
+        with pytest.raises(ValueError, match="^broken backup$"):
+            next(stream)
+
+
+class TestInFlightWindow:
+    def test_is_full_by_records(self) -> None:
+        window = InFlightWindow(max_records=2, max_bytes=1_000)
+        window.add(1)
+        assert not window.is_full()
+        window.add(1)
+        assert window.is_full()
+        window.remove(1)
+        assert not window.is_full()
+
+    def test_lets_single_oversized_record_through(self) -> None:
+        window = InFlightWindow(max_records=10, max_bytes=10)
+        assert not window.is_full()
+        window.add(100)
+        assert window.is_full()
+
+
+def test_progress_reports_rates_and_eta() -> None:
+    now = 0.0
+    progress = RestoreProgress(topic_name="a-topic", total_records=30, interval=60.0, clock=lambda: now)
+    for _ in range(10):
+        progress.add(100)
+    now = 2.0
+
+    report = progress.snapshot()
+    assert report.records == 10
+    assert report.records_per_second == 5.0
+    assert report.bytes_per_second == 500.0
+    assert report.eta == 4.0
+
+
+def test_restore_instructions_acknowledges_all_records() -> None:
+    progress = RestoreProgress(topic_name="a-topic", total_records=None, interval=60.0)
+    options = PipelineOptions(queue_size=2, max_in_flight_records=3, poll_interval=5)
+
+    _restore_instructions(_dry_run_producer(), _sends(50), options, progress)
+
+    report = progress.snapshot()
+    assert report.records == 50
+    assert report.bytes == 50 * 3 + sum(len(str(index)) for index in range(50))
+
+
+def test_restore_instructions_rejects_topic_instruction_after_records() -> None:
+    progress = RestoreProgress(topic_name="a-topic", total_records=None, interval=60.0)
+    instructions = iter(
+        (
+            *_sends(1),
+            RestoreTopic(topic_name="a-topic", partition_count=1, replication_factor=1, topic_configs={}),
+        )
+    )
+    with pytest.raises(RuntimeError, match="topic instruction after records"):
+        _restore_instructions(_dry_run_producer(), instructions, PipelineOptions(), progress)
+
+
+def test_pipeline_options_validation() -> None:
+    with pytest.raises(ValueError):
+        PipelineOptions(max_in_flight_records=0)
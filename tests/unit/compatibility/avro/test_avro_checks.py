@@ -0,0 +1,97 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from avro.compatibility import ReaderWriterCompatibilityChecker, SchemaCompatibilityResult
+from avro.schema import RecordSchema, UnionSchema
+from karapace.compatibility.avro.checks import check_avro_compatibility, schema_tables
+from karapace.schema_models import parse_avro_schema_definition
+from typing import Any
+
+import json
+import pytest
+
+
+def _record(name: str, fields: list[dict[str, Any]], **props: Any) -> dict[str, Any]:
+    return {"type": "record", "name": name, "fields": fields, **props}
+
+
+LINKED_LIST = _record("Node", [{"name": "value", "type": "int"}, {"name": "next", "type": ["null", "Node"]}])
+METADATA = _record("Metadata", [{"name": "source", "type": "string"}])
+EVENTS = [
+    _record(f"Event{pos}", [{"name": "id", "type": "string"}, {"name": f"field{pos}", "type": ["null", "Metadata"]}])
+    for pos in range(1, 4)
+]
+
+SCHEMAS: list[Any] = [
+    "int",
+    "long",
+    "double",
+    "bytes",
+    "string",
+    ["null", "string"],
+    ["null", "int", "string"],
+    ["long", "bytes"],
+    {"type": "array", "items": ["null", "int"]},
+    {"type": "map", "values": "long"},
+    {"type": "enum", "name": "Suit", "symbols": ["SPADES", "HEARTS"]},
+    {"type": "enum", "name": "Suit", "symbols": ["SPADES", "HEARTS", "CLUBS"], "default": "SPADES"},
+    {"type": "fixed", "name": "Hash", "size": 16},
+    {"type": "fixed", "name": "Hash", "size": 32},
+    _record("Record", [{"name": "a", "type": "int"}]),
+    _record("Record", [{"name": "a", "type": "long"}, {"name": "b", "type": "string", "default": ""}]),
+    _record("Renamed", [{"name": "b", "type": "int", "aliases": ["a"]}], aliases=["Record"]),
+    LINKED_LIST,
+    _record("Node", [{"name": "value", "type": "long"}, {"name": "next", "type": ["null", "Node"]}]),
+    _record("Envelope", [{"name": "metadata", "type": METADATA}, {"name": "event", "type": EVENTS}]),
+    _record("Envelope", [{"name": "metadata", "type": METADATA}, {"name": "event", "type": EVENTS[::-1]}]),
+    _record("Envelope", [{"name": "metadata", "type": METADATA}, {"name": "event", "type": EVENTS[:2]}]),
+]
+
+
+def _result(result: SchemaCompatibilityResult) -> tuple:
+    return result.compatibility, result.incompatibilities, result.messages, result.locations
+
+
+@pytest.mark.parametrize("reader", SCHEMAS)
+def test_results_agree_with_the_avro_checker(reader: Any) -> None:
+    reader_schema = parse_avro_schema_definition(json.dumps(reader))
+    for writer in SCHEMAS:
+        writer_schema = parse_avro_schema_definition(json.dumps(writer))
+
+        expected = ReaderWriterCompatibilityChecker().get_compatibility(reader=reader_schema, writer=writer_schema)
+        assert _result(check_avro_compatibility(reader_schema, writer_schema)) == _result(expected), writer
+
+
+def test_reader_union_branches_are_looked_up_by_type_and_name() -> None:
+    reader = parse_avro_schema_definition(
+        json.dumps(["null", "long", "string", "double", METADATA, *EVENTS, _record("Other", [], aliases=["Event2"])])
+    )
+    writer = parse_avro_schema_definition(json.dumps(["int", "bytes", METADATA, *EVENTS]))
+    assert isinstance(reader, UnionSchema)
+    assert isinstance(writer, UnionSchema)
+    branches = schema_tables(reader).union_branches(reader)
+
+    def candidates(writer_branch: int) -> list[str]:
+        return [getattr(branch, "fullname", branch.type) for branch in branches.candidates(writer.schemas[writer_branch])]
+
+    assert candidates(0) == ["long", "double"]
+    assert candidates(1) == ["string"]
+    assert candidates(2) == ["Metadata"]
+    assert candidates(3) == ["Event1"]
+    assert candidates(4) == ["Event2", "Other"]
+    assert branches.candidates(writer.schemas[4]) is branches.candidates(writer.schemas[4])
+
+
+def test_tables_of_a_schema_are_shared_by_its_checks() -> None:
+    reader = parse_avro_schema_definition(json.dumps(LINKED_LIST))
+    assert isinstance(reader, RecordSchema)
+    tables = schema_tables(reader)
+
+    for writer in SCHEMAS[-5:-3]:
+        check_avro_compatibility(reader, parse_avro_schema_definition(json.dumps(writer)))
+
+    assert schema_tables(reader) is tables
+    assert schema_tables(parse_avro_schema_definition(json.dumps(LINKED_LIST))) is not tables
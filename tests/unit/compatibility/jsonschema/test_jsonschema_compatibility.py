@@ -3,8 +3,12 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
+from collections import Counter
 from jsonschema import Draft7Validator
+from karapace.compatibility.jsonschema import checks
 from karapace.compatibility.jsonschema.checks import compatibility
+from karapace.compatibility.jsonschema.utils import normalize_schema
+from karapace.schema_models import parse_jsonschema_definition
 from tests.schemas.json_schemas import (
     A_DINT_B_DINT_OBJECT_SCHEMA,
     A_DINT_B_INT_OBJECT_SCHEMA,
@@ -101,6 +105,7 @@ from tests.schemas.json_schemas import (
     TYPES_STRING_INT_SCHEMA,
     TYPES_STRING_SCHEMA,
 )
+from typing import Any
 
 COMPATIBLE = SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
 
@@ -734,6 +739,43 @@ def test_union_with_compatible_elements() -> None:
     )
 
 
+def test_union_matching_reassigns_compatible_elements() -> None:
+    # The reader number accepts both writer elements, the matching must move
+    # it to the writer number for the reader integer to be matched as well.
+    schemas_are_compatible(
+        reader=parse_jsonschema_definition('{"anyOf":[{"type":"number"},{"type":"integer"}]}'),
+        writer=parse_jsonschema_definition('{"anyOf":[{"type":"integer"},{"type":"number"}]}'),
+        msg="every writer element is read by a distinct reader element",
+    )
+    not_schemas_are_compatible(
+        reader=parse_jsonschema_definition('{"anyOf":[{"type":"number"},{"type":"string","maxLength":1}]}'),
+        writer=parse_jsonschema_definition('{"anyOf":[{"type":"integer"},{"type":"string"}]}'),
+        msg="the writer string is not accepted by any reader element",
+    )
+
+
+def test_wide_union_compares_each_pair_once(monkeypatch) -> None:
+    # Only the first reader element accepts the writer elements with a
+    # minimum, the search for the others repeatedly runs into the same dead
+    # ends.
+    reader_branches = ['{"type":"number"}'] + [f'{{"type":"integer","maximum":0,"title":"{pos}"}}' for pos in range(1, 40)]
+    writer_branches = ['{"type":"integer","maximum":0}'] + [f'{{"type":"integer","minimum":{pos}}}' for pos in range(1, 40)]
+    reader = parse_jsonschema_definition(f'{{"anyOf":[{",".join(reader_branches)}]}}')
+    writer = parse_jsonschema_definition(f'{{"anyOf":[{",".join(writer_branches)}]}}')
+
+    compared: Counter[tuple[int, int]] = Counter()
+    compatibility_rec = checks._compatibility_rec  # pylint: disable=protected-access
+
+    def counting_compatibility_rec(reader_schema, writer_schema, location):
+        compared[(id(reader_schema), id(writer_schema))] += 1
+        return compatibility_rec(reader_schema, writer_schema, location)
+
+    monkeypatch.setattr(checks, "_compatibility_rec", counting_compatibility_rec)
+    not_schemas_are_compatible(reader=reader, writer=writer, msg="a single reader element accepts values above zero")
+
+    assert max(compared.values()) == 1
+
+
 def test_array_and_tuples_are_incompatible() -> None:
     # both tuple and arrays are represented using lists, this should be
     # compatible
@@ -1464,3 +1506,78 @@ def test_ref():
         writer=ARRAY_OF_POSITIVE_INTEGER,
         msg="the schemas are the same",
     )
+
+
+def _definitions_chain(length: int, leaf_type: str) -> Draft7Validator:
+    # Every definition references the next one twice, inlining the references
+    # would expand to 2 ** length copies of the leaf.
+    definitions: dict[str, Any] = {
+        f"d{pos}": {
+            "type": "object",
+            "properties": {"left": {"$ref": f"#/definitions/d{pos + 1}"}, "right": {"$ref": f"#/definitions/d{pos + 1}"}},
+        }
+        for pos in range(length)
+    }
+    definitions[f"d{length}"] = {"type": leaf_type}
+    return Draft7Validator({"definitions": definitions, "$ref": "#/definitions/d0"})
+
+
+def test_normalized_references_share_the_definition() -> None:
+    normalized = normalize_schema(_definitions_chain(2, "integer"))
+
+    assert normalized["properties"]["left"] is normalized["properties"]["right"]
+    assert normalized["properties"]["left"]["properties"]["left"] == {"type": "integer"}
+
+
+def test_definitions_referenced_from_many_places() -> None:
+    schemas_are_compatible(
+        reader=_definitions_chain(40, "number"),
+        writer=_definitions_chain(40, "integer"),
+        msg="the leaf was widened",
+    )
+    # Each path to the leaf adds its incompatibility to the result.
+    not_schemas_are_compatible(
+        reader=_definitions_chain(10, "integer"),
+        writer=_definitions_chain(10, "number"),
+        msg="the leaf was narrowed",
+    )
+
+
+def test_recursive_definitions() -> None:
+    def linked_list(value_type: str) -> Draft7Validator:
+        return Draft7Validator(
+            {
+                "definitions": {
+                    "node": {
+                        "type": "object",
+                        "properties": {"value": {"type": value_type}, "next": {"$ref": "#/definitions/node"}},
+                    }
+                },
+                "$ref": "#/definitions/node",
+            }
+        )
+
+    normalized = normalize_schema(linked_list("integer"))
+    assert normalized["properties"]["next"] is normalized
+
+    schemas_are_compatible(reader=linked_list("number"), writer=linked_list("integer"), msg="the value was widened")
+    not_schemas_are_compatible(reader=linked_list("integer"), writer=linked_list("number"), msg="the value was narrowed")
+
+
+def _inlined_chain(length: int, leaf_type: str) -> Draft7Validator:
+    def inlined(length: int) -> dict[str, Any]:
+        if length == 0:
+            return {"type": leaf_type}
+        return {"type": "object", "properties": {"left": inlined(length - 1), "right": inlined(length - 1)}}
+
+    return Draft7Validator(inlined(length))
+
+
+def test_shared_definitions_report_every_location() -> None:
+    result = compatibility(reader=_definitions_chain(3, "integer"), writer=_definitions_chain(3, "number"))
+    inlined_result = compatibility(reader=_inlined_chain(3, "integer"), writer=_inlined_chain(3, "number"))
+
+    assert result.compatibility is SchemaCompatibilityType.incompatible
+    assert len(result.locations) > 2**3
+    assert result.locations == inlined_result.locations
+    assert result.messages == inlined_result.messages
@@ -3,10 +3,18 @@ Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
 
+from cachetools import LRUCache
 from karapace.dependency import Dependency
+from karapace.protobuf import proto_normalizations
 from karapace.protobuf.compare_result import CompareResult
 from karapace.protobuf.location import Location
-from karapace.protobuf.proto_normalizations import normalize
+from karapace.protobuf.proto_normalizations import (
+    normalize,
+    normalize_proto_file_element,
+    NORMALIZED_SCHEMAS_CACHE_SIZE,
+    NormalizedProtobufSchema,
+)
+from karapace.protobuf.schema import ProtobufSchema
 from karapace.schema_models import parse_protobuf_schema_definition, ValidatedTypedSchema
 from karapace.schema_type import SchemaType
 from karapace.typing import Subject, Version
@@ -1063,3 +1071,41 @@ def test_full_path_and_simple_names_are_not_equal_if_simple_name_is_not_unique_w
     assert (
         normalized_schema.schema == schema.schema
     ), "Since the simple name is not unique identifying the type isn't replacing the source"
+
+
+def test_normalized_schemas_are_cached_by_content_and_dependencies(monkeypatch: pytest.MonkeyPatch) -> None:
+    no_ref_schema = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, DEPENDENCY, normalize=True)
+    tricky_no_ref_schema = ValidatedTypedSchema.parse(SchemaType.PROTOBUF, TRICKY_DEPENDENCY, normalize=True)
+    dep = Dependency("NestedValue.proto", Subject("nested_value"), Version(1), no_ref_schema)
+    tricky_dep = Dependency("TrickyNestedValue.proto", Subject("tricky_nested_value"), Version(1), tricky_no_ref_schema)
+    normalized_elements = []
+    monkeypatch.setattr(NormalizedProtobufSchema, "_normalized_strs", LRUCache(maxsize=NORMALIZED_SCHEMAS_CACHE_SIZE))
+    monkeypatch.setattr(
+        proto_normalizations,
+        "normalize_proto_file_element",
+        lambda protobuf_schema: normalized_elements.append(protobuf_schema) or normalize_proto_file_element(protobuf_schema),
+    )
+
+    def parse(dependencies: dict[str, Dependency]) -> ProtobufSchema:
+        return parse_protobuf_schema_definition(
+            schema_definition=PROTO_WITH_FULLY_QUALIFIED_PATHS_AND_TRICKY_DEPENDENCY,
+            references=None,
+            dependencies=dependencies,
+            validate_references=False,
+            normalize=True,
+        )
+
+    first = parse({"NestedValue.proto": dep})
+    assert len(normalized_elements) == 1
+    second = parse({"NestedValue.proto": dep})
+    assert len(normalized_elements) == 1, "the text of a known schema is not normalized again"
+    assert str(second) == str(first)
+
+    # The elements are only normalized when they are used.
+    assert second.to_schema() == str(first)
+    assert len(normalized_elements) == 2
+
+    # The same text normalizes differently with other dependencies.
+    tricky = parse({"NestedValue.proto": dep, "TrickyNestedValue.proto": tricky_dep})
+    assert len(normalized_elements) == 3
+    assert str(tricky) != str(first)
@@ -8,7 +8,7 @@ from karapace.protobuf.kotlin_wrapper import trim_margin
 from karapace.protobuf.location import Location
 from karapace.protobuf.schema import ProtobufSchema, SourceFileReference, TypeTree
 from karapace.schema_models import SchemaType, ValidatedTypedSchema
-from karapace.typing import Subject
+from karapace.typing import Subject, Version
 from tests.schemas.protobuf import (
     schema_protobuf_compare_one,
     schema_protobuf_order_after,
@@ -615,3 +615,49 @@ def test_type_tree_expand_types() -> None:
         "v1beta1",
         "CustomerPlanEvent",
     ]
+
+
+def _diamond_schema() -> ProtobufSchema:
+    """Schema importing `b.proto` and `c.proto`, both importing `a.proto`."""
+    schema_a = ValidatedTypedSchema.parse(
+        SchemaType.PROTOBUF, 'syntax = "proto3";\npackage a;\nmessage A { message Nested { string v = 1; } }\n'
+    )
+    dependency_a = {"a.proto": Dependency("a.proto", Subject("a"), Version(1), schema_a)}
+    dependencies = {}
+    for name in ("b", "c"):
+        schema = ValidatedTypedSchema.parse(
+            SchemaType.PROTOBUF,
+            f'syntax = "proto3";\npackage {name};\nimport "a.proto";\nmessage {name.upper()} {{ a.A a = 1; }}\n',
+            dependencies=dependency_a,
+        )
+        dependencies[f"{name}.proto"] = Dependency(f"{name}.proto", Subject(name), Version(1), schema)
+    return ProtobufSchema(
+        'syntax = "proto3";\npackage d;\nimport "b.proto";\nimport "c.proto";\n'
+        "message D { b.B b = 1; c.C c = 2; a.A.Nested nested = 3; }\n",
+        dependencies=dependencies,
+    )
+
+
+def test_derived_structures_are_computed_once() -> None:
+    schema = _diamond_schema()
+
+    assert schema.types_tree() is schema.types_tree()
+    assert schema.used_types() is schema.used_types()
+    assert schema.recursive_imports() == {"a.proto", "b.proto", "c.proto"}
+    assert schema.verify_schema_dependencies().result
+    assert schema.verify_schema_dependencies() is schema.verify_schema_dependencies()
+
+
+def test_type_tree_of_dependencies_imported_through_several_paths() -> None:
+    schema = _diamond_schema()
+
+    # The counter moves on as if the types of a.proto were inserted again when
+    # imported by c.proto, the types declared after keep their import order.
+    root_tree = TypeTree(token=".", children=[], source_reference=None)
+    assert schema.types_tree_recursive(root_tree, 0, "main_schema_file") == schema.inserted_types_count() == 7
+    a_type = schema.types_tree().type_in_tree("a.A")
+    assert a_type is not None
+    assert a_type.source_reference == SourceFileReference(reference="a.proto", import_order=0)
+    d_type = schema.types_tree().type_in_tree("d.D")
+    assert d_type is not None
+    assert d_type.source_reference == SourceFileReference(reference="main_schema_file", import_order=6)
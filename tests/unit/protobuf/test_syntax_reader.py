@@ -0,0 +1,60 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.protobuf.exception import IllegalStateException
+from karapace.protobuf.location import Location
+from karapace.protobuf.syntax_reader import SyntaxReader
+
+import pytest
+
+location = Location("", "file.proto")
+
+
+def test_words_and_locations_across_whitespace_and_comments() -> None:
+    reader = SyntaxReader("  message\r\n\t// comment\n  /* block\n * comment */ Foo.Bar_1-x {", location)
+
+    assert reader.read_word() == "message"
+    assert str(reader.location()) == "file.proto:1:10"
+    assert reader.read_word() == "Foo.Bar_1-x"
+    assert str(reader.location()) == "file.proto:4:27"
+    assert reader.read_char() == "{"
+    assert reader.exhausted()
+
+
+def test_documentation() -> None:
+    reader = SyntaxReader("// first\n/* second\n * line */\nmessage Foo {} // trailing\nnext", location)
+
+    assert reader.read_documentation() == "first\nsecond\nline"
+    assert reader.read_word() == "message"
+    assert reader.read_word() == "Foo"
+    reader.require("{")
+    reader.require("}")
+    assert reader.try_append_trailing_documentation("") == "trailing"
+    assert str(reader.location()) == "file.proto:5:1"
+
+
+def test_quoted_strings() -> None:
+    # Adjacent strings are concatenated.
+    reader = SyntaxReader("\"a'b\\t\\101\\x41\" 'c\"d\ne' x", location)
+
+    assert reader.read_string() == "a'b\tAAc\"d\ne"
+    assert str(reader.location()) == "file.proto:2:4"
+    assert reader.read_string() == "x"
+
+
+@pytest.mark.parametrize(
+    "data,read,message",
+    [
+        ("\n\n  ", SyntaxReader.read_char, "Syntax error in file.proto:3:3: unexpected end of file"),
+        ("\n  {", SyntaxReader.read_word, "Syntax error in file.proto:2:3: expected a word"),
+        ("  0x1g", SyntaxReader.read_int, "Syntax error in file.proto:1:7: expected an integer but was 0x1g"),
+        ('\n "abc', SyntaxReader.read_string, "Syntax error in file.proto:2:6: unterminated string"),
+        ("/* abc", SyntaxReader.read_word, "Syntax error in file.proto:1:6: unterminated comment"),
+        ("\n/x", SyntaxReader.read_word, "Syntax error in file.proto:2:3: unexpected '/'"),
+    ],
+)
+def test_syntax_errors(data: str, read, message: str) -> None:
+    with pytest.raises(IllegalStateException) as exc_info:
+        read(SyntaxReader(data, location))
+    assert str(exc_info.value) == message
@@ -13,7 +13,7 @@ from karapace.in_memory_database import InMemoryDatabase, KarapaceDatabase, Subj
 from karapace.kafka.types import Timestamp
 from karapace.key_format import KeyFormatter
 from karapace.offset_watcher import OffsetWatcher
-from karapace.schema_models import SchemaVersion, TypedSchema
+from karapace.schema_models import SchemaType, SchemaVersion, TypedSchema
 from karapace.schema_reader import KafkaSchemaReader
 from karapace.schema_references import Reference, Referents
 from karapace.typing import SchemaId, Version
@@ -259,3 +259,48 @@ def test_can_ingest_schemas_from_log() -> None:
     schema_id_to_duplicated_subjects = compute_schema_id_to_subjects(duplicates, database.subject_to_subject_data())
     assert schema_id_to_duplicated_subjects == {}, "there shouldn't be any duplicated schemas"
     assert duplicates == {}, "the schema database is broken. The id should be unique"
+
+
+def test_versions_share_subject_names_and_binary_fingerprints() -> None:
+    database = InMemoryDatabase()
+    schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='"int"')
+    for version in (1, 2):
+        # Names decoded from separate records are equal but distinct strings.
+        subject = Subject("".join(["sub", "ject"]))
+        database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(version),
+            version=Version(version),
+            deleted=False,
+            schema=schema,
+            references=None,
+        )
+
+    first, second = database.find_subject_schemas(subject=Subject("subject"), include_deleted=False).values()
+    assert first.subject is second.subject
+    assert len(schema.fingerprint()) == 20
+    assert not hasattr(first, "__dict__")
+    assert not hasattr(schema, "__dict__")
+
+
+def test_referents_are_kept_in_insertion_order_without_duplicates() -> None:
+    database = InMemoryDatabase()
+    references = [
+        Reference(name="a.proto", subject=Subject("a"), version=Version(1)),
+        Reference(name="b.proto", subject=Subject("b"), version=Version(1)),
+    ]
+    for schema_id in (SchemaId(3), SchemaId(2), SchemaId(3), SchemaId(4)):
+        for reference in references:
+            database.insert_referenced_by(subject=reference.subject, version=reference.version, schema_id=schema_id)
+
+    assert list(database.get_referenced_by(Subject("a"), Version(1))) == [SchemaId(3), SchemaId(2), SchemaId(4)]
+    assert database.references_by_schema_id[SchemaId(2)] == {(Subject("a"), Version(1)), (Subject("b"), Version(1))}
+
+    database.remove_referenced_by(SchemaId(2), references[:1])
+    assert list(database.get_referenced_by(Subject("a"), Version(1))) == [SchemaId(3), SchemaId(4)]
+    assert list(database.get_referenced_by(Subject("b"), Version(1))) == [SchemaId(3), SchemaId(2), SchemaId(4)]
+
+    database.remove_referenced_by(SchemaId(2), references)
+    database.remove_referenced_by(SchemaId(5), references)
+    assert list(database.get_referenced_by(Subject("b"), Version(1))) == [SchemaId(3), SchemaId(4)]
+    assert SchemaId(2) not in database.references_by_schema_id
@@ -0,0 +1,131 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from jsonschema import Draft7Validator, ValidationError
+from karapace.jsonschema_validation import compile_validator
+from typing import Any
+
+import pytest
+
+INSTANCES: list[Any] = [
+    None,
+    True,
+    False,
+    0,
+    1,
+    1.0,
+    1.5,
+    -3,
+    10**20,
+    "",
+    "a",
+    "abc",
+    "a1",
+    [],
+    [1],
+    [1, "a"],
+    [1, 2, 3, 4],
+    [True, 1],
+    {},
+    {"a": 1},
+    {"a": "x", "b": 2},
+    {"a": 1, "extra": True},
+    {"x-a": 1, "x-b": "2"},
+    {"name": "n", "next": {"name": "m", "next": None}},
+    {"name": "n", "next": {"name": 1}},
+]
+
+SCHEMAS: list[Any] = [
+    True,
+    False,
+    {},
+    {"type": "integer"},
+    {"type": "number"},
+    {"type": ["string", "null"]},
+    {"enum": ["a", "abc"]},
+    {"enum": [1, None, [1, "a"], {"a": 1}]},
+    {"enum": [True]},
+    {"const": 1},
+    {"const": {"a": 1}},
+    {"type": "string", "minLength": 1, "maxLength": 2, "pattern": "^a"},
+    {"minimum": 0, "maximum": 1.5},
+    {"exclusiveMinimum": 0, "exclusiveMaximum": 10},
+    {"type": "array", "items": {"type": "integer"}, "minItems": 1, "maxItems": 3},
+    {"items": [{"type": "integer"}, {"type": "string"}], "additionalItems": False},
+    {"items": [{"type": "integer"}], "additionalItems": {"type": "integer"}},
+    {"contains": {"type": "string"}},
+    {"properties": {"a": {"type": "integer"}}, "required": ["a"], "additionalProperties": False},
+    {"properties": {"a": {"type": "string"}}, "additionalProperties": {"type": "integer"}},
+    {"patternProperties": {"^x-": {"type": "integer"}}, "additionalProperties": False},
+    {"minProperties": 1, "maxProperties": 1, "propertyNames": {"maxLength": 1}},
+    {"dependencies": {"a": ["b"], "b": {"required": ["a"]}}},
+    {"anyOf": [{"type": "string"}, {"type": "integer"}]},
+    {"oneOf": [{"type": "integer"}, {"type": "number"}]},
+    {"allOf": [{"type": "number"}, {"minimum": 1}]},
+    {"not": {"type": "object"}},
+    {"if": {"type": "integer"}, "then": {"minimum": 1}, "else": {"type": "string"}},
+    {"type": "integer", "format": "date-time", "title": "annotations are ignored", "unknownKeyword": 1},
+    {
+        "definitions": {
+            "node": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "next": {"anyOf": [{"$ref": "#/definitions/node"}, {"type": "null"}]},
+                },
+            }
+        },
+        "$ref": "#/definitions/node",
+    },
+]
+
+
+@pytest.mark.parametrize("schema", SCHEMAS)
+def test_compiled_validator_agrees_with_draft7(schema: Any) -> None:
+    draft7 = Draft7Validator(schema)
+    compiled = compile_validator(draft7)
+
+    assert compiled.is_valid is not None
+    for instance in INSTANCES:
+        assert compiled.is_valid(instance) == draft7.is_valid(instance), instance
+
+
+def test_invalid_values_raise_the_draft7_error() -> None:
+    draft7 = Draft7Validator({"properties": {"a": {"type": "integer"}}})
+    compiled = compile_validator(draft7)
+
+    with pytest.raises(ValidationError) as compiled_error:
+        compiled.validate({"a": "x"})
+    with pytest.raises(ValidationError) as draft7_error:
+        draft7.validate({"a": "x"})
+    assert str(compiled_error.value) == str(draft7_error.value)
+
+
+def test_unsupported_keywords_fall_back_to_draft7() -> None:
+    compiled = compile_validator(Draft7Validator({"type": "array", "items": {"uniqueItems": True}}))
+
+    assert compiled.is_valid is None
+    compiled.validate([[1, 2]])
+    with pytest.raises(ValidationError):
+        compiled.validate([[1, 1]])
+
+
+def test_references_to_an_id_fall_back_to_draft7() -> None:
+    schema = {"definitions": {"a": {"$id": "#foo", "type": "string"}}, "properties": {"x": {"$ref": "#foo"}}}
+    compiled = compile_validator(Draft7Validator(schema))
+
+    assert compiled.is_valid is None
+    compiled.validate({"x": "a"})
+    with pytest.raises(ValidationError):
+        compiled.validate({"x": 1})
+
+
+def test_validate_many_raises_for_the_first_invalid_value() -> None:
+    compiled = compile_validator(Draft7Validator({"type": "integer"}))
+
+    compiled.validate_many([1, 2, 3])
+    with pytest.raises(ValidationError, match="'b' is not of type 'integer'"):
+        compiled.validate_many([1, "b", "c"])
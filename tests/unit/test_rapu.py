@@ -5,9 +5,10 @@ See LICENSE for details
 from _pytest.logging import LogCaptureFixture
 from aiohttp.client_exceptions import ClientConnectionError
 from aiohttp.web import Request
+from http import HTTPStatus
 from karapace.config import DEFAULTS
 from karapace.karapace import KarapaceBase
-from karapace.rapu import HTTPRequest, REST_ACCEPT_RE, REST_CONTENT_TYPE_RE
+from karapace.rapu import HTTPRequest, HTTPResponse, REST_ACCEPT_RE, REST_CONTENT_TYPE_RE
 from karapace.statsd import StatsClient
 from unittest.mock import Mock
 
@@ -198,3 +199,31 @@ async def test_close_by_app(caplog: LogCaptureFixture) -> None:
         assert log.name == "karapace"
         assert log.levelname == "WARNING"
         assert log.message == "=======> Received shutdown signal, closing Application <======="
+
+
+async def test_passed_through_etag_is_not_duplicated() -> None:
+    request_mock = Mock(spec=Request)
+    request_mock.method = "GET"
+    request_mock.headers = {}
+    request_mock.query = {}
+    request_mock.match_info = {}
+    request_mock.read.return_value = b""
+
+    async def callback() -> None:
+        raise HTTPResponse(
+            body=b'{"id":1}',
+            status=HTTPStatus.OK,
+            content_type="application/json",
+            headers={"Etag": '"primary-etag"', "Access-Control-Expose-Headers": "etag"},
+        )
+
+    app = KarapaceBase(config=DEFAULTS)
+    response = await app._handle_request(  # pylint: disable=protected-access
+        request=request_mock,
+        path_for_stats="/",
+        callback=callback,
+    )
+
+    assert response.status == 200
+    assert response.headers.getall("etag") == ['"primary-etag"']
+    assert response.headers.getall("access-control-expose-headers") == ["etag"]
@@ -0,0 +1,117 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from collections.abc import Sequence
+from karapace.config import Config, InvalidConfiguration, set_config_defaults
+from karapace.registry_workers import run_workers, worker_config, worker_sockets
+from pathlib import Path
+
+import os
+import pytest
+import socket
+import time
+
+
+def _config(**values: object) -> Config:
+    return set_config_defaults(
+        {
+            "karapace_registry": True,
+            "host": "127.0.0.1",
+            "port": 0,
+            "registry_workers": 3,
+            "registry_primary_worker_port": 0,
+            **values,  # type: ignore[typeddict-item]
+        }
+    )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_only_primary_worker_is_master_eligible() -> None:
+    config = _config(port=8081, registry_primary_worker_port=8082)
+
+    primary = worker_config(config, 0)
+    assert primary["master_eligibility"] is True
+    assert primary["advertised_port"] == 8082
+    assert primary["client_id"] == "sr-1-0"
+
+    for index in (1, 2):
+        worker = worker_config(config, index)
+        assert worker["master_eligibility"] is False
+        assert worker["advertised_port"] == 8081
+        assert worker["client_id"] == f"sr-1-{index}"
+
+
+def test_primary_worker_keeps_configured_advertised_port() -> None:
+    config = _config(port=8081, registry_primary_worker_port=8082, advertised_port=443)
+
+    assert worker_config(config, 0)["advertised_port"] == 443
+    assert worker_config(config, 1)["advertised_port"] == 443
+
+
+def test_workers_share_listening_port() -> None:
+    port = _free_port()
+    config = _config(port=port, registry_primary_worker_port=_free_port())
+
+    primary_sockets = worker_sockets(config, 0)
+    other_sockets = worker_sockets(config, 1)
+    try:
+        assert [sock.getsockname()[1] for sock in primary_sockets] == [port, config["registry_primary_worker_port"]]
+        assert [sock.getsockname()[1] for sock in other_sockets] == [port]
+    finally:
+        for sock in primary_sockets + other_sockets:
+            sock.close()
+
+
+def _exit_with_worker_index(config: Config, sockets: Sequence[socket.socket]) -> int:
+    for sock in sockets:
+        sock.close()
+    # Worker 1 fails, the others would run until stopped.
+    if config["client_id"].endswith("-1"):
+        return 3
+    time.sleep(30)
+    return 0
+
+
+def test_run_workers_stops_all_workers_when_one_exits() -> None:
+    config = _config(port=_free_port(), registry_primary_worker_port=_free_port())
+    assert run_workers(config, _exit_with_worker_index) == 3
+
+
+def _exit_with_shared_database_state(config: Config, sockets: Sequence[socket.socket]) -> int:
+    for sock in sockets:
+        sock.close()
+    path = config["registry_shared_database_path"]
+    return 0 if path is not None and os.path.getsize(path) > 0 else 5
+
+
+def test_run_workers_creates_and_removes_shared_database(tmp_path: Path) -> None:
+    path = tmp_path / "schemas"
+    config = _config(
+        port=_free_port(),
+        registry_primary_worker_port=_free_port(),
+        registry_shared_database=True,
+        registry_shared_database_path=str(path),
+    )
+    assert run_workers(config, _exit_with_shared_database_state) == 0
+    assert not path.exists()
+
+
+@pytest.mark.parametrize(
+    "values",
+    (
+        {"registry_workers": 0},
+        {"registry_primary_worker_port": None},
+        {"registry_primary_worker_port": 8081, "port": 8081},
+        {"karapace_rest": True},
+        {"registry_workers": 1, "registry_shared_database": True},
+    ),
+)
+def test_invalid_registry_workers_configuration(values: dict[str, object]) -> None:
+    with pytest.raises(InvalidConfiguration):
+        _config(**values)
@@ -0,0 +1,120 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from karapace.config import DEFAULTS
+from karapace.in_memory_database import InMemoryDatabase
+from karapace.key_format import KeyFormatter
+from karapace.offset_watcher import OffsetWatcher
+from karapace.schema_changes import schema_change_from_record, SchemaChange, SchemaChangeFeed
+from karapace.schema_reader import KafkaSchemaReader
+from karapace.typing import SchemaId, Subject, Version
+from unittest.mock import Mock
+
+import asyncio
+import confluent_kafka
+import json
+import threading
+import time
+
+
+def _config_change(offset: int) -> SchemaChange:
+    return SchemaChange(offset=offset, keytype="CONFIG", subject=None, version=None, schema_id=None, deleted=False)
+
+
+def test_schema_change_from_schema_record() -> None:
+    change = schema_change_from_record(
+        5,
+        {"keytype": "SCHEMA", "subject": "foo", "version": 2, "magic": 1},
+        {"subject": "foo", "version": 2, "id": 7, "schema": '"int"', "deleted": False},
+    )
+    assert change == SchemaChange(
+        offset=5,
+        keytype="SCHEMA",
+        subject=Subject("foo"),
+        version=Version(2),
+        schema_id=SchemaId(7),
+        deleted=False,
+    )
+    assert change.to_dict() == {"offset": 5, "keytype": "SCHEMA", "subject": "foo", "version": 2, "id": 7, "deleted": False}
+
+
+def test_schema_change_from_hard_delete_record() -> None:
+    change = schema_change_from_record(5, {"keytype": "SCHEMA", "subject": "foo", "version": 2, "magic": 1}, None)
+    assert change is not None
+    assert change.schema_id is None
+    assert change.deleted is True
+
+
+def test_schema_change_from_noop_record() -> None:
+    assert schema_change_from_record(5, {"keytype": "NOOP", "magic": 0}, None) is None
+
+
+def test_changes_since() -> None:
+    feed = SchemaChangeFeed(max_changes=10)
+    assert feed.changes_since(-1) == ([], False)
+
+    for offset in (3, 4, 8):
+        feed.append(_config_change(offset))
+
+    assert feed.latest_offset() == 8
+    assert feed.changes_since(-1) == ([_config_change(3), _config_change(4), _config_change(8)], False)
+    assert feed.changes_since(4) == ([_config_change(8)], False)
+    assert feed.changes_since(8) == ([], False)
+
+
+def test_changes_since_reports_evicted_changes() -> None:
+    feed = SchemaChangeFeed(max_changes=2)
+    for offset in range(4):
+        feed.append(_config_change(offset))
+
+    assert feed.changes_since(0) == ([_config_change(2), _config_change(3)], True)
+    assert feed.changes_since(1) == ([_config_change(2), _config_change(3)], False)
+
+
+async def test_wait_for_changes_is_woken_by_append_from_another_thread() -> None:
+    feed = SchemaChangeFeed(max_changes=10)
+    feed.append(_config_change(1))
+
+    # Returns at once when there are newer changes, or waits for the timeout.
+    await asyncio.wait_for(feed.wait_for_changes(0, timeout=10), timeout=1)
+    started_at = time.monotonic()
+    await feed.wait_for_changes(1, timeout=0.1)
+    assert time.monotonic() - started_at >= 0.1
+
+    timer = threading.Timer(0.05, feed.append, args=(_config_change(2),))
+    timer.start()
+    await asyncio.wait_for(feed.wait_for_changes(1, timeout=10), timeout=5)
+    timer.join()
+    assert feed.latest_offset() == 2
+
+
+def test_schema_reader_records_applied_changes() -> None:
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+
+    schema_record = Mock(spec=confluent_kafka.Message)
+    schema_record.error.return_value = None
+    schema_record.offset.return_value = 10
+    schema_record.key.return_value = json.dumps({"keytype": "SCHEMA", "subject": "foo", "version": 1, "magic": 1})
+    schema_record.value.return_value = json.dumps(
+        {"subject": "foo", "version": 1, "id": 1, "schema": '"int"', "deleted": False}
+    )
+    noop_record = Mock(spec=confluent_kafka.Message)
+    noop_record.error.return_value = None
+    noop_record.offset.return_value = 11
+    noop_record.key.return_value = json.dumps({"keytype": "NOOP", "magic": 0})
+    noop_record.value.return_value = None
+
+    schema_reader.consume_messages([schema_record, noop_record], watch_offsets=False)
+
+    changes, truncated = schema_reader.changes.changes_since(-1)
+    assert not truncated
+    assert [change.to_dict() for change in changes] == [
+        {"offset": 10, "keytype": "SCHEMA", "subject": "foo", "version": 1, "id": 1, "deleted": False}
+    ]
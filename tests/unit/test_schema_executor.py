@@ -0,0 +1,213 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from avro.errors import SchemaParseException
+from contextlib import closing
+from karapace.compatibility import CompatibilityModes
+from karapace.compatibility.jsonschema.checks import is_compatible, is_incompatible
+from karapace.config import InvalidConfiguration, set_config_defaults, validate_config
+from karapace.errors import InvalidSchema
+from karapace.protobuf import protopace
+from karapace.schema_executor import _parse_dependencies, check_compatibility, schema_source, SchemaExecutor, SchemaSource
+from karapace.schema_models import ParsedTypedSchema, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.schema_references import Reference
+from karapace.typing import SchemaExecutorType, Subject, Version
+
+import json
+import pytest
+
+OLD_SCHEMA = json.dumps({"type": "record", "name": "Foo", "fields": [{"name": "a", "type": "int"}]})
+COMPATIBLE_SCHEMA = json.dumps(
+    {"type": "record", "name": "Foo", "fields": [{"name": "a", "type": "int"}, {"name": "b", "type": "int", "default": 0}]}
+)
+INCOMPATIBLE_SCHEMA = json.dumps({"type": "record", "name": "Foo", "fields": [{"name": "a", "type": "string"}]})
+
+PROTO_DEPENDENCY = """\
+syntax = "proto3";
+package foo;
+message Bar {
+  string value = 1;
+}
+"""
+PROTO_SCHEMA = """\
+syntax = "proto3";
+package foo;
+import "bar.proto";
+message Foo {
+  Bar bar = 1;
+  string a = 2;
+}
+"""
+PROTO_INCOMPATIBLE_SCHEMA = PROTO_SCHEMA.replace("string a", "int32 a")
+
+
+def _executor(executor_type: SchemaExecutorType) -> SchemaExecutor:
+    return SchemaExecutor(config=set_config_defaults({"schema_executor": str(executor_type), "schema_executor_workers": 2}))
+
+
+@pytest.mark.parametrize("executor_type", list(SchemaExecutorType))
+async def test_check_compatibility(executor_type: SchemaExecutorType) -> None:
+    old_schema = SchemaSource(schema_type=SchemaType.AVRO, schema_str=OLD_SCHEMA)
+    with closing(_executor(executor_type)) as executor:
+        compatible_schema = await executor.parse(
+            ValidatedTypedSchema, schema_type=SchemaType.AVRO, schema_str=COMPATIBLE_SCHEMA
+        )
+        result = await executor.check_compatibility(
+            old_schemas=[old_schema],
+            new_schema=compatible_schema,
+            compatibility_mode=CompatibilityModes.BACKWARD,
+        )
+        assert is_compatible(result)
+
+        incompatible_schema = await executor.parse(
+            ValidatedTypedSchema, schema_type=SchemaType.AVRO, schema_str=INCOMPATIBLE_SCHEMA
+        )
+        result = await executor.check_compatibility(
+            old_schemas=[old_schema, schema_source(compatible_schema)],
+            new_schema=incompatible_schema,
+            compatibility_mode=CompatibilityModes.BACKWARD_TRANSITIVE,
+        )
+        assert is_incompatible(result)
+
+
+@pytest.mark.parametrize("executor_type", list(SchemaExecutorType))
+async def test_errors_keep_their_cause(executor_type: SchemaExecutorType) -> None:
+    invalid_schema = SchemaSource(schema_type=SchemaType.AVRO, schema_str='{"type": "unknown"}')
+    new_schema = ValidatedTypedSchema.parse(schema_type=SchemaType.AVRO, schema_str=OLD_SCHEMA)
+    with closing(_executor(executor_type)) as executor:
+        with pytest.raises(InvalidSchema) as exc_info:
+            await executor.check_compatibility(
+                old_schemas=[invalid_schema],
+                new_schema=new_schema,
+                compatibility_mode=CompatibilityModes.BACKWARD,
+            )
+        assert isinstance(exc_info.value.__cause__, SchemaParseException)
+
+        with pytest.raises(InvalidSchema) as exc_info:
+            await executor.parse(ValidatedTypedSchema, schema_type=SchemaType.AVRO, schema_str=invalid_schema.schema_str)
+        assert isinstance(exc_info.value.__cause__, SchemaParseException)
+
+
+def _proto_source(schema_str: str) -> SchemaSource:
+    dependency = SchemaSource(schema_type=SchemaType.PROTOBUF, schema_str=PROTO_DEPENDENCY)
+    reference = Reference(name="bar.proto", subject=Subject("bar"), version=Version(1))
+    return SchemaSource(
+        schema_type=SchemaType.PROTOBUF,
+        schema_str=schema_str,
+        references=(reference,),
+        dependencies=((reference, dependency),),
+    )
+
+
+def _parsed(source: SchemaSource) -> ValidatedTypedSchema:
+    return ValidatedTypedSchema.parse(
+        schema_type=source.schema_type,
+        schema_str=source.schema_str,
+        references=source.references,
+        dependencies=_parse_dependencies(source),
+    )
+
+
+@pytest.mark.parametrize("executor_type", list(SchemaExecutorType))
+async def test_check_protobuf_compatibility_with_protopace(executor_type: SchemaExecutorType) -> None:
+    config = set_config_defaults(
+        {"schema_executor": str(executor_type), "schema_executor_workers": 2, "use_protobuf_formatter": True}
+    )
+    new_schema = _parsed(_proto_source(PROTO_SCHEMA))
+    old_schema = schema_source(new_schema)
+    incompatible_schema = schema_source(_parsed(_proto_source(PROTO_INCOMPATIBLE_SCHEMA)))
+    with closing(SchemaExecutor(config=config)) as executor:
+        result = await executor.check_compatibility(
+            old_schemas=[old_schema, old_schema],
+            new_schema=new_schema,
+            compatibility_mode=CompatibilityModes.BACKWARD_TRANSITIVE,
+        )
+        assert is_compatible(result)
+
+        result = await executor.check_compatibility(
+            old_schemas=[old_schema, incompatible_schema],
+            new_schema=new_schema,
+            compatibility_mode=CompatibilityModes.BACKWARD_TRANSITIVE,
+        )
+        assert is_incompatible(result)
+
+
+@pytest.mark.parametrize("executor_type", list(SchemaExecutorType))
+async def test_stored_protobuf_schemas_are_not_parsed_for_protopace(
+    executor_type: SchemaExecutorType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    config = set_config_defaults(
+        {"schema_executor": str(executor_type), "schema_executor_workers": 2, "use_protobuf_formatter": True}
+    )
+    new_schema = _parsed(_proto_source(PROTO_SCHEMA))
+
+    def parse(*args, **kwargs) -> ParsedTypedSchema:
+        raise AssertionError("stored schemas are checked by protopace")
+
+    monkeypatch.setattr(ParsedTypedSchema, "parse", parse)
+    with closing(SchemaExecutor(config=config)) as executor:
+        old_schema = await executor.stored_schema(
+            TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=PROTO_SCHEMA),
+            references=new_schema.references,
+            dependencies=new_schema.dependencies,
+        )
+        assert isinstance(old_schema, SchemaSource)
+
+        result = await executor.check_compatibility(
+            old_schemas=[old_schema],
+            new_schema=new_schema,
+            compatibility_mode=CompatibilityModes.BACKWARD,
+        )
+        assert is_compatible(result)
+
+
+def test_sources_referencing_the_same_version_parse_it_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    parsed = []
+    parse = ValidatedTypedSchema.parse
+
+    def counting_parse(*args, **kwargs) -> ValidatedTypedSchema:
+        parsed.append(kwargs["schema_str"])
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(ValidatedTypedSchema, "parse", counting_parse)
+    result = check_compatibility(
+        old_schemas=[_proto_source(PROTO_SCHEMA)] * 3,
+        new_schema=_proto_source(PROTO_SCHEMA),
+        compatibility_mode=CompatibilityModes.BACKWARD_TRANSITIVE,
+    )
+
+    assert is_compatible(result)
+    assert parsed.count(PROTO_DEPENDENCY) == 1
+
+
+async def test_protopace_checks_all_versions_in_one_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def check_compatibility_many(proto, prev_protos, mode):
+        calls.append((proto, prev_protos, mode))
+        return [None, "Field changed type", "Field deleted"]
+
+    monkeypatch.setattr(protopace, "check_compatibility_many", check_compatibility_many)
+    config = set_config_defaults({"schema_executor": "inline", "use_protobuf_formatter": True})
+    new_schema = _parsed(_proto_source(PROTO_SCHEMA))
+    with closing(SchemaExecutor(config=config)) as executor:
+        result = await executor.check_compatibility(
+            old_schemas=[_proto_source(PROTO_SCHEMA)] * 3,
+            new_schema=new_schema,
+            compatibility_mode=CompatibilityModes.FULL_TRANSITIVE,
+        )
+
+    assert is_incompatible(result)
+    assert result.messages == {"Field changed type"}
+    [(proto, prev_protos, mode)] = calls
+    assert mode is protopace.CheckMode.FULL
+    assert len(prev_protos) == 3
+    assert proto.schema == new_schema.schema_str
+    assert [dep.name for dep in proto.all_dependencies] == ["bar.proto"]
+
+
+def test_invalid_schema_executor() -> None:
+    with pytest.raises(InvalidConfiguration):
+        validate_config(set_config_defaults({"schema_executor": "fibers"}))
@@ -14,7 +14,8 @@ from karapace.errors import CorruptKafkaRecordException, ShutdownException
 from karapace.in_memory_database import InMemoryDatabase
 from karapace.kafka.consumer import KafkaConsumer
 from karapace.key_format import KeyFormatter
-from karapace.offset_watcher import OffsetWatcher
+from karapace.offset_watcher import AsyncOffsetWatcher, OffsetWatcher
+from karapace.schema_models import ValidatedTypedSchema
 from karapace.schema_reader import (
     KafkaSchemaReader,
     MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP,
@@ -31,11 +32,14 @@ from tests.utils import schema_protobuf_invalid_because_corrupted, schema_protob
 from typing import Callable, Optional
 from unittest.mock import Mock
 
+import asyncio
 import confluent_kafka
 import json
+import karapace.schema_reader
 import logging
 import pytest
 import random
+import threading
 import time
 
 
@@ -88,6 +92,25 @@ def test_offset_watcher() -> None:
     assert consumed_cnt == 100, "Did not consume expected amount of records"
 
 
+async def test_async_offset_watcher() -> None:
+    watcher = AsyncOffsetWatcher()
+
+    def produce() -> None:
+        for offset in range(10):
+            time.sleep(0.01)
+            watcher.offset_seen(new_offset=offset)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    waited = await asyncio.gather(*(watcher.wait_for_offset(expected_offset=offset, timeout=5) for offset in range(10)))
+    producer.join()
+
+    assert waited == [True] * 10
+    assert await watcher.wait_for_offset(expected_offset=9, timeout=0)
+    assert not await watcher.wait_for_offset(expected_offset=10, timeout=0.01)
+    assert not watcher._waiters  # pylint: disable=protected-access
+
+
 @dataclass
 class ReadinessTestCase(BaseTestCase):
     cur_offset: int
@@ -263,6 +286,7 @@ def test_soft_deleted_schema_storing() -> None:
     consumer_mock = Mock(spec=KafkaConsumer)
     soft_deleted_schema_record = Mock(spec=confluent_kafka.Message)
     soft_deleted_schema_record.error.return_value = None
+    soft_deleted_schema_record.offset.return_value = 0
     soft_deleted_schema_record.key.return_value = json.dumps(
         {
             "keytype": "SCHEMA",
@@ -662,3 +686,214 @@ def test_message_error_handling_with_invalid_reference_schema_protobuf(
 
         assert warn_records[1].name == "karapace.schema_reader"
         assert warn_records[1].message == "Invalid Protobuf references"
+
+
+async def test_wait_for_offset() -> None:
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=Mock(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    schema_reader.offset = 10
+
+    assert await schema_reader.wait_for_offset(10, timeout=0)
+    assert not await schema_reader.wait_for_offset(11, timeout=0.1)
+
+
+async def test_wait_for_offset_is_woken_by_applied_batch(
+    message_factory: Callable[[bytes, bytes, int], Message],
+) -> None:
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    message = message_factory(key=b'{"keytype":"NOOP","magic":0}', value=b"", offset=5)
+
+    # The schema reader thread applies the record while the request waits.
+    timer = threading.Timer(0.05, schema_reader.consume_messages, args=([message], False))
+    timer.start()
+    started_at = time.monotonic()
+    assert await schema_reader.wait_for_offset(5, timeout=10)
+    timer.join()
+    assert time.monotonic() - started_at < 5
+
+
+def test_consume_messages_applies_batch_and_publishes_offset_once(
+    message_factory: Callable[[bytes, bytes, int], Message],
+) -> None:
+    offset_watcher = Mock(spec=OffsetWatcher)
+    database = InMemoryDatabase()
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=offset_watcher,
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=database,
+    )
+    schema_reader._ready = True  # pylint: disable=protected-access
+
+    messages = [
+        message_factory(
+            key=json.dumps({"keytype": "SCHEMA", "subject": "test", "version": version, "magic": 1}).encode(),
+            value=json.dumps(
+                {"subject": "test", "version": version, "id": version, "deleted": False, "schema": '"int"'}
+            ).encode(),
+            offset=version,
+        )
+        for version in (1, 2)
+    ]
+    # Invalid records in the batch are skipped without holding back the records after them.
+    messages.insert(1, message_factory(key=b"invalid-key", value=b"", offset=3))
+    messages[2].offset.return_value = 4
+
+    schema_reader.consume_messages(messages, watch_offsets=True)
+
+    assert schema_reader.offset == 4
+    assert set(database.find_subject_schemas(subject="test", include_deleted=False)) == {Version(1), Version(2)}
+    offset_watcher.offset_seen.assert_called_once_with(4)
+
+
+def test_consume_messages_does_not_publish_offsets_when_not_watching(
+    message_factory: Callable[[bytes, bytes, int], Message],
+) -> None:
+    offset_watcher = Mock(spec=OffsetWatcher)
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=offset_watcher,
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    schema_reader._ready = True  # pylint: disable=protected-access
+
+    schema_reader.consume_messages(
+        [message_factory(key=b'{"keytype":"NOOP","magic":0}', value=b"", offset=1)],
+        watch_offsets=False,
+    )
+
+    assert schema_reader.offset == 1
+    offset_watcher.offset_seen.assert_not_called()
+
+
+def test_resolved_references_are_parsed_once_until_changed(
+    message_factory: Callable[[bytes, bytes, int], Message],
+    monkeypatch: MonkeyPatch,
+) -> None:
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+    )
+    common_reference = {"name": "common.proto", "subject": "common", "version": 1}
+    common_message = 'syntax = "proto3";\npackage common;\nmessage Common {\n  string %s = 1;\n}\n'
+    offsets = iter(range(100))
+
+    def record(subject: str, schema_id: int, value: Optional[dict]) -> Message:
+        key = {"keytype": "SCHEMA", "subject": subject, "version": 1, "magic": 1}
+        if value is not None:
+            value = {"subject": subject, "version": 1, "id": schema_id, "deleted": False, "schemaType": "PROTOBUF", **value}
+        return message_factory(
+            key=json.dumps(key).encode(), value=json.dumps(value).encode() if value else b"", offset=next(offsets)
+        )
+
+    def registered(name: str, schema_id: int) -> Message:
+        schema = (
+            f'syntax = "proto3";\npackage {name};\nimport "common.proto";\n'
+            f"message {name.upper()} {{\n  common.Common c = 1;\n}}\n"
+        )
+        return record(name, schema_id, {"schema": schema, "references": [common_reference]})
+
+    schema_reader.consume_messages(
+        [
+            record("common", 1, {"schema": common_message % "value"}),
+            registered("a", 2),
+            registered("b", 3),
+        ],
+        watch_offsets=False,
+    )
+
+    parsed = []
+    parse = ValidatedTypedSchema.parse
+
+    def counting_parse(*args, **kwargs) -> ValidatedTypedSchema:
+        parsed.append(kwargs["schema_str"])
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(ValidatedTypedSchema, "parse", counting_parse)
+    references = [
+        {"name": "a.proto", "subject": "a", "version": 1},
+        {"name": "b.proto", "subject": "b", "version": 1},
+    ]
+    _, dependencies = schema_reader.resolve_references(references)
+    assert dependencies["a.proto"].get_schema().dependencies["common.proto"].get_schema().schema_str.count("value") == 1
+    # Only resolved when registering "a" and "b" before the versions were cached.
+    schema_reader.resolve_references(references)
+    assert len(parsed) == 2
+
+    # Replacing the referenced version drops the versions referencing it.
+    schema_reader.consume_messages(
+        [record("common", 1, None), record("common", 4, {"schema": common_message % "renamed"})],
+        watch_offsets=False,
+    )
+    _, dependencies = schema_reader.resolve_references(references)
+    assert len(parsed) == 5
+    assert "renamed" in dependencies["b.proto"].get_schema().dependencies["common.proto"].get_schema().schema_str
+
+
+def test_consume_messages_parses_schemas_without_holding_the_database_lock(
+    message_factory: Callable[[bytes, bytes, int], Message],
+    monkeypatch: MonkeyPatch,
+) -> None:
+    database = InMemoryDatabase()
+    schema_reader = KafkaSchemaReader(
+        config=DEFAULTS,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=database,
+    )
+    lock_available = []
+    parse_protobuf_schema_definition = karapace.schema_reader.parse_protobuf_schema_definition
+
+    def acquire_and_release() -> bool:
+        acquired = database.schema_lock_thread.acquire(timeout=0)
+        if acquired:
+            database.schema_lock_thread.release()
+        return acquired
+
+    def checking_parse(*args, **kwargs):
+        # Readers on other threads can take the lock while the schema is parsed.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lock_available.append(executor.submit(acquire_and_release).result())
+        return parse_protobuf_schema_definition(*args, **kwargs)
+
+    monkeypatch.setattr(karapace.schema_reader, "parse_protobuf_schema_definition", checking_parse)
+    messages = [
+        message_factory(
+            key=json.dumps({"keytype": "SCHEMA", "subject": f"test{offset}", "version": 1, "magic": 1}).encode(),
+            value=json.dumps(
+                {
+                    "subject": f"test{offset}",
+                    "version": 1,
+                    "id": offset,
+                    "deleted": False,
+                    "schemaType": "PROTOBUF",
+                    "schema": f'syntax = "proto3";\nmessage Test{offset} {{\n  string value = 1;\n}}\n',
+                }
+            ).encode(),
+            offset=offset,
+        )
+        for offset in (1, 2)
+    ]
+
+    schema_reader.consume_messages(messages, watch_offsets=False)
+
+    assert lock_available == [True, True]
+    assert database.find_subject(subject="test2") is not None
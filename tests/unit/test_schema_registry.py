@@ -0,0 +1,80 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from contextlib import closing
+from karapace.compatibility.jsonschema.checks import is_compatible
+from karapace.config import set_config_defaults
+from karapace.schema_models import ParsedTypedSchema, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.schema_references import Reference
+from karapace.schema_registry import KarapaceSchemaRegistry
+from karapace.typing import SchemaExecutorType, SchemaId, Subject, Version
+
+import pytest
+
+COMMON_SCHEMA = """\
+syntax = "proto3";
+package common;
+message Common {
+  string value = 1;
+}
+"""
+
+
+def _schema(fields: int) -> str:
+    extra_fields = "".join(f"  int32 f{field} = {field + 2};\n" for field in range(fields))
+    return f'syntax = "proto3";\npackage foo;\nimport "common.proto";\nmessage Foo {{\n  common.Common c = 1;\n{extra_fields}}}\n'
+
+
+@pytest.mark.parametrize("executor_type", [SchemaExecutorType.inline, SchemaExecutorType.thread])
+async def test_check_schema_compatibility_parses_shared_references_once(
+    executor_type: SchemaExecutorType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    registry = KarapaceSchemaRegistry(
+        config=set_config_defaults({"compatibility": "BACKWARD_TRANSITIVE", "schema_executor": str(executor_type)})
+    )
+    registry.database.insert_schema_version(
+        subject=Subject("common"),
+        schema_id=SchemaId(1),
+        version=Version(1),
+        deleted=False,
+        schema=TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=COMMON_SCHEMA),
+        references=None,
+    )
+    references = [Reference(name="common.proto", subject=Subject("common"), version=Version(1))]
+    for version in range(1, 4):
+        registry.database.insert_schema_version(
+            subject=Subject("foo"),
+            schema_id=SchemaId(version + 1),
+            version=Version(version),
+            deleted=False,
+            schema=TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=_schema(version), references=references),
+            references=references,
+        )
+    _, dependencies = registry.resolve_references(references)
+    new_schema = ValidatedTypedSchema.parse(
+        schema_type=SchemaType.PROTOBUF, schema_str=_schema(4), references=references, dependencies=dependencies
+    )
+
+    parsed = []
+    validated_parse = ValidatedTypedSchema.parse
+    parsed_parse = ParsedTypedSchema.parse
+
+    def counting_validated_parse(*args, **kwargs) -> ValidatedTypedSchema:
+        parsed.append(kwargs["schema_str"])
+        return validated_parse(*args, **kwargs)
+
+    def counting_parsed_parse(*args, **kwargs) -> ParsedTypedSchema:
+        parsed.append(kwargs["schema_str"])
+        return parsed_parse(*args, **kwargs)
+
+    monkeypatch.setattr(ValidatedTypedSchema, "parse", counting_validated_parse)
+    monkeypatch.setattr(ParsedTypedSchema, "parse", counting_parsed_parse)
+    with closing(registry.schema_executor):
+        result = await registry.check_schema_compatibility(new_schema, Subject("foo"))
+
+    assert is_compatible(result)
+    # The referenced version was resolved for the new schema already, each old version is parsed once.
+    old_versions = registry.database.find_subject_schemas(subject=Subject("foo"), include_deleted=False).values()
+    assert sorted(parsed) == sorted(schema_version.schema.schema_str for schema_version in old_versions)
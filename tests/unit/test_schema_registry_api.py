@@ -3,15 +3,22 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 from aiohttp.test_utils import TestClient, TestServer
+from http import HTTPStatus
+from karapace import schema_registry_apis
 from karapace.config import DEFAULTS, set_config_defaults
-from karapace.rapu import HTTPResponse
+from karapace.rapu import HTTPRequest, HTTPResponse
+from karapace.schema_changes import SchemaChange
 from karapace.schema_reader import KafkaSchemaReader
 from karapace.schema_registry import KarapaceSchemaRegistry
 from karapace.schema_registry_apis import KarapaceSchemaRegistryController
+from karapace.typing import SchemaId, Subject, Version
 from unittest.mock import ANY, AsyncMock, Mock, patch, PropertyMock
 
+import aiohttp.web
 import asyncio
 import pytest
+import threading
+import time
 
 
 async def test_validate_schema_request_body() -> None:
@@ -61,5 +68,153 @@ async def test_forward_when_not_ready() -> None:
             ready_property_mock.assert_called_once()
             schema_registry.get_master.assert_called_once()
             mock_forward_func.assert_called_once_with(
-                request=ANY, body=None, url="http://primary-url/schemas/ids/1", content_type="application/json", method="GET"
+                request=ANY, body=b"", url="http://primary-url/schemas/ids/1", content_type="application/json", method="GET"
             )
+
+
+async def test_forward_when_behind_offset_token() -> None:
+    with patch("karapace.schema_registry_apis.KarapaceSchemaRegistry") as schema_registry_class:
+        schema_reader_mock = Mock(spec=KafkaSchemaReader)
+        schema_reader_mock.ready.return_value = True
+        schema_reader_mock.wait_for_offset = AsyncMock(return_value=False)
+        schema_registry = AsyncMock(spec=KarapaceSchemaRegistry)
+        schema_registry.schema_reader = schema_reader_mock
+        schema_registry.mc = Mock()
+        schema_registry.mc.get_master_info.return_value = (False, "http://primary-url")
+        schema_registry_class.return_value = schema_registry
+
+        schema_registry.get_master.return_value = (False, "http://primary-url")
+
+        close_future_result = asyncio.Future()
+        close_future_result.set_result(True)
+        close_func = Mock()
+        close_func.return_value = close_future_result
+        schema_registry.close = close_func
+
+        controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+        mock_forward_func_future = asyncio.Future()
+        mock_forward_func_future.set_exception(HTTPResponse({"mock": "response"}))
+        mock_forward_func = Mock()
+        mock_forward_func.return_value = mock_forward_func_future
+        controller._forward_request_remote = mock_forward_func  # pylint: disable=protected-access
+
+        test_server = TestServer(controller.app)
+        async with TestClient(test_server) as client:
+            await client.get(
+                "/schemas/ids/1",
+                headers={"Content-Type": "application/json", "X-Karapace-Schemas-Offset": "42"},
+            )
+
+            schema_reader_mock.wait_for_offset.assert_awaited_once_with(42, timeout=2.0)
+            mock_forward_func.assert_called_once_with(
+                request=ANY, body=b"", url="http://primary-url/schemas/ids/1", content_type="application/json", method="GET"
+            )
+
+
+async def test_forward_request_remote_passes_bytes_through() -> None:
+    received_requests = []
+
+    async def primary_handler(request: aiohttp.web.Request) -> aiohttp.web.Response:
+        received_requests.append((request.headers["Content-Type"], await request.read()))
+        return aiohttp.web.Response(body=b'{"id":1}', headers={"Content-Type": "application/json", "etag": '"primary-etag"'})
+
+    primary_app = aiohttp.web.Application()
+    primary_app.router.add_post("/subjects/foo/versions", primary_handler)
+
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    await controller._create_forward_client(controller.app)  # pylint: disable=protected-access
+    request = HTTPRequest(
+        url="http://follower/subjects/foo/versions",
+        query={},
+        headers={"Content-Type": "application/vnd.schemaregistry.v1+json"},
+        path_for_stats="/subjects/x/versions",
+        method="POST",
+    )
+    request.body = b'{"schema": "\\"int\\""}'
+
+    async with TestServer(primary_app) as primary:
+        with pytest.raises(HTTPResponse) as exc_info:
+            await controller._forward_request_remote(  # pylint: disable=protected-access
+                request=request,
+                body=request.body,
+                url=str(primary.make_url("/subjects/foo/versions")),
+                content_type="application/vnd.schemaregistry.v1+json",
+                method="POST",
+            )
+    await controller._forward_client.close()  # pylint: disable=protected-access
+
+    assert received_requests == [("application/vnd.schemaregistry.v1+json", b'{"schema": "\\"int\\""}')]
+    response = exc_info.value
+    assert response.body == b'{"id":1}'
+    # Header names are passed through in the case the primary's response carried them.
+    assert response.headers["Etag"] == '"primary-etag"'
+    assert "Content-Length" not in response.headers
+
+
+def _changes_request(**query: str) -> HTTPRequest:
+    return HTTPRequest(url="http://registry/changes", query=query, headers={}, path_for_stats="/changes", method="GET")
+
+
+def _subject_change(offset: int, subject: str) -> SchemaChange:
+    return SchemaChange(
+        offset=offset, keytype="SCHEMA", subject=Subject(subject), version=Version(1), schema_id=SchemaId(1), deleted=False
+    )
+
+
+async def _get_changes(controller: KarapaceSchemaRegistryController, **query: str) -> HTTPResponse:
+    with pytest.raises(HTTPResponse) as exc_info:
+        await controller.changes_get("application/json", request=_changes_request(**query))
+    return exc_info.value
+
+
+@pytest.mark.parametrize("query", [{"offset": "first"}, {"offset": "1", "timeout": "1.5"}])
+async def test_changes_rejects_invalid_query(query: dict[str, str]) -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+
+    response = await _get_changes(controller, **query)
+
+    assert response.status == HTTPStatus.BAD_REQUEST
+    assert response.body["error_code"] == 400
+
+
+async def test_changes_timeout_is_clamped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(schema_registry_apis, "CHANGES_MAX_WAIT_MS", 100)
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    controller.schema_registry.schema_reader.changes.append(_subject_change(1, "foo"))
+
+    started_at = time.monotonic()
+    response = await asyncio.wait_for(_get_changes(controller, offset="1", timeout="3600000"), timeout=5)
+
+    assert 0.1 <= time.monotonic() - started_at < 5
+    assert response.body == {"changes": [], "offset": 1, "truncated": False}
+
+
+async def test_changes_long_poll_returns_applied_change() -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    change_feed = controller.schema_registry.schema_reader.changes
+    change_feed.append(_subject_change(1, "foo"))
+
+    # The schema reader thread applies the record while the request waits.
+    timer = threading.Timer(0.05, change_feed.append, args=(_subject_change(2, "bar"),))
+    timer.start()
+    response = await asyncio.wait_for(_get_changes(controller, offset="1", timeout="30000"), timeout=5)
+    timer.join()
+
+    assert response.body == {"changes": [_subject_change(2, "bar").to_dict()], "offset": 2, "truncated": False}
+
+
+async def test_changes_are_filtered_by_subject_authorization() -> None:
+    controller = KarapaceSchemaRegistryController(config=set_config_defaults(DEFAULTS))
+    controller._auth = Mock()  # pylint: disable=protected-access
+    controller._auth.check_authorization.side_effect = (  # pylint: disable=protected-access
+        lambda user, operation, resource: resource == "Subject:allowed"
+    )
+    change_feed = controller.schema_registry.schema_reader.changes
+    for offset, subject in enumerate(["allowed", "denied", "allowed"], start=1):
+        change_feed.append(_subject_change(offset, subject))
+
+    response = await _get_changes(controller, offset="0")
+
+    assert [change["offset"] for change in response.body["changes"]] == [1, 3]
+    # The offset moves past the changes filtered out.
+    assert response.body["offset"] == 3
@@ -324,6 +324,21 @@ async def test_serialization_fails(default_config_path: Path):
     assert mock_registry_client.method_calls == [call.get_schema("topic")]
 
 
+async def test_serialize_many_json_schema_records(default_config_path: Path):
+    mock_registry_client = Mock()
+    get_latest_schema_future = asyncio.Future()
+    get_latest_schema_future.set_result((1, TYPED_JSON_SCHEMA, Versioner.V(1)))
+    mock_registry_client.get_schema.return_value = get_latest_schema_future
+
+    serializer = await make_ser_deser(default_config_path, mock_registry_client)
+    schema = await serializer.get_schema_for_subject(Subject("top"))
+    records = [{"attr1": "a"}, {"attr1": None, "attr2": "b"}]
+
+    assert await serializer.serialize_many(schema, records) == [await serializer.serialize(schema, r) for r in records]
+    with pytest.raises(InvalidPayload):
+        await serializer.serialize_many(schema, [{"attr1": "a"}, {"attr1": 1}])
+
+
 async def test_deserialization_fails(default_config_path: Path):
     mock_registry_client = Mock()
     schema_for_id_one_future = asyncio.Future()
@@ -0,0 +1,232 @@
+"""
+Copyright (c) 2024 Aiven Ltd
+See LICENSE for details
+"""
+from __future__ import annotations
+
+from karapace import shared_database
+from karapace.config import set_config_defaults
+from karapace.key_format import KeyFormatter
+from karapace.offset_watcher import OffsetWatcher
+from karapace.schema_models import SchemaType, TypedSchema
+from karapace.schema_reader import KafkaSchemaReader, SharedSchemaReader
+from karapace.schema_references import Reference
+from karapace.shared_database import create_shared_database_file, SharedDatabaseReader, SharedDatabaseWriter
+from karapace.typing import SchemaId, Subject, Version
+from pathlib import Path
+from tests.utils import StubMessage
+
+import json
+import os
+import pytest
+import threading
+
+
+def _schema_message(offset: int, subject: str, version: int, schema_id: int, schema: str) -> StubMessage:
+    return StubMessage(
+        offset=offset,
+        error=None,
+        key=json.dumps({"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}).encode(),
+        value=json.dumps({"subject": subject, "version": version, "id": schema_id, "schema": schema}).encode(),
+    )
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path: Path) -> str:
+    path = str(tmp_path / "schemas")
+    create_shared_database_file(path)
+    return path
+
+
+def test_reader_follows_writer(path: str) -> None:
+    writer = SharedDatabaseWriter(path)
+    reader = SharedDatabaseReader(path)
+    int_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='"int"')
+    string_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='"string"')
+    reference = Reference(name="int", subject=Subject("a"), version=Version(1))
+
+    with writer.batch():
+        writer.insert_schema_version(
+            subject=Subject("a"),
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=int_schema,
+            references=None,
+        )
+        writer.insert_schema_version(
+            subject=Subject("b"),
+            schema_id=SchemaId(1),
+            version=Version(1),
+            deleted=False,
+            schema=int_schema,
+            references=None,
+        )
+        writer.insert_schema_version(
+            subject=Subject("b"),
+            schema_id=SchemaId(2),
+            version=Version(2),
+            deleted=False,
+            schema=string_schema,
+            references=[reference],
+        )
+        writer.insert_referenced_by(subject=Subject("a"), version=Version(1), schema_id=SchemaId(2))
+        writer.set_subject_compatibility(subject=Subject("a"), compatibility="FULL")
+        writer.delete_subject(subject=Subject("b"), version=Version(1))
+    reader.follow()
+
+    assert reader.find_subjects(include_deleted=True) == writer.find_subjects(include_deleted=True)
+    assert reader.find_subjects(include_deleted=False) == writer.find_subjects(include_deleted=False)
+    for subject in (Subject("a"), Subject("b")):
+        assert reader.find_subject_schemas(subject=subject, include_deleted=True) == writer.find_subject_schemas(
+            subject=subject, include_deleted=True
+        )
+    assert reader.find_schema(schema_id=SchemaId(1)) == int_schema
+    assert reader.global_schema_id == SchemaId(2)
+    assert reader.get_subject_compatibility(subject=Subject("a")) == "FULL"
+    assert list(reader.get_referenced_by(Subject("a"), Version(1))) == [SchemaId(2)]
+    assert reader.get_schema_id_if_exists(subject=Subject("a"), schema=int_schema, include_deleted=False) == SchemaId(1)
+    assert reader.get_schema_id_if_exists(subject=Subject("b"), schema=int_schema, include_deleted=False) is None
+
+    # Schemas are stored once, whatever the number of versions using them.
+    assert (
+        reader.find_schema(schema_id=SchemaId(1))
+        is reader.find_subject_schemas(subject=Subject("b"), include_deleted=True)[Version(1)].schema
+    )
+
+    with writer.batch():
+        writer.remove_referenced_by(SchemaId(2), [reference])
+        writer.delete_subject_schema(subject=Subject("b"), version=Version(1))
+        writer.delete_subject_hard(subject=Subject("a"))
+    reader.follow()
+
+    assert reader.find_subjects(include_deleted=True) == [Subject("b")]
+    assert list(reader.find_subject_schemas(subject=Subject("b"), include_deleted=True)) == [Version(2)]
+    assert not reader.get_referenced_by(Subject("a"), Version(1))
+
+
+def test_batch_is_visible_once_applied(path: str) -> None:
+    writer = SharedDatabaseWriter(path)
+    reader = SharedDatabaseReader(path)
+
+    with writer.batch():
+        writer.insert_subject(subject=Subject("a"))
+        reader.follow()
+        assert reader.find_subjects(include_deleted=True) == []
+    reader.follow()
+
+    assert reader.find_subjects(include_deleted=True) == [Subject("a")]
+
+
+def test_reader_maps_grown_file(path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(shared_database, "INITIAL_SIZE", 1024)
+    create_shared_database_file(path)
+    writer = SharedDatabaseWriter(path)
+    reader = SharedDatabaseReader(path)
+
+    for schema_id in range(1, 101):
+        schema_str = json.dumps({"type": "fixed", "name": "f", "size": schema_id})
+        schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str=schema_str)
+        writer.insert_schema_version(
+            subject=Subject("a"),
+            schema_id=SchemaId(schema_id),
+            version=Version(schema_id),
+            deleted=False,
+            schema=schema,
+            references=None,
+        )
+    reader.follow()
+
+    assert reader.num_schemas() == 100
+    assert json.loads(reader.find_schema(schema_id=SchemaId(100)).schema_str)["size"] == 100
+
+
+def test_header_is_read_while_another_thread_maps_grown_file(path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(shared_database, "INITIAL_SIZE", 1024)
+    create_shared_database_file(path)
+    writer = SharedDatabaseWriter(path)
+    reader = SharedDatabaseReader(path)
+    stop = threading.Event()
+    errors = []
+
+    def read_headers() -> None:
+        while not stop.is_set():
+            try:
+                reader._region.header()  # pylint: disable=protected-access
+            except Exception as e:  # pylint: disable=broad-except
+                errors.append(e)
+                return
+
+    thread = threading.Thread(target=read_headers)
+    thread.start()
+    try:
+        for schema_id in range(1, 201):
+            schema_str = json.dumps({"type": "fixed", "name": "f", "size": schema_id})
+            schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str=schema_str)
+            writer.insert_schema_version(
+                subject=Subject("a"),
+                schema_id=SchemaId(schema_id),
+                version=Version(schema_id),
+                deleted=False,
+                schema=schema,
+                references=None,
+            )
+            reader.follow()
+            assert json.loads(reader.find_schema(schema_id=SchemaId(schema_id)).schema_str)["size"] == schema_id
+    finally:
+        stop.set()
+        thread.join()
+
+    assert errors == []
+
+
+def test_journal_is_truncated_when_created_again(path: str) -> None:
+    writer = SharedDatabaseWriter(path)
+    writer.insert_subject(subject=Subject("a"))
+
+    create_shared_database_file(path)
+    reader = SharedDatabaseReader(path)
+    reader.follow()
+
+    assert reader.find_subjects(include_deleted=True) == []
+    assert os.path.getsize(path) == shared_database.INITIAL_SIZE
+
+
+def test_shared_schema_reader_follows_primary_reader(path: str) -> None:
+    primary_config = set_config_defaults({})
+    primary = KafkaSchemaReader(
+        config=primary_config,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=SharedDatabaseWriter(path),
+    )
+    follower = SharedSchemaReader(
+        config=set_config_defaults({}),
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=SharedDatabaseReader(path),
+    )
+    primary._ready = True  # pylint: disable=protected-access
+
+    primary.consume_messages(
+        [
+            StubMessage(
+                offset=1,
+                error=None,
+                key=b'{"keytype":"CONFIG","subject":null,"magic":0}',
+                value=b'{"compatibilityLevel":"FULL"}',
+            ),
+            _schema_message(2, "test", 1, 1, '"int"'),
+        ],
+        watch_offsets=False,
+    )
+    follower.follow()
+
+    assert follower.offset == 2
+    assert follower.ready()
+    assert follower.config["compatibility"] == "FULL"
+    assert [change.offset for change in follower.changes.changes_since(0)[0]] == [1, 2]
+    int_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str='"int"')
+    assert follower.database.find_schema(schema_id=SchemaId(1)) == int_schema